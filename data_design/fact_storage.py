@@ -0,0 +1,362 @@
+"""Shared fact-table storage for every pipeline stage.
+
+Tables are stored as Parquet datasets (a directory of part files, so chunked writers can
+append) when pyarrow is installed, and as CSV otherwise. Set PRICING_STORAGE_FORMAT to
+"csv" or "parquet" to choose explicitly. Readers apply the shared schema below so every
+stage sees the same dtypes: native timestamps, categorical ids and labels, and compact
+integer counts. Tables consumed by the Next.js dashboard are always exported to CSV too.
+"""
+
+import importlib.util
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+TIMESTAMP = "timestamp"
+DATE = "date"
+CATEGORY = "category"
+
+TABLE_SCHEMAS = {
+    "fact_orders": {
+        "timestamp": TIMESTAMP,
+        "date": DATE,
+        "hour": "int8",
+        "day_of_week": CATEGORY,
+        "zone_id": CATEGORY,
+        "segment_id": CATEGORY,
+        "base_demand": "float64",
+        "price_multiplier": "float64",
+        "final_demand": "float64",
+        "orders_completed": "int32",
+        "orders_lost_capacity": "int32",
+        "avg_delivery_delay_min": "float64",
+        "gross_revenue_est": "float64",
+    },
+    "fact_capacity_ops": {
+        "timestamp": TIMESTAMP,
+        "zone_id": CATEGORY,
+        "max_hourly_capacity": "int32",
+        "incoming_order_requests": "int32",
+        "utilization_rate": "float64",
+        "capacity_breach_flag": "int8",
+        "stress_index": "float64",
+    },
+    "fact_pricing_actions": {
+        "timestamp": TIMESTAMP,
+        "zone_id": CATEGORY,
+        "segment_id": CATEGORY,
+        "action_type": CATEGORY,
+        "price_change_pct": "float64",
+        "price_multiplier": "float64",
+        "decision_reason": CATEGORY,
+    },
+    "order_events": {
+        "timestamp": TIMESTAMP,
+        "arrival_ts": TIMESTAMP,
+        "zone_id": CATEGORY,
+        "segment_id": CATEGORY,
+        "price_multiplier": "float64",
+        "fulfilled": "int8",
+    },
+    "demand_forecasts": {
+        "timestamp": TIMESTAMP,
+        "zone_id": CATEGORY,
+        "segment_id": CATEGORY,
+        "forecast_model": CATEGORY,
+        "forecast_demand": "float64",
+        "lower_bound": "float64",
+        "upper_bound": "float64",
+    },
+    "demand_path_series": {
+        "series_index": "int32",
+        "zone_id": CATEGORY,
+        "segment_id": CATEGORY,
+        "first_timestamp": TIMESTAMP,
+    },
+    "forecast_backtest_steps": {
+        "forecast_model": CATEGORY,
+        "horizon_step": "int16",
+        "n_forecasts": "int64",
+        "mae": "float64",
+        "rmse": "float64",
+        "bias": "float64",
+        "wape": "float64",
+        "interval_coverage": "float64",
+    },
+    "forecast_backtest_origins": {
+        "forecast_model": CATEGORY,
+        "origin_timestamp": TIMESTAMP,
+        "n_forecasts": "int64",
+        "mae": "float64",
+        "rmse": "float64",
+        "bias": "float64",
+        "wape": "float64",
+        "interval_coverage": "float64",
+    },
+    "pricing_recommendations": {
+        "timestamp": TIMESTAMP,
+        "zone_id": CATEGORY,
+        "segment_id": CATEGORY,
+        "recommended_action": CATEGORY,
+        "recommended_pct_change": "float64",
+        "decision_reason": CATEGORY,
+        "risk_flag": CATEGORY,
+        "policy_notes": "object",
+    },
+    "scenario_outcomes": {
+        "timestamp": TIMESTAMP,
+        "zone_id": CATEGORY,
+        "segment_id": CATEGORY,
+        "strategy_name": CATEGORY,
+        "price_change_pct": "float64",
+        "forecast_demand": "float64",
+        "adjusted_demand": "float64",
+        "orders_completed": "float64",
+        "orders_lost_capacity": "float64",
+        "revenue_est": "float64",
+        "utilization_rate": "float64",
+        "stress_index": "float64",
+        "customer_risk_flag": CATEGORY,
+    },
+}
+
+# Tables the dashboard reads as CSV (lib/data-loaders), directly from a stage's output
+# directory or from the public/data copies; they always get a CSV copy.
+CSV_EXPORT_TABLES = {"demand_forecasts", "pricing_recommendations", "scenario_outcomes", "strategy_scorecard"}
+
+STORAGE_FORMATS = ("parquet", "csv")
+
+# Rows per chunk when streaming a CSV table for a time window.
+READ_CHUNK_ROWS = 500_000
+
+
+def default_format() -> str:
+    """Storage format from PRICING_STORAGE_FORMAT, else Parquet when pyarrow is available."""
+    fmt = os.environ.get("PRICING_STORAGE_FORMAT")
+    if fmt is None:
+        fmt = "parquet" if importlib.util.find_spec("pyarrow") is not None else "csv"
+    if fmt not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage format '{fmt}'. Expected one of {STORAGE_FORMATS}.")
+    return fmt
+
+
+def table_path(name: str, directory: Path, fmt: str) -> Path:
+    """Location of a table: a Parquet dataset directory or a single CSV file."""
+    return Path(directory) / f"{name}.{fmt}"
+
+
+def apply_schema(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """Cast columns to the shared schema; columns without a schema entry are left as-is."""
+    schema = TABLE_SCHEMAS.get(name, {})
+    out = df.copy()
+
+    for col, dtype in schema.items():
+        if col not in out.columns:
+            continue
+        if dtype == TIMESTAMP:
+            if not pd.api.types.is_datetime64_any_dtype(out[col]):
+                out[col] = pd.to_datetime(out[col], format="ISO8601")
+        elif dtype == DATE:
+            if pd.api.types.is_datetime64_any_dtype(out[col]):
+                out[col] = out[col].dt.date
+            elif pd.api.types.is_string_dtype(out[col]):
+                out[col] = pd.to_datetime(out[col], format="ISO8601").dt.date
+        elif dtype == CATEGORY:
+            # Lexically sorted categories keep sort and groupby order identical to plain strings.
+            if isinstance(out[col].dtype, pd.CategoricalDtype):
+                out[col] = out[col].cat.reorder_categories(sorted(out[col].cat.categories))
+            else:
+                out[col] = out[col].astype("category")
+        elif dtype == "object":
+            out[col] = out[col].astype(object)
+        else:
+            out[col] = out[col].astype(dtype)
+
+    return out
+
+
+def _csv_dtypes(name: str, columns: list[str] | None) -> dict:
+    schema = TABLE_SCHEMAS.get(name, {})
+    return {
+        col: dtype
+        for col, dtype in schema.items()
+        if dtype not in (TIMESTAMP, DATE, CATEGORY, "object") and (columns is None or col in columns)
+    }
+
+
+def table_files(name: str, directory: Path, fmt: str | None = None) -> list[Path]:
+    """Files backing a stored table (Parquet parts or the CSV file), using the same fallback as read_table."""
+    fmt = fmt or default_format()
+    for candidate in [fmt] + [f for f in STORAGE_FORMATS if f != fmt]:
+        path = table_path(name, directory, candidate)
+        if path.is_dir():
+            return sorted(path.glob("part-*.parquet"))
+        if path.exists():
+            return [path]
+    raise FileNotFoundError(f"No stored table '{name}' found in {directory}.")
+
+
+def read_table(name: str, directory: Path, columns: list[str] | None = None, fmt: str | None = None) -> pd.DataFrame:
+    """Read a table with column projection, falling back to the other format if needed."""
+    fmt = fmt or default_format()
+    formats = [fmt] + [f for f in STORAGE_FORMATS if f != fmt]
+
+    for candidate in formats:
+        path = table_path(name, directory, candidate)
+        if not path.exists():
+            continue
+        if candidate == "parquet":
+            df = pd.read_parquet(path, columns=columns)
+        else:
+            df = pd.read_csv(path, usecols=columns, dtype=_csv_dtypes(name, columns))
+        if columns is not None:
+            df = df[columns]
+        return apply_schema(df, name)
+
+    raise FileNotFoundError(f"No stored table '{name}' found in {directory} ({', '.join(formats)}).")
+
+
+def _part_max_timestamp(part: Path) -> pd.Timestamp | None:
+    """Latest timestamp in a Parquet part from its row-group statistics, without reading data."""
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(part).metadata
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    if "timestamp" not in names:
+        return None
+    column = names.index("timestamp")
+    latest = None
+    for group in range(metadata.num_row_groups):
+        stats = metadata.row_group(group).column(column).statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        latest = pd.Timestamp(stats.max) if latest is None else max(latest, pd.Timestamp(stats.max))
+    return latest
+
+
+def read_table_since(
+    name: str,
+    directory: Path,
+    start: pd.Timestamp,
+    columns: list[str] | None = None,
+    fmt: str | None = None,
+    chunk_rows: int = READ_CHUNK_ROWS,
+) -> pd.DataFrame:
+    """Read only the rows with timestamp >= start, with column projection.
+
+    Parquet parts whose timestamp statistics end before start are skipped unread and the
+    others are read with a row filter. CSV is streamed chunk_rows rows at a time and only
+    each chunk's matching rows are kept. Memory is bounded by the selected rows, not by
+    the stored history.
+    """
+    start = pd.Timestamp(start)
+    fmt = fmt or default_format()
+    formats = [fmt] + [f for f in STORAGE_FORMATS if f != fmt]
+    read_cols = None if columns is None else list(dict.fromkeys(columns + ["timestamp"]))
+
+    for candidate in formats:
+        path = table_path(name, directory, candidate)
+        if not path.exists():
+            continue
+        frames = []
+        if candidate == "parquet":
+            for part in sorted(path.glob("part-*.parquet")):
+                latest = _part_max_timestamp(part)
+                if latest is not None and latest < start:
+                    continue
+                frames.append(pd.read_parquet(part, columns=read_cols, filters=[("timestamp", ">=", start)]))
+        else:
+            for chunk in pd.read_csv(path, usecols=read_cols, dtype=_csv_dtypes(name, read_cols), chunksize=chunk_rows):
+                chunk["timestamp"] = pd.to_datetime(chunk["timestamp"], format="ISO8601")
+                frames.append(chunk[chunk["timestamp"] >= start])
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=read_cols or [])
+        if columns is not None:
+            df = df[columns]
+        return apply_schema(df, name)
+
+    raise FileNotFoundError(f"No stored table '{name}' found in {directory} ({', '.join(formats)}).")
+
+
+def read_last_timestamp(name: str, directory: Path, fmt: str | None = None) -> pd.Timestamp:
+    """Latest timestamp of a table whose rows are appended in time order.
+
+    Only the last Parquet part, or the last CSV line, is read, so the cost does not grow
+    with the stored history.
+    """
+    fmt = fmt or default_format()
+    path = table_path(name, directory, fmt)
+    if not path.exists():
+        # Same fallback as read_table: use the other format if only that copy exists.
+        others = [f for f in STORAGE_FORMATS if f != fmt and table_path(name, directory, f).exists()]
+        if not others:
+            raise FileNotFoundError(f"No stored table '{name}' found at {path}.")
+        fmt = others[0]
+        path = table_path(name, directory, fmt)
+
+    if fmt == "parquet":
+        parts = sorted(path.glob("part-*.parquet"))
+        if not parts:
+            raise ValueError(f"Table '{name}' at {path} has no rows.")
+        return pd.Timestamp(pd.read_parquet(parts[-1], columns=["timestamp"])["timestamp"].max())
+
+    with open(path, "rb") as fh:
+        header = fh.readline().decode().rstrip("\r\n").split(",")
+        fh.seek(0, os.SEEK_END)
+        end = fh.tell()
+        fh.seek(max(end - 4096, 0))
+        lines = fh.read().splitlines()
+    last = lines[-1].decode().split(",") if lines else []
+    if len(last) != len(header) or last == header:
+        raise ValueError(f"Table '{name}' at {path} has no rows.")
+    return pd.Timestamp(last[header.index("timestamp")])
+
+
+class TableWriter:
+    """Write a table in one or more chunks: Parquet part files or a growing CSV file.
+
+    append=False replaces any existing copy of the table; append=True continues it.
+    """
+
+    def __init__(self, name: str, directory: Path, fmt: str | None = None, append: bool = False):
+        self.name = name
+        self.fmt = fmt or default_format()
+        self.path = table_path(name, directory, self.fmt)
+        self.csv_export = name in CSV_EXPORT_TABLES and self.fmt != "csv"
+        self.csv_path = table_path(name, directory, "csv")
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        if not append:
+            stale = [self.path] + ([self.csv_path] if self.csv_export else [])
+            for path in stale:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                elif path.exists():
+                    path.unlink()
+
+        if self.fmt == "parquet":
+            self.path.mkdir(exist_ok=True)
+            self._next_part = len(list(self.path.glob("part-*.parquet")))
+
+    @staticmethod
+    def _append_csv(df: pd.DataFrame, path: Path) -> None:
+        has_header = path.exists() and path.stat().st_size > 0
+        df.to_csv(path, index=False, mode="a" if has_header else "w", header=not has_header)
+
+    def write(self, df: pd.DataFrame) -> None:
+        df = apply_schema(df, self.name)
+        if self.fmt == "parquet":
+            df.to_parquet(self.path / f"part-{self._next_part:05d}.parquet", index=False)
+            self._next_part += 1
+        else:
+            self._append_csv(df, self.path)
+        if self.csv_export:
+            self._append_csv(df, self.csv_path)
+
+
+def write_table(df: pd.DataFrame, name: str, directory: Path, fmt: str | None = None) -> Path:
+    """Write a whole table in one call and return its primary path."""
+    writer = TableWriter(name, directory, fmt=fmt)
+    writer.write(df)
+    return writer.path
@@ -2,19 +2,38 @@
 Synthetic data generator for dynamic pricing decision simulator.
 
 Creates:
-- fact_orders.csv
-- fact_capacity_ops.csv
-- fact_pricing_actions.csv
+- fact_orders
+- fact_capacity_ops
+- fact_pricing_actions
 
-Outputs are written to: data_design/output/
+Outputs are written to data_design/output/ through the shared fact storage layer
+(Parquet datasets when pyarrow is available, CSV otherwise; see fact_storage.py).
+
+Runs are reproducible for a given --seed. Pricing actions are drawn with a batched
+sampler by default; --sampler row replays the original per-row draw sequence so a
+seed reproduces outputs generated before the batched sampler existed.
+
+--events and --random-events overlay operational events (outages, weather spikes,
+promotions) on capacity and base demand; the applied catalog is saved with the outputs.
+--order-events also streams an order-level order_events table (Poisson arrivals per hour).
 """
 
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from data_design.fact_storage import STORAGE_FORMATS, TableWriter, default_format, read_last_timestamp  # noqa: E402
+
 pd.options.mode.copy_on_write = True
 
 
@@ -22,6 +41,12 @@ SEED = 42
 DAYS = 365
 HOURS = DAYS * 24
 START_TIMESTAMP = "2025-01-01 00:00:00"
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+FACT_TABLES = ("fact_orders", "fact_capacity_ops", "fact_pricing_actions")
+STATE_FILE = "generator_state.json"
+EVENT_CATALOG_FILE = "event_catalog.csv"
+ORDER_EVENTS_TABLE = "order_events"
+ORDER_EVENT_BATCH_ROWS = 2_000_000
 
 ZONES = [f"zone_{i}" for i in range(1, 7)]
 SEGMENTS = ["value", "balanced", "premium"]
@@ -93,6 +118,165 @@ def zone_profiles() -> dict:
     }
 
 
+# Independent child streams per zone (and per zone-segment for row-level draws).
+# The list order is part of the seed contract: appending is safe, reordering is not.
+ZONE_STREAM_PURPOSES = ["capacity", "demand"] + [
+    f"{purpose}:{segment}" for segment in SEGMENTS for purpose in ("segment", "action", "response", "delay")
+]
+
+RngSource = np.random.Generator | dict
+
+
+def spawn_zone_streams(seed: int, zones: list[str]) -> dict:
+    """Spawn one SeedSequence child per zone and one generator per purpose within each zone.
+
+    A zone's draws depend only on the seed and the zone's position, never on which other
+    zones are generated alongside it, so shards can run in any process and in any order.
+    Every stream draws one row per hour in time order, which also makes the output
+    independent of --chunk-days.
+    """
+    streams = {}
+    for zone, zone_seq in zip(zones, np.random.SeedSequence(seed).spawn(len(zones))):
+        purpose_seqs = zone_seq.spawn(len(ZONE_STREAM_PURPOSES))
+        streams[zone] = {
+            purpose: np.random.Generator(np.random.PCG64(seq))
+            for purpose, seq in zip(ZONE_STREAM_PURPOSES, purpose_seqs)
+        }
+    return streams
+
+
+def spawn_arrival_streams(seed: int, zones: list[str]) -> dict:
+    """Per-zone generators for order-level arrivals: one for Poisson counts, one for offsets.
+
+    They come from their own SeedSequence, so enabling order events never changes the fact
+    tables, and each stream draws in time order, so events do not depend on chunking.
+    """
+    streams = {}
+    for zone, zone_seq in zip(zones, np.random.SeedSequence([seed, 3]).spawn(len(zones))):
+        count_seq, offset_seq = zone_seq.spawn(2)
+        streams[zone] = {
+            "count": np.random.Generator(np.random.PCG64(count_seq)),
+            "offset": np.random.Generator(np.random.PCG64(offset_seq)),
+        }
+    return streams
+
+
+def stream_for(rng: RngSource, zone: str, purpose: str) -> np.random.Generator:
+    """Resolve the generator for a draw: the shared generator, or the zone's dedicated stream."""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return rng[zone][purpose]
+
+
+def draw_zone_noise(rng: RngSource, zones: list[str], purpose: str, hours: int) -> np.ndarray:
+    """Standard normal noise shaped (hours, zones), drawn zone by zone."""
+    if isinstance(rng, np.random.Generator):
+        return rng.standard_normal((len(zones), hours)).T
+    return np.stack([rng[zone][purpose].standard_normal(hours) for zone in zones], axis=1)
+
+
+def draw_series_noise(rng: RngSource, zones: list[str], segments: list[str], purpose: str, hours: int, draw) -> np.ndarray:
+    """Row-level draws shaped (hours, zones, segments, ...).
+
+    draw(generator, shape) returns an array whose leading dimensions are `shape`. A shared
+    generator is called once with a (zones, segments, hours) layout, matching the zone,
+    segment, time row order of the long tables. With zone streams every zone-segment
+    stream draws its own hours.
+    """
+    if isinstance(rng, np.random.Generator):
+        block = draw(rng, (len(zones), len(segments), hours))
+    else:
+        block = np.stack(
+            [np.stack([draw(rng[zone][f"{purpose}:{segment}"], (hours,)) for segment in segments]) for zone in zones]
+        )
+    return np.moveaxis(block, 2, 0)
+
+
+def segment_sum(values: np.ndarray) -> np.ndarray:
+    """Zone totals over the segment axis with the compensated summation pandas groupby uses.
+
+    Matching pandas keeps rounded zone totals bit-identical to the long-table implementation.
+    """
+    total = np.zeros(values.shape[:-1])
+    compensation = np.zeros(values.shape[:-1])
+    for s in range(values.shape[-1]):
+        y = values[..., s] - compensation
+        t = total + y
+        compensation = t - total - y
+        total = t
+    return total
+
+
+def build_zone_profiles(
+    n_zones: int = len(ZONES),
+    segment_mix: dict | None = None,
+    seed: int = SEED,
+) -> dict:
+    """Scale the hand-tuned zone profiles to any zone count and optional global segment mix.
+
+    The first six zones keep their hand-tuned parameters. Additional zones are jittered
+    copies of those archetypes drawn from a dedicated generator, so profile synthesis
+    never consumes draws from the main data stream.
+    """
+    archetypes = list(zone_profiles().values())
+    profile_rng = np.random.default_rng([seed, 1])
+    profiles = {}
+
+    for i in range(n_zones):
+        base = archetypes[i % len(archetypes)]
+        if i < len(archetypes):
+            p = {**base, "segment_mix": dict(base["segment_mix"])}
+        else:
+            demand_scale = profile_rng.uniform(0.6, 1.5)
+            headroom = base["base_capacity"] / base["base_demand"] * profile_rng.uniform(0.95, 1.05)
+            p = {
+                "base_demand": round(base["base_demand"] * demand_scale, 1),
+                "base_capacity": round(base["base_demand"] * demand_scale * headroom, 1),
+                "volatility": round(float(np.clip(base["volatility"] + profile_rng.normal(0, 0.015), 0.05, 0.20)), 3),
+                "capacity_tightness": round(
+                    float(np.clip(base["capacity_tightness"] + profile_rng.normal(0, 0.02), 0.04, 0.25)), 3
+                ),
+                "segment_mix": dict(base["segment_mix"]),
+            }
+
+        if segment_mix is not None:
+            p["segment_mix"] = dict(segment_mix)
+
+        total_share = sum(p["segment_mix"].values())
+        if not np.isclose(total_share, 1.0):
+            p["segment_mix"] = {seg: share / total_share for seg, share in p["segment_mix"].items()}
+        profiles[f"zone_{i + 1}"] = p
+
+    return profiles
+
+
+def parse_segment_mix(text: str) -> dict:
+    """Parse 'value=0.5,balanced=0.3,premium=0.2' into a segment share mapping."""
+    mix = {}
+    for item in text.split(","):
+        segment, _, share = item.partition("=")
+        segment = segment.strip()
+        if segment not in SEGMENT_ELASTICITY:
+            raise ValueError(f"Unknown segment '{segment}'. Expected one of {SEGMENTS}.")
+        mix[segment] = float(share)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Segment mix must contain at least one positive share.")
+    return mix
+
+
+def iter_time_chunks(start_ts: str, days: int, chunk_days: int):
+    """Yield consecutive time tables covering the horizon in bounded day chunks."""
+    start = pd.Timestamp(start_ts)
+    for offset in range(0, days, chunk_days):
+        span = min(chunk_days, days - offset)
+        yield build_time_table(start + pd.Timedelta(days=offset), span * 24)
+
+
+def build_calendar_chunks(start_ts: str, days: int, chunk_days: int) -> list[tuple[pd.DataFrame, pd.DataFrame]]:
+    """Precompute (time table, calendar multipliers) for every chunk so several runs can share them."""
+    return [(time_df, calendar_multipliers(time_df)) for time_df in iter_time_chunks(start_ts, days, chunk_days)]
+
+
 def build_time_table(start_ts: str, hours: int) -> pd.DataFrame:
     """Continuous hourly timeline with business calendar features."""
     ts = pd.date_range(start=start_ts, periods=hours, freq="h")
@@ -141,95 +325,261 @@ def calendar_multipliers(time_df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
-def generate_capacity_base(time_df: pd.DataFrame, profiles: dict, rng: np.random.Generator) -> pd.DataFrame:
-    """Zone-hour effective capacity with peak-hour shrink and bounded noise."""
-    rows = []
+def profile_segments(profiles: dict) -> list[str]:
+    """Segments shared by every zone profile; the dense grid needs one common segment axis."""
+    segments = list(next(iter(profiles.values()))["segment_mix"])
+    for zone, p in profiles.items():
+        if list(p["segment_mix"]) != segments:
+            raise ValueError(f"Zone '{zone}' segment mix {list(p['segment_mix'])} does not match {segments}.")
+    return segments
 
-    for zone in ZONES:
-        p = profiles[zone]
-        base_capacity = p["base_capacity"]
-        tightness = p["capacity_tightness"]
 
-        hour = time_df["hour"].values
-        dow_num = time_df["dow_num"].values
+# Event kinds and the quantity each one scales. A catalog row may set "target" explicitly.
+EVENT_TARGETS = {"outage": "capacity", "weather": "demand", "promotion": "demand"}
+EVENT_COLUMNS = ["event_id", "kind", "target", "zones", "segment", "start", "end", "multiplier"]
+ALL = "*"
 
-        lunch_peak = np.exp(-0.5 * ((hour - 12) / 2.0) ** 2)
-        dinner_peak = np.exp(-0.5 * ((hour - 19) / 2.4) ** 2)
-        weekend = (dow_num >= 5).astype(float)
 
-        # Capacity tightens during peak and weekends due to operational congestion.
-        peak_reduction = (0.07 + tightness * 0.08) * lunch_peak + (0.10 + tightness * 0.10) * dinner_peak
-        weekend_reduction = weekend * (0.02 + tightness * 0.03)
+def load_event_catalog(path: Path) -> pd.DataFrame:
+    """Read an event catalog from CSV or a JSON list of objects.
 
-        raw_capacity = base_capacity * (1 - peak_reduction - weekend_reduction)
-        noise = rng.normal(0, 0.025 + tightness * 0.02, size=len(time_df))
-        shock_mult = np.clip(1.0 + noise, 0.88, 1.10)
-
-        effective = np.clip(raw_capacity * shock_mult, 8, None)
+    Each event has a kind (outage/weather/promotion), zones (";"-separated ids or "*"),
+    an optional segment ("*" for all), a [start, end) time interval and a multiplier.
+    Outages scale capacity; weather and promotions scale base demand.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path) as fh:
+            catalog = pd.DataFrame(json.load(fh))
+    else:
+        catalog = pd.read_csv(path, dtype={"zones": str, "segment": str})
+    return normalize_event_catalog(catalog)
+
+
+def normalize_event_catalog(catalog: pd.DataFrame) -> pd.DataFrame:
+    """Fill defaults and validate an event catalog."""
+    catalog = catalog.copy()
+    if "event_id" not in catalog:
+        catalog["event_id"] = [f"evt_{i}" for i in range(len(catalog))]
+    if "target" not in catalog:
+        catalog["target"] = np.nan
+    if "segment" not in catalog:
+        catalog["segment"] = ALL
+    catalog["segment"] = catalog["segment"].fillna(ALL)
+    catalog["zones"] = catalog["zones"].map(lambda z: ";".join(z) if isinstance(z, list) else str(z))
+
+    unknown = set(catalog["kind"]) - set(EVENT_TARGETS)
+    if catalog["target"].isna().any() and unknown:
+        raise ValueError(f"Unknown event kinds {sorted(unknown)}; expected one of {list(EVENT_TARGETS)} or an explicit target.")
+    catalog["target"] = catalog["target"].fillna(catalog["kind"].map(EVENT_TARGETS))
+    if not catalog["target"].isin(["capacity", "demand"]).all():
+        raise ValueError("Event targets must be 'capacity' or 'demand'.")
+    if ((catalog["target"] == "capacity") & (catalog["segment"] != ALL)).any():
+        raise ValueError("Capacity events apply to whole zones; their segment must be '*'.")
+
+    catalog["start"] = pd.to_datetime(catalog["start"], format="ISO8601")
+    catalog["end"] = pd.to_datetime(catalog["end"], format="ISO8601")
+    catalog["multiplier"] = catalog["multiplier"].astype(float)
+    if (catalog["multiplier"] <= 0).any():
+        raise ValueError("Event multipliers must be positive.")
+    if (catalog["end"] <= catalog["start"]).any():
+        raise ValueError("Every event must end after it starts.")
+    return catalog[EVENT_COLUMNS].reset_index(drop=True)
+
+
+def synthesize_event_catalog(n_events: int, zones: list[str], start_ts: str, days: int, seed: int) -> pd.DataFrame:
+    """Random outage, weather, and promotion events for stress datasets.
+
+    Uses its own generator so the fact-table draws are unchanged by the catalog size.
+    """
+    rng = np.random.default_rng([seed, 2])
+    kinds = rng.choice(list(EVENT_TARGETS), size=n_events, p=[0.40, 0.35, 0.25])
+    outage, weather = kinds == "outage", kinds == "weather"
+
+    duration = np.where(outage, rng.integers(1, 7, n_events), np.where(weather, rng.integers(3, 25, n_events), rng.integers(4, 49, n_events)))
+    start_hour = rng.integers(0, days * 24, n_events)
+    multiplier = np.where(
+        outage,
+        rng.uniform(0.30, 0.80, n_events),
+        np.where(weather, rng.uniform(1.10, 1.50, n_events), rng.uniform(1.05, 1.30, n_events)),
+    )
 
-        rows.append(
-            pd.DataFrame(
-                {
-                    "timestamp": time_df["timestamp"],
-                    "zone_id": zone,
-                    "max_hourly_capacity": np.round(effective).astype(int),
-                }
-            )
+    # Weather spans a few neighbouring zones; outages and promotions stay local.
+    n_zones = np.where(weather, rng.integers(1, 5, n_events), 1).clip(max=len(zones))
+    first_zone = rng.integers(0, len(zones), n_events)
+    zone_sets = [";".join(zones[(z + k) % len(zones)] for k in range(n)) for z, n in zip(first_zone, n_zones)]
+    segment = np.where(kinds == "promotion", rng.choice(SEGMENTS, size=n_events), ALL)
+
+    start = pd.Timestamp(start_ts) + pd.to_timedelta(start_hour, unit="h")
+    return normalize_event_catalog(
+        pd.DataFrame(
+            {
+                "event_id": [f"rnd_{i}" for i in range(n_events)],
+                "kind": kinds,
+                "zones": zone_sets,
+                "segment": segment,
+                "start": start,
+                "end": start + pd.to_timedelta(duration, unit="h"),
+                "multiplier": np.round(multiplier, 3),
+            }
         )
+    )
+
+
+def index_events(catalog: pd.DataFrame) -> dict:
+    """Interval index for a catalog: one (zone, segment, start, end, log multiplier) row per event zone.
+
+    Built once per run; event_overlay then only slices it by time.
+    """
+    long = catalog.assign(zone_id=catalog["zones"].str.split(";")).explode("zone_id")
+    long = long.sort_values("start", kind="stable")
+    return {
+        target: {
+            "zone_id": group["zone_id"].to_numpy(dtype=object),
+            "segment_id": group["segment"].to_numpy(dtype=object),
+            "start": group["start"].to_numpy(dtype="datetime64[us]"),
+            "end": group["end"].to_numpy(dtype="datetime64[us]"),
+            "log_mult": np.log(group["multiplier"].to_numpy(dtype=float)),
+        }
+        for target, group in long.groupby("target")
+    }
+
 
-    return pd.concat(rows, ignore_index=True)
+def event_overlay(
+    event_index: dict | None,
+    target: str,
+    time_df: pd.DataFrame,
+    zones: list[str],
+    segments: list[str] | None = None,
+) -> np.ndarray | None:
+    """Combined multiplier of all events on one target, shaped (hours, zones[, segments]).
+
+    Overlapping events multiply. Each event adds its log multiplier at its start hour and
+    removes it at its end hour in a difference array; a cumulative sum over hours then gives
+    every cell's total in one pass, so cost is O(events + cells) however many events overlap.
+    A trailing slot on the zone and segment axes collects "*" events and is broadcast back.
+    Returns None when no event touches the chunk.
+    """
+    if not event_index or target not in event_index:
+        return None
+    ev = event_index[target]
+
+    t0 = time_df["timestamp"].values[0].astype("datetime64[us]")
+    hours = len(time_df)
+    hour = np.timedelta64(1, "h")
+    start = np.clip(-((t0 - ev["start"]) // hour), 0, hours)
+    end = np.clip(-((t0 - ev["end"]) // hour), 0, hours)
+
+    zone_pos = pd.Index(zones).get_indexer(ev["zone_id"])
+    zone_pos[ev["zone_id"] == ALL] = len(zones)
+    keep = (start < end) & (zone_pos >= 0)
+    shape = [hours + 1, len(zones) + 1]
+    cell = zone_pos
+    if segments is not None:
+        seg_pos = pd.Index(segments).get_indexer(ev["segment_id"])
+        seg_pos[ev["segment_id"] == ALL] = len(segments)
+        keep &= seg_pos >= 0
+        shape.append(len(segments) + 1)
+        cell = zone_pos * shape[2] + seg_pos
+    if not keep.any():
+        return None
+
+    width = int(np.prod(shape[1:]))
+    cell, log_mult = cell[keep], ev["log_mult"][keep]
+    size = int(np.prod(shape))
+    diff = np.bincount(start[keep] * width + cell, weights=log_mult, minlength=size)
+    diff -= np.bincount(end[keep] * width + cell, weights=log_mult, minlength=size)
+    total = np.cumsum(diff.reshape(shape)[:-1], axis=0)
+
+    total = total[:, :-1] + total[:, -1:]
+    if segments is not None:
+        total = total[:, :, :-1] + total[:, :, -1:]
+    return np.exp(total)
+
+
+def generate_capacity_base(
+    time_df: pd.DataFrame,
+    profiles: dict,
+    rng: RngSource,
+    events: dict | None = None,
+) -> np.ndarray:
+    """Zone-hour effective capacity with peak-hour shrink and bounded noise, shaped (hours, zones).
+
+    events (from index_events) overlays outage multipliers before the capacity floor.
+    """
+    zones = list(profiles)
+    hours = len(time_df)
+    base_capacity = np.array([profiles[z]["base_capacity"] for z in zones], dtype=float)
+    tightness = np.array([profiles[z]["capacity_tightness"] for z in zones], dtype=float)
+
+    hour = time_df["hour"].values[:, None]
+    dow_num = time_df["dow_num"].values[:, None]
+
+    lunch_peak = np.exp(-0.5 * ((hour - 12) / 2.0) ** 2)
+    dinner_peak = np.exp(-0.5 * ((hour - 19) / 2.4) ** 2)
+    weekend = (dow_num >= 5).astype(float)
+
+    # Capacity tightens during peak and weekends due to operational congestion.
+    peak_reduction = (0.07 + tightness * 0.08) * lunch_peak + (0.10 + tightness * 0.10) * dinner_peak
+    weekend_reduction = weekend * (0.02 + tightness * 0.03)
+
+    raw_capacity = base_capacity * (1 - peak_reduction - weekend_reduction)
+    noise = (0.025 + tightness * 0.02) * draw_zone_noise(rng, zones, "capacity", hours)
+    shock_mult = np.clip(1.0 + noise, 0.88, 1.10)
+
+    effective = raw_capacity * shock_mult
+    overlay = event_overlay(events, "capacity", time_df, zones)
+    if overlay is not None:
+        effective = effective * overlay
+    effective = np.clip(effective, 8, None)
+    return np.round(effective).astype(int)
 
 
 def generate_base_demand(
     time_df: pd.DataFrame,
     profiles: dict,
     cal_mult_df: pd.DataFrame,
-    rng: np.random.Generator,
-) -> pd.DataFrame:
-    """Zone-segment-hour base demand before pricing action effects."""
-    merged_time = time_df.merge(cal_mult_df, on="timestamp", how="left")
-    rows = []
-
-    for zone in ZONES:
-        p = profiles[zone]
-        zone_base = p["base_demand"]
-        vol = p["volatility"]
-
-        demand_level = (
-            zone_base
-            * merged_time["hour_curve_mult"].values
-            * merged_time["dow_mult"].values
-            * merged_time["monthly_mult"].values
-            * merged_time["seasonal_mult"].values
-        )
+    rng: RngSource,
+    events: dict | None = None,
+) -> np.ndarray:
+    """Zone-segment-hour base demand before pricing action effects, shaped (hours, zones, segments).
+
+    events (from index_events) overlays weather and promotion multipliers on the noisy demand.
+    """
+    zones = list(profiles)
+    segments = profile_segments(profiles)
+    hours = len(time_df)
+    zone_base = np.array([profiles[z]["base_demand"] for z in zones], dtype=float)
+    vol = np.array([profiles[z]["volatility"] for z in zones], dtype=float)
+    seg_share = np.array([[profiles[z]["segment_mix"][s] for s in segments] for z in zones], dtype=float)
+
+    demand_level = (
+        zone_base
+        * cal_mult_df["hour_curve_mult"].values[:, None]
+        * cal_mult_df["dow_mult"].values[:, None]
+        * cal_mult_df["monthly_mult"].values[:, None]
+        * cal_mult_df["seasonal_mult"].values[:, None]
+    )
 
-        # Bounded noise keeps data realistic without being chaotic.
-        noise = rng.normal(0, vol, size=len(merged_time))
-        noise = np.clip(noise, -0.22, 0.22)
-        zone_demand = np.clip(demand_level * (1 + noise), 1.0, None)
-
-        for segment in SEGMENTS:
-            seg_share = p["segment_mix"][segment]
-            seg_noise = rng.normal(0, vol * 0.35, size=len(merged_time))
-            seg_noise = np.clip(seg_noise, -0.10, 0.10)
-
-            seg_base = np.clip(zone_demand * seg_share * (1 + seg_noise), 0.2, None)
-
-            rows.append(
-                pd.DataFrame(
-                    {
-                        "timestamp": merged_time["timestamp"],
-                        "date": merged_time["date"],
-                        "hour": merged_time["hour"],
-                        "day_of_week": merged_time["day_of_week"],
-                        "zone_id": zone,
-                        "segment_id": segment,
-                        "base_demand": seg_base,
-                    }
-                )
-            )
+    # The shared generator interleaves each zone's noise with its segment noise, as the
+    # original per-zone loop did; zone streams keep one stream per zone and zone-segment.
+    if isinstance(rng, np.random.Generator):
+        std = rng.standard_normal((len(zones), 1 + len(segments), hours))
+        zone_std, seg_std = std[:, 0, :].T, np.moveaxis(std[:, 1:, :], 2, 0)
+    else:
+        zone_std = draw_zone_noise(rng, zones, "demand", hours)
+        seg_std = draw_series_noise(rng, zones, segments, "segment", hours, lambda gen, shape: gen.standard_normal(shape))
 
-    return pd.concat(rows, ignore_index=True)
+    # Bounded noise keeps data realistic without being chaotic.
+    noise = np.clip(vol * zone_std, -0.22, 0.22)
+    zone_demand = np.clip(demand_level * (1 + noise), 1.0, None)
+
+    seg_noise = np.clip((vol * 0.35)[:, None] * seg_std, -0.10, 0.10)
+    demand = zone_demand[:, :, None] * seg_share * (1 + seg_noise)
+    overlay = event_overlay(events, "demand", time_df, zones, segments)
+    if overlay is not None:
+        demand = demand * overlay
+    return np.clip(demand, 0.2, None)
 
 
 def choose_action(pressure: float, hour: int, segment: str, rng: np.random.Generator) -> tuple[str, float, str]:
@@ -276,187 +626,780 @@ def choose_action(pressure: float, hour: int, segment: str, rng: np.random.Gener
     return action, change, reason
 
 
-def generate_pricing_actions(
-    demand_df: pd.DataFrame,
-    capacity_df: pd.DataFrame,
-    rng: np.random.Generator,
-) -> pd.DataFrame:
-    """Generate hourly pricing actions per zone and segment."""
-    zone_hour_demand = (
-        demand_df.groupby(["timestamp", "zone_id"], as_index=False)["base_demand"].sum().rename(columns={"base_demand": "zone_base_demand"})
-    )
+ACTION_TYPES = ["SURGE", "DISCOUNT", "NO_CHANGE"]
+DECISION_REASONS = ["CAPACITY_TIGHT", "YIELD_OPTIMIZATION", "DEMAND_STIMULUS", "SEGMENT_INCENTIVE", "NO_MATERIAL_SIGNAL"]
+ACTION_CODES = {action: i for i, action in enumerate(ACTION_TYPES)}
+REASON_CODES = {reason: i for i, reason in enumerate(DECISION_REASONS)}
+PEAK_HOURS = [11, 12, 13, 18, 19, 20]
+SURGE_CHANGE_RANGE = (0.03, 0.20)
+DISCOUNT_CHANGE_RANGE = (-0.25, -0.04)
 
-    pressure_df = zone_hour_demand.merge(capacity_df, on=["timestamp", "zone_id"], how="left")
-    pressure_df["pressure"] = pressure_df["zone_base_demand"] / pressure_df["max_hourly_capacity"].clip(lower=1)
+# Seed modes for pricing-action sampling. Both are reproducible for a fixed SEED:
+# - "batched" draws every action and magnitude with one array-wide RNG call.
+# - "row" replays choose_action row by row and matches outputs generated before the batched sampler.
+SAMPLER_MODES = ("batched", "row")
 
-    merged = demand_df[["timestamp", "zone_id", "segment_id", "hour"]].merge(
-        pressure_df[["timestamp", "zone_id", "pressure"]],
-        on=["timestamp", "zone_id"],
-        how="left",
-    )
 
-    actions = []
-    for row in merged.itertuples(index=False):
-        action_type, pct_change, reason = choose_action(
-            pressure=float(row.pressure),
-            hour=int(row.hour),
-            segment=str(row.segment_id),
-            rng=rng,
-        )
-        actions.append((action_type, pct_change, 1.0 + pct_change, reason))
+def action_probabilities(pressure: np.ndarray, hour: np.ndarray, segment: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized SURGE/DISCOUNT/NO_CHANGE probabilities, mirroring choose_action."""
+    peak_hour = np.isin(hour, PEAK_HOURS)
 
-    action_df = pd.DataFrame(
-        actions,
-        columns=["action_type", "price_change_pct", "price_multiplier", "decision_reason"],
+    conditions = [pressure >= 1.10, pressure >= 0.97, pressure <= 0.70, pressure <= 0.85]
+    p_surge = np.select(
+        conditions,
+        [np.where(peak_hour, 0.52, 0.38), np.where(peak_hour, 0.18, 0.10), 0.01, 0.03],
+        default=0.04,
+    )
+    p_discount = np.select(
+        conditions,
+        [np.where(peak_hour, 0.02, 0.03), np.where(peak_hour, 0.05, 0.07), 0.42, 0.24],
+        default=0.08,
     )
 
-    out = pd.concat(
-        [merged[["timestamp", "zone_id", "segment_id"]].reset_index(drop=True), action_df], axis=1
+    is_value = segment == "value"
+    is_premium = segment == "premium"
+    p_discount = np.where(is_value, p_discount + 0.05, np.where(is_premium, p_discount - 0.05, p_discount))
+    p_surge = np.where(is_value, p_surge - 0.01, np.where(is_premium, p_surge + 0.02, p_surge))
+
+    p_surge = np.clip(p_surge, 0.0, 0.80)
+    p_discount = np.clip(p_discount, 0.0, 0.80)
+    p_no_change = np.maximum(0.0, 1.0 - p_surge - p_discount)
+    return p_surge, p_discount, p_no_change
+
+
+def sample_pricing_actions(
+    pressure: np.ndarray,
+    hour: np.ndarray,
+    segment: np.ndarray,
+    draws: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Batched equivalent of choose_action, given one uniform pair per row (e.g. rng.random((n, 2))).
+
+    Returns ACTION_TYPES codes, price changes, and DECISION_REASONS codes.
+    """
+    p_surge, p_discount, p_no_change = action_probabilities(pressure, hour, segment)
+
+    # Same inverse-CDF rule as Generator.choice, applied to all rows at once.
+    total = p_surge + p_discount + p_no_change
+    cdf_surge = p_surge / total
+    cdf_discount = (p_surge + p_discount) / total
+
+    action_idx = (draws[:, 0] >= cdf_surge).astype(np.int8) + (draws[:, 0] >= cdf_discount)
+    is_surge = action_idx == 0
+    is_discount = action_idx == 1
+
+    surge_low, surge_high = SURGE_CHANGE_RANGE
+    discount_low, discount_high = DISCOUNT_CHANGE_RANGE
+    change = np.where(
+        is_surge,
+        surge_low + (surge_high - surge_low) * draws[:, 1],
+        np.where(is_discount, discount_low + (discount_high - discount_low) * draws[:, 1], 0.0),
     )
-    return out
+    reason_idx = np.select(
+        [is_surge & (pressure >= 1.0), is_surge, is_discount & (pressure <= 0.9), is_discount],
+        [
+            REASON_CODES["CAPACITY_TIGHT"],
+            REASON_CODES["YIELD_OPTIMIZATION"],
+            REASON_CODES["DEMAND_STIMULUS"],
+            REASON_CODES["SEGMENT_INCENTIVE"],
+        ],
+        default=REASON_CODES["NO_MATERIAL_SIGNAL"],
+    ).astype(np.int8)
+    return action_idx, change, reason_idx
+
+
+def generate_pricing_actions(
+    base_demand: np.ndarray,
+    capacity: np.ndarray,
+    time_df: pd.DataFrame,
+    profiles: dict,
+    rng: RngSource,
+    sampler: str = "batched",
+) -> dict:
+    """Generate hourly pricing actions per zone and segment as (hours, zones, segments) arrays."""
+    if sampler not in SAMPLER_MODES:
+        raise ValueError(f"Unknown sampler '{sampler}'. Expected one of {SAMPLER_MODES}.")
+
+    zones = list(profiles)
+    segments = profile_segments(profiles)
+    hours = len(time_df)
+
+    zone_base_demand = segment_sum(base_demand)
+    pressure = zone_base_demand / np.clip(capacity, 1, None)
+
+    shape = base_demand.shape
+    pressure_grid = np.broadcast_to(pressure[:, :, None], shape)
+    hour_grid = np.broadcast_to(time_df["hour"].values[:, None, None], shape)
+    segment_grid = np.broadcast_to(np.array(segments)[None, None, :], shape)
+
+    if sampler == "batched":
+        draws = draw_series_noise(rng, zones, segments, "action", hours, lambda gen, shape: gen.random(shape + (2,)))
+        action_idx, pct_change, reason_idx = sample_pricing_actions(
+            pressure_grid.ravel(), hour_grid.ravel(), segment_grid.ravel(), draws.reshape(-1, 2)
+        )
+        action_idx, pct_change, reason_idx = (a.reshape(shape) for a in (action_idx, pct_change, reason_idx))
+    else:
+        action_idx = np.empty(shape, dtype=np.int8)
+        pct_change = np.empty(shape)
+        reason_idx = np.empty(shape, dtype=np.int8)
+        # Row mode walks rows in the long-table order (zone, segment, hour) of earlier releases.
+        for z, zone in enumerate(zones):
+            for s, segment in enumerate(segments):
+                gen = stream_for(rng, zone, f"action:{segment}")
+                for h in range(hours):
+                    action_type, change, reason = choose_action(
+                        pressure=float(pressure[h, z]),
+                        hour=int(hour_grid[h, z, s]),
+                        segment=segment,
+                        rng=gen,
+                    )
+                    action_idx[h, z, s] = ACTION_CODES[action_type]
+                    pct_change[h, z, s] = change
+                    reason_idx[h, z, s] = REASON_CODES[reason]
+
+    return {
+        "action_idx": action_idx,
+        "price_change_pct": pct_change,
+        "price_multiplier": 1.0 + pct_change,
+        "reason_idx": reason_idx,
+    }
 
 
 def apply_pricing_to_demand(
-    demand_df: pd.DataFrame,
-    pricing_df: pd.DataFrame,
-    rng: np.random.Generator,
-) -> pd.DataFrame:
+    base_demand: np.ndarray,
+    pricing: dict,
+    profiles: dict,
+    rng: RngSource,
+) -> np.ndarray:
     """Apply elastic and noisy demand response to pricing actions."""
-    df = demand_df.merge(
-        pricing_df,
-        on=["timestamp", "zone_id", "segment_id"],
-        how="left",
-    )
+    zones = list(profiles)
+    segments = profile_segments(profiles)
+    hours = base_demand.shape[0]
 
-    elasticity = df["segment_id"].map(SEGMENT_ELASTICITY).values
-    pct_change = df["price_change_pct"].values
+    elasticity = np.array([SEGMENT_ELASTICITY[s] for s in segments])
+    pct_change = pricing["price_change_pct"]
 
     # Directional but not perfectly linear response to pricing.
     nonlinear_term = -0.45 * (pct_change ** 2)
     deterministic = np.exp(elasticity * pct_change + nonlinear_term)
 
     noise_scale_map = {"value": 0.06, "balanced": 0.05, "premium": 0.04}
-    noise_scale = df["segment_id"].map(noise_scale_map).values
-    response_noise = rng.normal(0, noise_scale, size=len(df))
-    response_noise = np.clip(response_noise, -0.12, 0.12)
+    noise_scale = np.array([noise_scale_map[s] for s in segments])
+    response_std = draw_series_noise(rng, zones, segments, "response", hours, lambda gen, shape: gen.standard_normal(shape))
+    response_noise = np.clip(noise_scale * response_std, -0.12, 0.12)
 
     response_factor = np.clip(deterministic * (1 + response_noise), 0.55, 1.45)
-    df["final_demand"] = np.clip(df["base_demand"] * response_factor, 0.0, None)
-
-    return df
+    return np.clip(base_demand * response_factor, 0.0, None)
 
 
 def build_capacity_ops_fact(
-    demand_priced_df: pd.DataFrame,
-    capacity_base_df: pd.DataFrame,
-) -> pd.DataFrame:
-    """Create hourly zone-level capacity and stress signals."""
-    incoming = (
-        demand_priced_df.groupby(["timestamp", "zone_id"], as_index=False)["final_demand"]
-        .sum()
-        .rename(columns={"final_demand": "incoming_order_requests"})
-    )
-    incoming["incoming_order_requests"] = incoming["incoming_order_requests"].round().astype(int)
-
-    fact = capacity_base_df.merge(incoming, on=["timestamp", "zone_id"], how="left")
-    fact["incoming_order_requests"] = fact["incoming_order_requests"].fillna(0).astype(int)
+    final_demand: np.ndarray,
+    capacity: np.ndarray,
+    time_df: pd.DataFrame,
+) -> dict:
+    """Create hourly zone-level capacity and stress signals as (hours, zones) arrays."""
+    incoming = np.round(segment_sum(final_demand)).astype(int)
 
-    fact["utilization_rate"] = (
-        fact["incoming_order_requests"] / fact["max_hourly_capacity"].clip(lower=1)
-    )
-    fact["capacity_breach_flag"] = (fact["incoming_order_requests"] > fact["max_hourly_capacity"]).astype(int)
+    utilization_rate = incoming / np.clip(capacity, 1, None)
+    capacity_breach_flag = (incoming > capacity).astype(int)
 
-    hour = fact["timestamp"].dt.hour
-    peak_flag = hour.isin([11, 12, 13, 18, 19, 20]).astype(float)
+    peak_flag = np.isin(time_df["hour"].values, PEAK_HOURS).astype(float)[:, None]
 
     # Stress combines utilization and peak congestion into a bounded operational indicator.
-    stress_raw = 55 * fact["utilization_rate"] + 18 * peak_flag + 8 * fact["capacity_breach_flag"]
-    fact["stress_index"] = np.clip(stress_raw, 0, 100).round(2)
+    stress_raw = 55 * utilization_rate + 18 * peak_flag + 8 * capacity_breach_flag
+    stress_index = np.round(np.clip(stress_raw, 0, 100), 2)
 
-    return fact[
-        [
-            "timestamp",
-            "zone_id",
-            "max_hourly_capacity",
-            "incoming_order_requests",
-            "utilization_rate",
-            "capacity_breach_flag",
-            "stress_index",
-        ]
-    ]
+    return {
+        "max_hourly_capacity": capacity,
+        "incoming_order_requests": incoming,
+        "utilization_rate": utilization_rate,
+        "capacity_breach_flag": capacity_breach_flag,
+        "stress_index": stress_index,
+    }
 
 
 def build_orders_fact(
-    demand_priced_df: pd.DataFrame,
-    capacity_fact: pd.DataFrame,
-    rng: np.random.Generator,
-) -> pd.DataFrame:
-    """Create final orders table with capacity-capped fulfillment and delivery delay."""
-    df = demand_priced_df.merge(
-        capacity_fact[["timestamp", "zone_id", "max_hourly_capacity", "utilization_rate", "stress_index"]],
-        on=["timestamp", "zone_id"],
-        how="left",
-    )
-
-    req_int = np.round(df["final_demand"]).astype(int)
-    incoming = df.groupby(["timestamp", "zone_id"])["final_demand"].transform("sum").round()
+    final_demand: np.ndarray,
+    pricing: dict,
+    capacity_ops: dict,
+    profiles: dict,
+    rng: RngSource,
+) -> dict:
+    """Create final orders arrays with capacity-capped fulfillment and delivery delay."""
+    zones = list(profiles)
+    segments = profile_segments(profiles)
+    hours = final_demand.shape[0]
+
+    req_int = np.round(final_demand).astype(int)
+    incoming = np.round(segment_sum(final_demand))
     # Capacity ratio enforces zone-hour caps while preserving segment mix.
-    fill_ratio = np.minimum(1.0, df["max_hourly_capacity"] / incoming.replace(0, 1))
-    completed = np.floor(req_int * fill_ratio).astype(int)
+    fill_ratio = np.minimum(1.0, capacity_ops["max_hourly_capacity"] / np.where(incoming == 0, 1, incoming))
+    completed = np.floor(req_int * fill_ratio[:, :, None]).astype(int)
     lost = np.maximum(req_int - completed, 0)
 
-    allocated = df.copy()
-    allocated["orders_completed"] = completed
-    allocated["orders_lost_capacity"] = lost
+    utilization = np.clip(capacity_ops["utilization_rate"], 0, 1.8)[:, :, None]
+    base_delay = 14 + 8 * utilization + 0.12 * capacity_ops["stress_index"][:, :, None]
+    seg_delay_adj = np.array([SEGMENT_DELAY_ADJ[s] for s in segments])
+    delay_noise = 1.2 * draw_series_noise(rng, zones, segments, "delay", hours, lambda gen, shape: gen.standard_normal(shape))
 
-    base_delay = 14 + 8 * allocated["utilization_rate"].clip(lower=0, upper=1.8) + 0.12 * allocated["stress_index"]
-    seg_delay_adj = allocated["segment_id"].map(SEGMENT_DELAY_ADJ).values
-    delay_noise = rng.normal(0, 1.2, size=len(allocated))
+    avg_value = np.array([SEGMENT_AVG_ORDER_VALUE[s] for s in segments])
 
-    allocated["avg_delivery_delay_min"] = np.clip(base_delay + seg_delay_adj + delay_noise, 8, 75).round(2)
+    return {
+        "final_demand": final_demand,
+        "orders_completed": completed,
+        "orders_lost_capacity": lost,
+        "avg_delivery_delay_min": np.round(np.clip(base_delay + seg_delay_adj + delay_noise, 8, 75), 2),
+        "gross_revenue_est": np.round(completed * avg_value * pricing["price_multiplier"], 2),
+    }
 
-    avg_value = allocated["segment_id"].map(SEGMENT_AVG_ORDER_VALUE)
-    allocated["gross_revenue_est"] = (
-        allocated["orders_completed"] * avg_value * allocated["price_multiplier"]
-    ).round(2)
 
-    return allocated[
-        [
-            "timestamp",
-            "date",
-            "hour",
-            "day_of_week",
-            "zone_id",
-            "segment_id",
-            "base_demand",
-            "price_multiplier",
-            "final_demand",
-            "orders_completed",
-            "orders_lost_capacity",
-            "avg_delivery_delay_min",
-            "gross_revenue_est",
-        ]
-    ]
+def sample_zone_order_events(
+    timestamps: np.ndarray,
+    rates: np.ndarray,
+    price_multiplier: np.ndarray,
+    capacity: np.ndarray,
+    streams: dict,
+) -> dict:
+    """Order events for one zone: Poisson counts per segment-hour, uniform arrival offsets.
+
+    rates and price_multiplier are (hours, segments); capacity is (hours,). Capacity is
+    served first come, first served across segments, so within each hour the first
+    `capacity` arrivals are fulfilled and the rest are lost. Events come back in arrival order.
+    """
+    n_segments = rates.shape[1]
+    counts = streams["count"].poisson(rates).ravel()
+    cell = np.repeat(np.arange(counts.size), counts)
+    offsets = streams["offset"].random(cell.size)
+
+    order = np.lexsort((offsets, cell // n_segments))
+    cell, offsets = cell[order], offsets[order]
+    hour_idx, seg_idx = np.divmod(cell, n_segments)
+    rank = np.arange(cell.size) - np.searchsorted(hour_idx, hour_idx, side="left")
+
+    return {
+        "timestamp": timestamps[hour_idx],
+        "arrival_ts": timestamps[hour_idx] + (offsets * 3_600_000_000).astype("timedelta64[us]"),
+        "segment_idx": seg_idx,
+        "price_multiplier": price_multiplier.ravel()[cell],
+        "fulfilled": (rank < capacity[hour_idx]).astype(np.int8),
+    }
+
+
+def write_order_events(
+    writer: TableWriter,
+    orders_df: pd.DataFrame,
+    capacity_df: pd.DataFrame,
+    streams: dict,
+    batch_rows: int = ORDER_EVENT_BATCH_ROWS,
+) -> dict:
+    """Expand one chunk of hourly orders into order events and stream them to the writer.
+
+    Rates are the hourly final_demand, so event counts match the aggregates in expectation.
+    Hours are cut into blocks of about `batch_rows` expected events; each block is sampled
+    and written before the next, so memory stays bounded however long the chunk is. Rows
+    are ordered by zone, then arrival time within each block.
+    """
+    # Both tables are laid out zone, [segment,] time, so first appearance gives axis order.
+    zones = list(pd.unique(capacity_df["zone_id"].to_numpy()))
+    segments = list(pd.unique(orders_df["segment_id"].to_numpy()))
+    timestamps = capacity_df["timestamp"].to_numpy()[: len(capacity_df) // len(zones)].astype("datetime64[us]")
+    hours = len(timestamps)
+    shape = (len(zones), len(segments), hours)
+
+    rates = np.moveaxis(orders_df["final_demand"].to_numpy().reshape(shape), 2, 0)
+    price_multiplier = np.moveaxis(orders_df["price_multiplier"].to_numpy().reshape(shape), 2, 0)
+    capacity = capacity_df["max_hourly_capacity"].to_numpy().reshape(len(zones), hours).T
+
+    expected = np.cumsum(rates.sum(axis=(1, 2)))
+    cuts = np.searchsorted(expected, np.arange(batch_rows, expected[-1], batch_rows))
+    bounds = np.unique(np.concatenate([[0], cuts + 1, [hours]]).clip(max=hours))
+
+    stats = {"rows": 0, "fulfilled": 0}
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        parts, zone_codes = [], []
+        for z, zone in enumerate(zones):
+            part = sample_zone_order_events(
+                timestamps[lo:hi], rates[lo:hi, z], price_multiplier[lo:hi, z], capacity[lo:hi, z], streams[zone]
+            )
+            parts.append(part)
+            zone_codes.append(np.full(part["segment_idx"].size, z))
+
+        events = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+        segment_idx = events.pop("segment_idx")
+        frame = pd.DataFrame(
+            {
+                "timestamp": events["timestamp"],
+                "arrival_ts": events["arrival_ts"],
+                "zone_id": pd.Categorical.from_codes(np.concatenate(zone_codes), categories=zones),
+                "segment_id": pd.Categorical.from_codes(segment_idx, categories=segments),
+                "price_multiplier": events["price_multiplier"],
+                "fulfilled": events["fulfilled"],
+            }
+        )
+        writer.write(frame)
+        stats["rows"] += len(frame)
+        stats["fulfilled"] += int(frame["fulfilled"].sum())
+    return stats
+
+
+def zone_frame(time_df: pd.DataFrame, zones: list[str], columns: dict) -> pd.DataFrame:
+    """Export (hours, zones) arrays as a long zone-hour table ordered by zone, then time."""
+    hours = len(time_df)
+    frame = {
+        "timestamp": np.tile(time_df["timestamp"].values, len(zones)),
+        "zone_id": pd.Categorical.from_codes(np.repeat(np.arange(len(zones)), hours), categories=zones),
+    }
+    for name, values in columns.items():
+        frame[name] = values.T.ravel()
+    return pd.DataFrame(frame)
+
+
+def series_frame(
+    time_df: pd.DataFrame,
+    zones: list[str],
+    segments: list[str],
+    columns: dict,
+    time_columns: tuple = ("timestamp",),
+    categories: dict | None = None,
+) -> pd.DataFrame:
+    """Export (hours, zones, segments) arrays as a long table ordered by zone, segment, then time.
+
+    Columns listed in `categories` hold integer codes and are exported as categoricals.
+    """
+    categories = categories or {}
+    hours = len(time_df)
+    n_series = len(zones) * len(segments)
+    frame = {col: np.tile(time_df[col].values, n_series) for col in time_columns}
+    frame["zone_id"] = pd.Categorical.from_codes(np.repeat(np.arange(len(zones)), len(segments) * hours), categories=zones)
+    frame["segment_id"] = pd.Categorical.from_codes(
+        np.tile(np.repeat(np.arange(len(segments)), hours), len(zones)), categories=segments
+    )
+    for name, values in columns.items():
+        long_values = np.transpose(values, (1, 2, 0)).ravel()
+        if name in categories:
+            long_values = pd.Categorical.from_codes(long_values, categories=categories[name])
+        frame[name] = long_values
+    return pd.DataFrame(frame)
+
+
+def open_fact_writers(output_dir: Path, fmt: str | None = None, append: bool = False) -> dict:
+    """Open chunk writers for the three fact tables in the shared storage format."""
+    return {name: TableWriter(name, output_dir, fmt=fmt, append=append) for name in FACT_TABLES}
 
 
 def save_outputs(
     orders_df: pd.DataFrame,
     capacity_df: pd.DataFrame,
     pricing_df: pd.DataFrame,
+    writers: dict,
+) -> None:
+    """Append one chunk of each fact table through the storage writers."""
+    writers["fact_orders"].write(orders_df)
+    writers["fact_capacity_ops"].write(capacity_df)
+    writers["fact_pricing_actions"].write(pricing_df)
+
+
+def generate_chunk(
+    time_df: pd.DataFrame,
+    profiles: dict,
+    rng: RngSource,
+    sampler: str = "batched",
+    cal_mult_df: pd.DataFrame | None = None,
+    events: dict | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Generate orders, capacity, and pricing fact rows for one slice of the timeline.
+
+    Everything is computed on dense (hours, zones[, segments]) arrays; zone totals are axis
+    sums and zone-to-segment joins are broadcasts. Long tables are built only for export.
+    """
+    zones = list(profiles)
+    segments = profile_segments(profiles)
+    if cal_mult_df is None:
+        cal_mult_df = calendar_multipliers(time_df)
+
+    capacity = generate_capacity_base(time_df, profiles, rng, events=events)
+    base_demand = generate_base_demand(time_df, profiles, cal_mult_df, rng, events=events)
+
+    pricing = generate_pricing_actions(base_demand, capacity, time_df, profiles, rng, sampler=sampler)
+    final_demand = apply_pricing_to_demand(base_demand, pricing, profiles, rng)
+
+    capacity_ops = build_capacity_ops_fact(final_demand, capacity, time_df)
+    orders = build_orders_fact(final_demand, pricing, capacity_ops, profiles, rng)
+
+    capacity_fact_df = zone_frame(time_df, zones, capacity_ops)
+    pricing_actions_df = series_frame(
+        time_df,
+        zones,
+        segments,
+        {
+            "action_type": pricing["action_idx"],
+            "price_change_pct": pricing["price_change_pct"],
+            "price_multiplier": pricing["price_multiplier"],
+            "decision_reason": pricing["reason_idx"],
+        },
+        categories={"action_type": ACTION_TYPES, "decision_reason": DECISION_REASONS},
+    )
+    orders_fact_df = series_frame(
+        time_df,
+        zones,
+        segments,
+        {
+            "base_demand": base_demand,
+            "price_multiplier": pricing["price_multiplier"],
+            "final_demand": orders["final_demand"],
+            "orders_completed": orders["orders_completed"],
+            "orders_lost_capacity": orders["orders_lost_capacity"],
+            "avg_delivery_delay_min": orders["avg_delivery_delay_min"],
+            "gross_revenue_est": orders["gross_revenue_est"],
+        },
+        time_columns=("timestamp", "date", "hour", "day_of_week"),
+    )
+    return orders_fact_df, capacity_fact_df, pricing_actions_df
+
+
+def summarize_chunk(
+    summary: dict,
+    orders_df: pd.DataFrame,
+    capacity_df: pd.DataFrame,
+    pricing_df: pd.DataFrame,
+) -> dict:
+    """Fold one chunk into running validation counts so full tables never need to be kept."""
+    summary["orders_rows"] = summary.get("orders_rows", 0) + len(orders_df)
+    summary["capacity_rows"] = summary.get("capacity_rows", 0) + len(capacity_df)
+    summary["pricing_rows"] = summary.get("pricing_rows", 0) + len(pricing_df)
+    summary["breach_hours"] = summary.get("breach_hours", 0) + int(capacity_df["capacity_breach_flag"].sum())
+
+    action_counts = summary.setdefault("action_counts", {})
+    for action, count in pricing_df["action_type"].value_counts().items():
+        action_counts[action] = action_counts.get(action, 0) + int(count)
+    return summary
+
+
+def _generate_shard_chunk(task: tuple) -> tuple:
+    """Process-pool entry point: generate one zone shard for one time chunk."""
+    time_df, cal_mult_df, shard_profiles, shard_streams, sampler, events = task
+    orders_df, capacity_df, pricing_df = generate_chunk(
+        time_df, shard_profiles, shard_streams, sampler=sampler, cal_mult_df=cal_mult_df, events=events
+    )
+    # Advanced generator states travel back so the next chunk continues each stream.
+    return orders_df, capacity_df, pricing_df, shard_streams
+
+
+def generate_dataset(
+    profiles: dict,
+    start_ts: str,
+    days: int,
+    chunk_days: int,
+    rng: RngSource,
+    output_dir: Path,
+    sampler: str = "batched",
+    workers: int = 1,
+    shard_zones: int = 64,
+    storage_format: str | None = None,
+    append: bool = False,
+    calendar_chunks: list | None = None,
+    events: dict | None = None,
+    arrival_streams: dict | None = None,
+    order_event_batch_rows: int = ORDER_EVENT_BATCH_ROWS,
+) -> dict:
+    """Stream the timeline chunk by chunk, appending each chunk's fact rows to the outputs.
+
+    Peak memory depends on zones x chunk_days, not on the full horizon. With zone streams
+    (a dict from spawn_zone_streams) zones are split into fixed-size shards that run in a
+    process pool; shard results are written in zone order, so the files are byte-identical
+    for any worker count. append=True continues existing tables instead of replacing them.
+    calendar_chunks (from build_calendar_chunks) skips rebuilding the calendar per run, and
+    events (from index_events) overlays an event catalog on capacity and demand.
+    arrival_streams (from spawn_arrival_streams) also streams the order_events table.
+    """
+    summary: dict = {}
+    zones = list(profiles)
+    shards = [zones[i : i + shard_zones] for i in range(0, len(zones), shard_zones)]
+
+    if isinstance(rng, np.random.Generator) and workers > 1:
+        raise ValueError("Parallel generation requires per-zone streams from spawn_zone_streams().")
+
+    writers = open_fact_writers(output_dir, fmt=storage_format, append=append)
+    if arrival_streams is not None:
+        event_writer = TableWriter(ORDER_EVENTS_TABLE, output_dir, fmt=storage_format, append=append)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if calendar_chunks is None:
+            calendar_chunks = build_calendar_chunks(start_ts, days, chunk_days)
+        for time_df, cal_mult_df in calendar_chunks:
+            if isinstance(rng, np.random.Generator):
+                orders_df, capacity_df, pricing_df = generate_chunk(
+                    time_df, profiles, rng, sampler=sampler, cal_mult_df=cal_mult_df, events=events
+                )
+            else:
+                tasks = [
+                    (time_df, cal_mult_df, {z: profiles[z] for z in shard}, {z: rng[z] for z in shard}, sampler, events)
+                    for shard in shards
+                ]
+                results = list(executor.map(_generate_shard_chunk, tasks) if executor else map(_generate_shard_chunk, tasks))
+                for *_, shard_streams in results:
+                    rng.update(shard_streams)
+                orders_df = pd.concat([r[0] for r in results], ignore_index=True)
+                capacity_df = pd.concat([r[1] for r in results], ignore_index=True)
+                pricing_df = pd.concat([r[2] for r in results], ignore_index=True)
+
+            save_outputs(orders_df, capacity_df, pricing_df, writers)
+            summarize_chunk(summary, orders_df, capacity_df, pricing_df)
+            if arrival_streams is not None:
+                stats = write_order_events(event_writer, orders_df, capacity_df, arrival_streams, order_event_batch_rows)
+                summary["order_event_rows"] = summary.get("order_event_rows", 0) + stats["rows"]
+                summary["order_events_fulfilled"] = summary.get("order_events_fulfilled", 0) + stats["fulfilled"]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return summary
+
+
+def export_rng_state(rng: RngSource) -> dict:
+    """Serializable bit-generator state for the shared generator or every zone stream."""
+    if isinstance(rng, np.random.Generator):
+        return {"kind": "shared", "state": rng.bit_generator.state}
+    return {
+        "kind": "zone",
+        "state": {zone: {purpose: gen.bit_generator.state for purpose, gen in streams.items()} for zone, streams in rng.items()},
+    }
+
+
+def _generator_from_state(state: dict) -> np.random.Generator:
+    bit_generator = getattr(np.random, state["bit_generator"])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def restore_rng_state(saved: dict) -> RngSource:
+    """Rebuild the generator(s) exactly where export_rng_state left them."""
+    if saved["kind"] == "shared":
+        return _generator_from_state(saved["state"])
+    return {
+        zone: {purpose: _generator_from_state(state) for purpose, state in streams.items()}
+        for zone, streams in saved["state"].items()
+    }
+
+
+def save_generator_state(
     output_dir: Path,
+    config: dict,
+    rng: RngSource,
+    next_timestamp: pd.Timestamp,
+    arrival_streams: dict | None = None,
 ) -> None:
-    """Write output CSV files."""
-    output_dir.mkdir(parents=True, exist_ok=True)
+    """Persist run config, the next timestamp, and RNG state so a later run can extend the history."""
+    state = {
+        "config": config,
+        "next_timestamp": str(next_timestamp),
+        "rng": export_rng_state(rng),
+    }
+    if arrival_streams is not None:
+        state["arrival_rng"] = export_rng_state(arrival_streams)
+    with open(Path(output_dir) / STATE_FILE, "w") as fh:
+        json.dump(state, fh)
 
-    orders_df.to_csv(output_dir / "fact_orders.csv", index=False)
-    capacity_df.to_csv(output_dir / "fact_capacity_ops.csv", index=False)
-    pricing_df.to_csv(output_dir / "fact_pricing_actions.csv", index=False)
 
+def save_event_catalog(output_dir: Path, catalog: pd.DataFrame | None) -> bool:
+    """Keep the applied event catalog next to the outputs so extensions overlay the same events."""
+    path = Path(output_dir) / EVENT_CATALOG_FILE
+    if catalog is None or catalog.empty:
+        if path.exists():
+            path.unlink()
+        return False
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    catalog.to_csv(path, index=False)
+    return True
 
-def print_validation(orders_df: pd.DataFrame, capacity_df: pd.DataFrame, pricing_df: pd.DataFrame) -> None:
+
+def extend_dataset(
+    output_dir: Path,
+    days: int,
+    chunk_days: int | None = None,
+    workers: int = 1,
+    order_event_batch_rows: int = ORDER_EVENT_BATCH_ROWS,
+) -> dict:
+    """Append `days` more days to existing outputs, continuing the saved RNG state.
+
+    Only the new rows are generated and written, so cost scales with `days`, not with the
+    stored history. With zone streams the extended tables hold exactly the rows a single
+    longer run would have produced. Variant partitions continue on the variant profiles
+    saved with their state.
+    """
+    state_path = Path(output_dir) / STATE_FILE
+    if not state_path.exists():
+        raise FileNotFoundError(f"No {STATE_FILE} in {output_dir}; run a full generation first.")
+    with open(state_path) as fh:
+        state = json.load(fh)
+
+    config = state["config"]
+    next_timestamp = pd.Timestamp(state["next_timestamp"])
+    for name in FACT_TABLES:
+        last_timestamp = read_last_timestamp(name, output_dir, fmt=config["storage_format"])
+        if last_timestamp + pd.Timedelta(hours=1) != next_timestamp:
+            raise ValueError(
+                f"{name} ends at {last_timestamp}, but the saved generator state continues at {next_timestamp}."
+            )
+
+    if "profiles" in config:
+        profiles = config["profiles"]
+    else:
+        profiles = build_zone_profiles(config["zones"], config["segment_mix"], config["seed"])
+    rng = restore_rng_state(state["rng"])
+    events = index_events(load_event_catalog(Path(output_dir) / EVENT_CATALOG_FILE)) if config.get("events") else None
+    arrival_streams = restore_rng_state(state["arrival_rng"]) if config.get("order_events") else None
+
+    summary = generate_dataset(
+        profiles,
+        str(next_timestamp),
+        days,
+        chunk_days or days,
+        rng,
+        output_dir,
+        sampler=config["sampler"],
+        workers=workers,
+        shard_zones=config["shard_zones"],
+        storage_format=config["storage_format"],
+        append=True,
+        events=events,
+        arrival_streams=arrival_streams,
+        order_event_batch_rows=order_event_batch_rows,
+    )
+    save_generator_state(output_dir, config, rng, next_timestamp + pd.Timedelta(days=days), arrival_streams)
+    return summary
+
+
+# Multiplicative variant knobs and the zone-profile field each one scales.
+VARIANT_SCALES = {
+    "demand_scale": "base_demand",
+    "capacity_scale": "base_capacity",
+    "volatility_scale": "volatility",
+    "capacity_tightness_scale": "capacity_tightness",
+}
+VARIANT_KEYS = {"name", "seed", "segment_mix", "zone_overrides", *VARIANT_SCALES}
+
+
+def load_variants(path: Path) -> list[dict]:
+    """Load market variants from a JSON list.
+
+    Each entry needs a unique "name" and may set "seed", any of VARIANT_SCALES, a global
+    "segment_mix", and "zone_overrides" ({"zone_3": {"base_capacity": 55}}), e.g.
+    [{"name": "vol_150", "volatility_scale": 1.5}, {"name": "tight", "capacity_scale": 0.9}].
+    """
+    with open(path) as fh:
+        variants = json.load(fh)
+
+    names = set()
+    for variant in variants:
+        name = str(variant.get("name", ""))
+        if not name or not all(ch.isalnum() or ch in "-_." for ch in name):
+            raise ValueError(f"Variant names must be non-empty and use only letters, digits, '-', '_', '.': {name!r}")
+        if name in names:
+            raise ValueError(f"Duplicate variant name: {name}")
+        unknown = set(variant) - VARIANT_KEYS
+        if unknown:
+            raise ValueError(f"Variant '{name}' has unknown keys: {sorted(unknown)}")
+        names.add(name)
+    return variants
+
+
+def apply_variant(profiles: dict, variant: dict) -> dict:
+    """Return a copy of the zone profiles with one variant's scales and overrides applied."""
+    out = {}
+    for zone, p in profiles.items():
+        p = {**p, "segment_mix": dict(p["segment_mix"])}
+        for knob, field in VARIANT_SCALES.items():
+            if knob in variant:
+                p[field] = p[field] * variant[knob]
+        if "segment_mix" in variant:
+            total_share = sum(variant["segment_mix"].values())
+            p["segment_mix"] = {seg: share / total_share for seg, share in variant["segment_mix"].items()}
+        p.update(variant.get("zone_overrides", {}).get(zone, {}))
+        out[zone] = p
+    return out
+
+
+def variant_dir(output_dir: Path, name: str) -> Path:
+    """Partition directory holding one variant's fact tables."""
+    return Path(output_dir) / "variants" / f"variant={name}"
+
+
+def _generate_variant(task: tuple) -> tuple[str, dict]:
+    """Process-pool entry point: generate every chunk of one market variant."""
+    variant, profiles, config, calendar_chunks, catalog, output_dir = task
+    seed = variant.get("seed", config["seed"])
+    if config["rng_streams"] == "zone":
+        rng = spawn_zone_streams(seed, list(profiles))
+    else:
+        rng = np.random.default_rng(seed)
+
+    arrival_streams = spawn_arrival_streams(seed, list(profiles)) if config.get("order_events") else None
+
+    partition = variant_dir(output_dir, variant["name"])
+    summary = generate_dataset(
+        profiles,
+        config["start"],
+        config["days"],
+        config["chunk_days"],
+        rng,
+        partition,
+        sampler=config["sampler"],
+        shard_zones=config["shard_zones"],
+        storage_format=config["storage_format"],
+        calendar_chunks=calendar_chunks,
+        events=index_events(catalog) if catalog is not None else None,
+        arrival_streams=arrival_streams,
+    )
+    state_config = {
+        key: config[key] for key in ("zones", "sampler", "rng_streams", "shard_zones", "storage_format", "order_events")
+    }
+    # The variant's scales and overrides cannot be rebuilt from the zone count and seed, so
+    # the resolved profiles are saved for extensions to continue on.
+    state_config.update(
+        seed=seed,
+        segment_mix=variant.get("segment_mix", config["segment_mix"]),
+        events=save_event_catalog(partition, catalog),
+        profiles=profiles,
+    )
+    last_day = pd.Timestamp(config["start"]) + pd.Timedelta(days=config["days"])
+    save_generator_state(partition, state_config, rng, last_day, arrival_streams)
+    return variant["name"], summary
+
+
+def generate_variants(
+    variants: list[dict],
+    base_profiles: dict,
+    config: dict,
+    output_dir: Path,
+    workers: int = 1,
+    catalog: pd.DataFrame | None = None,
+) -> dict:
+    """Generate many market variants in one process pool, one output partition per variant.
+
+    The calendar (time table, hour curve, calendar multipliers) is built once and shared.
+    Variants reuse the base seed unless they set their own, so sweeps compare parameter
+    changes under common random numbers. An event catalog, if given, applies to every variant.
+    """
+    calendar_chunks = build_calendar_chunks(config["start"], config["days"], config["chunk_days"])
+    tasks = [
+        (variant, apply_variant(base_profiles, variant), config, calendar_chunks, catalog, output_dir)
+        for variant in variants
+    ]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_generate_variant, tasks))
+    else:
+        results = [_generate_variant(task) for task in tasks]
+    return dict(results)
+
+
+def print_validation(summary: dict) -> None:
     """Automatic sanity checks for generated synthetic data."""
-    action_pct = pricing_df["action_type"].value_counts(normalize=True).mul(100)
-    breach_pct = capacity_df["capacity_breach_flag"].mean() * 100
+    action_counts = summary.get("action_counts", {})
+    total_actions = max(sum(action_counts.values()), 1)
+    action_pct = {action: count / total_actions * 100 for action, count in action_counts.items()}
+    breach_pct = summary.get("breach_hours", 0) / max(summary.get("capacity_rows", 0), 1) * 100
     # Capacity breaches represent intentional peak-hour stress windows.
     # They are included to create realistic trade-offs between revenue,
     # service quality, and pricing decisions in downstream simulations.
@@ -464,9 +1407,11 @@ def print_validation(orders_df: pd.DataFrame, capacity_df: pd.DataFrame, pricing
     print("Synthetic data generation complete")
     print(f"Generated at: {datetime.now().isoformat(timespec='seconds')}")
     print("\nRow counts")
-    print(f"- fact_orders: {len(orders_df):,}")
-    print(f"- fact_capacity_ops: {len(capacity_df):,}")
-    print(f"- fact_pricing_actions: {len(pricing_df):,}")
+    print(f"- fact_orders: {summary.get('orders_rows', 0):,}")
+    print(f"- fact_capacity_ops: {summary.get('capacity_rows', 0):,}")
+    print(f"- fact_pricing_actions: {summary.get('pricing_rows', 0):,}")
+    if "order_event_rows" in summary:
+        print(f"- order_events: {summary['order_event_rows']:,}")
 
     print("\nPricing action distribution (%)")
     print(f"- SURGE: {action_pct.get('SURGE', 0.0):.2f}%")
@@ -475,27 +1420,193 @@ def print_validation(orders_df: pd.DataFrame, capacity_df: pd.DataFrame, pricing
 
     print("\nOperational sanity check")
     print(f"- Capacity breach hours: {breach_pct:.2f}%")
+    if summary.get("order_event_rows"):
+        fulfilled_pct = summary["order_events_fulfilled"] / summary["order_event_rows"] * 100
+        print(f"- Order events fulfilled: {fulfilled_pct:.2f}%")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate synthetic pricing, demand, and capacity fact tables.")
+    parser.add_argument("--seed", type=int, default=SEED, help="Seed for the shared random generator.")
+    parser.add_argument(
+        "--sampler",
+        choices=SAMPLER_MODES,
+        default="batched",
+        help="Pricing-action seed mode: 'batched' (fast, default) or 'row' (matches pre-batched outputs).",
+    )
+    parser.add_argument("--zones", type=int, default=len(ZONES), help="Number of zones to generate.")
+    parser.add_argument("--days", type=int, default=DAYS, help="Number of days in the generated horizon.")
+    parser.add_argument("--start", default=START_TIMESTAMP, help="First timestamp of the horizon.")
+    parser.add_argument(
+        "--segment-mix",
+        type=parse_segment_mix,
+        default=None,
+        help="Override every zone's segment shares, e.g. 'value=0.5,balanced=0.3,premium=0.2'.",
+    )
+    parser.add_argument(
+        "--chunk-days",
+        type=int,
+        default=None,
+        help="Generate and append the timeline in chunks of this many days to bound memory (default: one chunk).",
+    )
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Directory for the fact tables.")
+    parser.add_argument(
+        "--storage-format",
+        choices=STORAGE_FORMATS,
+        default=default_format(),
+        help="Fact table format; defaults to PRICING_STORAGE_FORMAT or Parquet when pyarrow is installed.",
+    )
+    parser.add_argument(
+        "--rng-streams",
+        choices=("shared", "zone"),
+        default="shared",
+        help="'shared' draws serially from one generator; 'zone' spawns independent per-zone streams.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for zone-stream generation. Output is identical for any worker count.",
+    )
+    parser.add_argument("--shard-zones", type=int, default=64, help="Zones per worker task in zone-stream mode.")
+    parser.add_argument(
+        "--events",
+        type=Path,
+        default=None,
+        help="Event catalog (CSV or JSON) of outages, weather spikes, and promotions to overlay.",
+    )
+    parser.add_argument(
+        "--random-events",
+        type=int,
+        default=0,
+        help="Add this many randomly placed outage/weather/promotion events (stress datasets).",
+    )
+    parser.add_argument(
+        "--order-events",
+        action="store_true",
+        help="Also stream an order-level order_events table sampled from the hourly demand rates.",
+    )
+    parser.add_argument(
+        "--order-event-batch-rows",
+        type=int,
+        default=ORDER_EVENT_BATCH_ROWS,
+        help="Approximate order events sampled and written per batch (bounds memory).",
+    )
+    parser.add_argument(
+        "--variants",
+        type=Path,
+        default=None,
+        help="JSON file of market variants to generate in batch, one partition each under <output-dir>/variants/.",
+    )
+    parser.add_argument(
+        "--extend-days",
+        type=int,
+        default=None,
+        help="Append this many days to the existing outputs using the saved generator state.",
+    )
+    args = parser.parse_args()
 
+    if args.extend_days is not None and args.extend_days < 1:
+        parser.error("--extend-days must be positive.")
 
-def main() -> None:
-    rng = np.random.default_rng(SEED)
-    profiles = zone_profiles()
+    if args.workers > 1 and args.rng_streams != "zone" and args.extend_days is None and args.variants is None:
+        parser.error("--workers > 1 requires --rng-streams zone.")
+    if args.workers < 1 or args.shard_zones < 1:
+        parser.error("--workers and --shard-zones must be positive.")
 
-    time_df = build_time_table(START_TIMESTAMP, HOURS)
-    cal_mult_df = calendar_multipliers(time_df)
+    if args.order_event_batch_rows < 1:
+        parser.error("--order-event-batch-rows must be positive.")
+    if args.random_events < 0:
+        parser.error("--random-events must be non-negative.")
+    if args.extend_days is not None and (args.events is not None or args.random_events):
+        parser.error("Extensions reuse the saved event catalog; --events and --random-events do not apply.")
 
-    capacity_base_df = generate_capacity_base(time_df, profiles, rng)
-    demand_base_df = generate_base_demand(time_df, profiles, cal_mult_df, rng)
+    if args.zones < 1 or args.days < 1:
+        parser.error("--zones and --days must be positive.")
+    if args.chunk_days is not None and args.chunk_days < 1:
+        parser.error("--chunk-days must be positive.")
+    return args
 
-    pricing_actions_df = generate_pricing_actions(demand_base_df, capacity_base_df, rng)
-    demand_priced_df = apply_pricing_to_demand(demand_base_df, pricing_actions_df, rng)
 
-    capacity_fact_df = build_capacity_ops_fact(demand_priced_df, capacity_base_df)
-    orders_fact_df = build_orders_fact(demand_priced_df, capacity_fact_df, rng)
+def main() -> None:
+    args = parse_args()
+    if args.extend_days is not None:
+        summary = extend_dataset(
+            args.output_dir,
+            args.extend_days,
+            chunk_days=args.chunk_days,
+            workers=args.workers,
+            order_event_batch_rows=args.order_event_batch_rows,
+        )
+        print_validation(summary)
+        return
+
+    profiles = build_zone_profiles(args.zones, args.segment_mix, args.seed)
+    catalogs = []
+    if args.events is not None:
+        catalogs.append(load_event_catalog(args.events))
+    if args.random_events:
+        catalogs.append(synthesize_event_catalog(args.random_events, list(profiles), args.start, args.days, args.seed))
+    catalog = pd.concat(catalogs, ignore_index=True) if catalogs else None
+
+    if args.variants is not None:
+        config = {
+            "seed": args.seed,
+            "zones": args.zones,
+            "segment_mix": args.segment_mix,
+            "start": args.start,
+            "days": args.days,
+            "chunk_days": args.chunk_days or args.days,
+            "sampler": args.sampler,
+            "rng_streams": args.rng_streams,
+            "shard_zones": args.shard_zones,
+            "storage_format": args.storage_format,
+            "order_events": args.order_events,
+        }
+        summaries = generate_variants(
+            load_variants(args.variants), profiles, config, args.output_dir, args.workers, catalog=catalog
+        )
+        for name, summary in summaries.items():
+            breach_pct = summary.get("breach_hours", 0) / max(summary.get("capacity_rows", 0), 1) * 100
+            print(f"- {name}: {summary.get('orders_rows', 0):,} order rows, capacity breach hours {breach_pct:.2f}%")
+        return
 
-    output_dir = Path(__file__).resolve().parent / "output"
-    save_outputs(orders_fact_df, capacity_fact_df, pricing_actions_df, output_dir)
-    print_validation(orders_fact_df, capacity_fact_df, pricing_actions_df)
+    if args.rng_streams == "zone":
+        rng = spawn_zone_streams(args.seed, list(profiles))
+    else:
+        rng = np.random.default_rng(args.seed)
+    arrival_streams = spawn_arrival_streams(args.seed, list(profiles)) if args.order_events else None
+
+    summary = generate_dataset(
+        profiles,
+        args.start,
+        args.days,
+        args.chunk_days or args.days,
+        rng,
+        args.output_dir,
+        sampler=args.sampler,
+        workers=args.workers,
+        shard_zones=args.shard_zones,
+        storage_format=args.storage_format,
+        events=index_events(catalog) if catalog is not None else None,
+        arrival_streams=arrival_streams,
+        order_event_batch_rows=args.order_event_batch_rows,
+    )
+    config = {
+        "seed": args.seed,
+        "zones": args.zones,
+        "segment_mix": args.segment_mix,
+        "sampler": args.sampler,
+        "rng_streams": args.rng_streams,
+        "shard_zones": args.shard_zones,
+        "storage_format": args.storage_format,
+        "events": save_event_catalog(args.output_dir, catalog),
+        "order_events": args.order_events,
+    }
+    save_generator_state(
+        args.output_dir, config, rng, pd.Timestamp(args.start) + pd.Timedelta(days=args.days), arrival_streams
+    )
+    print_validation(summary)
 
 
 if __name__ == "__main__":
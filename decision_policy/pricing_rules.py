@@ -5,21 +5,29 @@ recommendations for leadership review. It recommends actions (SURGE, DISCOUNT,
 HOLD) and does not execute production price changes.
 """
 
+import sys
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
-FORECAST_PATH = Path("forecasting/output/demand_forecasts.csv")
-CAPACITY_PATH = Path("data_design/output/fact_capacity_ops.csv")
-OUTPUT_PATH = Path("decision_policy/output/pricing_recommendations.csv")
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from data_design.fact_storage import read_table, write_table  # noqa: E402
+
+FORECAST_DIR = Path("forecasting/output")
+CAPACITY_DIR = Path("data_design/output")
+OUTPUT_DIR = Path("decision_policy/output")
 
 
 def load_forecasts() -> pd.DataFrame:
     """Load forecast inputs used as the policy demand signal for each zone-segment-hour."""
-    df = pd.read_csv(
-        FORECAST_PATH,
-        usecols=[
+    return read_table(
+        "demand_forecasts",
+        FORECAST_DIR,
+        columns=[
             "timestamp",
             "zone_id",
             "segment_id",
@@ -29,15 +37,14 @@ def load_forecasts() -> pd.DataFrame:
             "upper_bound",
         ],
     )
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    return df
 
 
 def load_capacity() -> pd.DataFrame:
     """Load historical capacity and stress signals used to anchor policy guardrails."""
-    df = pd.read_csv(
-        CAPACITY_PATH,
-        usecols=[
+    return read_table(
+        "fact_capacity_ops",
+        CAPACITY_DIR,
+        columns=[
             "timestamp",
             "zone_id",
             "max_hourly_capacity",
@@ -46,14 +53,12 @@ def load_capacity() -> pd.DataFrame:
             "stress_index",
         ],
     )
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    return df
 
 
 def aggregate_forecasts(forecasts_df: pd.DataFrame) -> pd.DataFrame:
     """Aggregate multiple model outputs into one policy input per zone-segment-hour."""
     agg = (
-        forecasts_df.groupby(["timestamp", "zone_id", "segment_id"], as_index=False)
+        forecasts_df.groupby(["timestamp", "zone_id", "segment_id"], as_index=False, observed=True)
         .agg(
             {
                 "forecast_demand": "mean",
@@ -74,7 +79,7 @@ def aggregate_forecasts(forecasts_df: pd.DataFrame) -> pd.DataFrame:
 def evaluate_decision_signals(forecast_df: pd.DataFrame, capacity_df: pd.DataFrame) -> pd.DataFrame:
     """Translate forecasts into demand-pressure and uncertainty signals used by policy rules."""
     zone_totals = (
-        forecast_df.groupby(["timestamp", "zone_id"], as_index=False)
+        forecast_df.groupby(["timestamp", "zone_id"], as_index=False, observed=True)
         .agg(
             {
                 "forecast_demand": "sum",
@@ -96,7 +101,7 @@ def evaluate_decision_signals(forecast_df: pd.DataFrame, capacity_df: pd.DataFra
 
     # Forecast horizon is future-facing; use zone-hour capacity profiles from history.
     cap_profile = (
-        cap.groupby(["zone_id", "hour"], as_index=False)
+        cap.groupby(["zone_id", "hour"], as_index=False, observed=True)
         .agg(
             {
                 "max_hourly_capacity": "mean",
@@ -178,8 +183,126 @@ def evaluate_decision_signals(forecast_df: pd.DataFrame, capacity_df: pd.DataFra
     return signals
 
 
+# Labels indexed by the codes apply_pricing_rules computes.
+ACTIONS = ["HOLD", "SURGE", "DISCOUNT"]
+REASONS = [
+    "INSUFFICIENT_SIGNAL",
+    "UNCERTAINTY_TOO_HIGH",
+    "CAPACITY_PROTECTION",
+    "PEAK_DEMAND_CONTROL",
+    "EXCESS_CAPACITY",
+    "DEMAND_STIMULUS",
+    "COOLDOWN_GUARDRAIL",
+]
+RISK_FLAGS = ["LOW", "MEDIUM", "HIGH"]
+
+PRESSURE_NOTE = "pressure exp={:.2f}, worst={:.2f}, best={:.2f}."
+CONFLICT_NOTE = "Conflicting surge and discount signals; holding for leadership review."
+UNCERTAINTY_NOTE = "Guardrail applied: uncertainty band too wide for safe price movement."
+SURGE_NOTE = (
+    "Projected overload risk with worst-case pressure {:.2f}; recommend bounded surge to protect service levels."
+)
+DISCOUNT_NOTE = (
+    "Sustained slack capacity with expected pressure {:.2f}; recommend targeted discount to recover demand."
+)
+COOLDOWN_NOTE = "Guardrail applied: recent non-hold decision still within cooldown window."
+
+
+def _py_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """round(x, ndigits) of every element, bit for bit.
+
+    np.round scales by 10**ndigits first, which can carry a value lying just off a rounding
+    tie across it; the few elements that close to a tie (or too large to scale exactly) are
+    rounded by round() itself.
+    """
+    scale = 10.0**ndigits
+    scaled = values * scale
+    out = np.rint(scaled) / scale
+    with np.errstate(invalid="ignore"):
+        unsure = (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) | (np.abs(scaled) >= 2.0**52)
+    idx = np.flatnonzero(unsure)
+    out[idx] = [round(v, ndigits) for v in values[idx].tolist()]
+    return out
+
+
+def _format_rows(template: str, *columns: np.ndarray) -> tuple[list[str], np.ndarray]:
+    """template.format(*row) for every row as (labels, codes), where every field is {:.2f}.
+
+    A field only depends on its value rounded to two decimals, so each distinct combination
+    of rounded values is formatted once; codes index every row's label.
+    """
+    codes = np.zeros(len(columns[0]), dtype=np.int64)
+    distinct = []
+    for column in columns:
+        rounded = _py_round(np.asarray(column, dtype=float), 2)
+        # np.unique treats -0.0 as 0.0, but they format as "-0.00" and "0.00".
+        rounded[(rounded == 0) & np.signbit(rounded)] = -1e-300
+        values, inverse = np.unique(rounded, return_inverse=True)
+        codes = np.unique(codes * len(values) + inverse, return_inverse=True)[1]
+        distinct.append(values[inverse])
+    first = np.unique(codes, return_index=True)[1]
+    return [template.format(*row) for row in zip(*(d[first].tolist() for d in distinct))], codes
+
+
+def _take_labels(labels, codes: np.ndarray) -> pd.Series:
+    """Column of labels[codes], gathered by pandas so string columns are not rebuilt element by element."""
+    return pd.Series(labels).take(codes).reset_index(drop=True)
+
+
+def _key_column(values: pd.Series) -> pd.Series:
+    """A zone/segment key column holding plain values, as the row-by-row engine produced."""
+    if isinstance(values.dtype, pd.CategoricalDtype) and not values.isna().any():
+        return _take_labels(values.cat.categories, values.cat.codes.to_numpy())
+    return pd.Series(values.to_numpy(dtype=object))
+
+
+def _cooldown_accepts(series: np.ndarray, timestamps: np.ndarray, proposed: np.ndarray, cooldown_ns: int) -> np.ndarray:
+    """Which proposed non-hold rows survive the cooldown, scanning each series in time order.
+
+    Rows are sorted by series, then timestamp (int64 nanoseconds). A proposal is accepted
+    unless the series' last accepted one is less than cooldown_ns earlier. Proposals split
+    into runs wherever the gap to the previous proposal of the series reaches the cooldown;
+    a run's first proposal is always accepted, and each accepted proposal hands over to the
+    first proposal of its run at least cooldown_ns later. The scan follows those hand-overs
+    for all runs at once, so it takes as many steps as the longest run has acceptances.
+    """
+    rows = np.flatnonzero(proposed)
+    accepted = np.zeros(len(series), dtype=bool)
+    if not len(rows):
+        return accepted
+    t = timestamps[rows]
+    s = series[rows]
+    run_start = np.ones(len(rows), dtype=bool)
+    run_start[1:] = (s[1:] != s[:-1]) | (t[1:] - t[:-1] >= cooldown_ns)
+    run = np.cumsum(run_start) - 1
+
+    # First proposal of the same run at or after t + cooldown: merge the queries into the
+    # proposals by (run, time), queries first on ties, and count the proposals before each.
+    n = len(rows)
+    is_proposal = np.repeat([False, True], n)
+    order = np.lexsort((is_proposal, np.concatenate([t + cooldown_ns, t]), np.concatenate([run, run])))
+    proposals_before = np.cumsum(is_proposal[order]) - is_proposal[order]
+    query = ~is_proposal[order]
+    handover = np.empty(n, dtype=np.int64)
+    handover[order[query]] = proposals_before[query]
+    valid = handover < n
+    valid[valid] = run[handover[valid]] == run[valid]
+
+    taken = np.zeros(n, dtype=bool)
+    frontier = np.flatnonzero(run_start)
+    while len(frontier):
+        taken[frontier] = True
+        frontier = handover[frontier[valid[frontier]]]
+    accepted[rows[taken]] = True
+    return accepted
+
+
 def apply_pricing_rules(signals_df: pd.DataFrame) -> pd.DataFrame:
-    """Apply explainable policy triggers, uncertainty checks, and guardrails to produce recommendations."""
+    """Apply explainable policy triggers, uncertainty checks, and guardrails to produce recommendations.
+
+    Rules are evaluated as array operations over every zone-segment-hour at once; only the
+    cooldown carries state, and it is resolved per series by _cooldown_accepts.
+    """
     df = signals_df.sort_values(["zone_id", "segment_id", "timestamp"]).reset_index(drop=True)
 
     max_surge = 0.20
@@ -191,106 +314,80 @@ def apply_pricing_rules(signals_df: pd.DataFrame) -> pd.DataFrame:
     uncertainty_high_threshold = 0.30
     cooldown_hours = 3
 
-    last_non_hold_ts: dict[tuple[str, str], pd.Timestamp] = {}
-    rows = []
-
-    for row in df.itertuples(index=False):
-        key = (row.zone_id, row.segment_id)
-        uncertainty_ratio = float(row.uncertainty_ratio)
-
-        surge_candidate = (row.worst_case_pressure >= 1.15) or (
-            (row.expected_pressure >= 1.05) and (row.stress_index >= stress_high)
-        )
-        discount_candidate = (
-            (row.best_case_pressure <= 0.80)
-            and (row.expected_pressure <= 0.90)
-            and (row.utilization_rate <= util_low)
-        )
-
-        action = "HOLD"
-        pct_change = 0.0
-        reason = "INSUFFICIENT_SIGNAL"
-        notes = (
-            f"pressure exp={row.expected_pressure:.2f}, worst={row.worst_case_pressure:.2f}, "
-            f"best={row.best_case_pressure:.2f}."
-        )
+    def column(name: str) -> np.ndarray:
+        return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+    expected = column("expected_pressure")
+    worst = column("worst_case_pressure")
+    best = column("best_case_pressure")
+    utilization = column("utilization_rate")
+    uncertainty_ratio = column("uncertainty_ratio")
+
+    surge_candidate = (worst >= 1.15) | ((expected >= 1.05) & (column("stress_index") >= stress_high))
+    discount_candidate = (best <= 0.80) & (expected <= 0.90) & (utilization <= util_low)
+
+    # Guardrail precedence: conflicting signals, then uncertainty, then surge before discount.
+    conflict = surge_candidate & discount_candidate
+    too_uncertain = ~conflict & (uncertainty_ratio > uncertainty_hold_threshold) & (surge_candidate | discount_candidate)
+    surge = ~conflict & ~too_uncertain & surge_candidate
+    discount = ~conflict & ~too_uncertain & ~surge_candidate & discount_candidate
+
+    severity = np.clip((worst - 1.05) / 0.25, 0.0, 1.0)
+    slack = np.clip((0.90 - expected) / 0.30, 0.0, 1.0)
+    pct_change = np.select(
+        [surge, discount],
+        [np.clip(0.05 + 0.15 * severity, 0.0, max_surge), np.clip(-(0.06 + 0.19 * slack), max_discount, 0.0)],
+        0.0,
+    )
 
-        if surge_candidate and discount_candidate:
-            reason = "INSUFFICIENT_SIGNAL"
-            notes = "Conflicting surge and discount signals; holding for leadership review."
-        elif uncertainty_ratio > uncertainty_hold_threshold and (surge_candidate or discount_candidate):
-            reason = "UNCERTAINTY_TOO_HIGH"
-            notes = "Guardrail applied: uncertainty band too wide for safe price movement."
-        else:
-            if surge_candidate:
-                severity = float(np.clip((row.worst_case_pressure - 1.05) / 0.25, 0.0, 1.0))
-                pct_change = float(np.clip(0.05 + 0.15 * severity, 0.0, max_surge))
-                action = "SURGE"
-                reason = "CAPACITY_PROTECTION" if row.worst_case_pressure >= 1.15 else "PEAK_DEMAND_CONTROL"
-                notes = (
-                    f"Projected overload risk with worst-case pressure {row.worst_case_pressure:.2f}; "
-                    f"recommend bounded surge to protect service levels."
-                )
-            elif discount_candidate:
-                slack = float(np.clip((0.90 - row.expected_pressure) / 0.30, 0.0, 1.0))
-                pct_change = float(np.clip(-(0.06 + 0.19 * slack), max_discount, 0.0))
-                action = "DISCOUNT"
-                reason = "EXCESS_CAPACITY" if row.utilization_rate <= 0.72 else "DEMAND_STIMULUS"
-                notes = (
-                    f"Sustained slack capacity with expected pressure {row.expected_pressure:.2f}; "
-                    f"recommend targeted discount to recover demand."
-                )
-
-        last_ts = last_non_hold_ts.get(key)
-        if action != "HOLD" and last_ts is not None:
-            hours_since = (row.timestamp - last_ts) / pd.Timedelta(hours=1)
-            if hours_since < cooldown_hours:
-                action = "HOLD"
-                pct_change = 0.0
-                reason = "COOLDOWN_GUARDRAIL"
-                notes = "Guardrail applied: recent non-hold decision still within cooldown window."
-
-        if action == "SURGE":
-            risk = "HIGH" if uncertainty_ratio >= uncertainty_high_threshold else "MEDIUM"
-        elif action == "DISCOUNT":
-            risk = "MEDIUM" if uncertainty_ratio >= uncertainty_high_threshold else "LOW"
-        else:
-            if reason in {"UNCERTAINTY_TOO_HIGH"}:
-                risk = "HIGH"
-            elif uncertainty_ratio >= uncertainty_high_threshold:
-                risk = "MEDIUM"
-            else:
-                risk = "LOW"
-
-        if action != "HOLD":
-            last_non_hold_ts[key] = row.timestamp
-
-        rows.append(
-            {
-                "timestamp": row.timestamp,
-                "zone_id": row.zone_id,
-                "segment_id": row.segment_id,
-                "recommended_action": action,
-                "recommended_pct_change": float(round(pct_change, 4)),
-                "decision_reason": reason,
-                "risk_flag": risk,
-                "policy_notes": notes,
-            }
-        )
+    # Per-series cooldown after every accepted non-hold decision.
+    new_series = df["zone_id"].ne(df["zone_id"].shift()) | df["segment_id"].ne(df["segment_id"].shift())
+    series_id = np.cumsum(new_series.to_numpy())
+    timestamps = df["timestamp"].to_numpy().astype("datetime64[ns]").astype(np.int64)
+    proposed = surge | discount
+    cooled = proposed & ~_cooldown_accepts(series_id, timestamps, proposed, cooldown_hours * 3_600_000_000_000)
+    surge &= ~cooled
+    discount &= ~cooled
+    pct_change[cooled] = 0.0
+
+    action = np.select([surge, discount], [1, 2], 0)
+    reason = np.select(
+        [cooled, too_uncertain, surge & (worst >= 1.15), surge, discount & (utilization <= 0.72), discount],
+        [6, 1, 2, 3, 4, 5],
+        0,
+    )
+    high_uncertainty = uncertainty_ratio >= uncertainty_high_threshold
+    risk = np.select(
+        [surge, discount, too_uncertain],
+        [np.where(high_uncertainty, 2, 1), np.where(high_uncertainty, 1, 0), 2],
+        np.where(high_uncertainty, 1, 0),
+    )
 
-    decisions = pd.DataFrame(rows)
-    return decisions[
-        [
-            "timestamp",
-            "zone_id",
-            "segment_id",
-            "recommended_action",
-            "recommended_pct_change",
-            "decision_reason",
-            "risk_flag",
-            "policy_notes",
-        ]
-    ]
+    # Every row gets exactly one note: a fixed guardrail note or a formatted pressure note.
+    pressure_hold = ~conflict & ~too_uncertain & ~proposed
+    note_labels = [CONFLICT_NOTE, UNCERTAINTY_NOTE, COOLDOWN_NOTE]
+    note_codes = np.select([conflict, too_uncertain, cooled], [0, 1, 2], -1)
+    for rows, template, columns in (
+        (pressure_hold, PRESSURE_NOTE, (expected, worst, best)),
+        (surge, SURGE_NOTE, (worst,)),
+        (discount, DISCOUNT_NOTE, (expected,)),
+    ):
+        labels, codes = _format_rows(template, *(values[rows] for values in columns))
+        note_codes[rows] = codes + len(note_labels)
+        note_labels += labels
+
+    return pd.DataFrame(
+        {
+            "timestamp": df["timestamp"],
+            "zone_id": _key_column(df["zone_id"]),
+            "segment_id": _key_column(df["segment_id"]),
+            "recommended_action": _take_labels(ACTIONS, action),
+            "recommended_pct_change": _py_round(pct_change, 4),
+            "decision_reason": _take_labels(REASONS, reason),
+            "risk_flag": _take_labels(RISK_FLAGS, risk),
+            "policy_notes": _take_labels(note_labels, note_codes),
+        }
+    )
 
 
 def run_decision_policy() -> pd.DataFrame:
@@ -302,8 +399,7 @@ def run_decision_policy() -> pd.DataFrame:
     signals_df = evaluate_decision_signals(policy_input, capacity_df)
     decisions_df = apply_pricing_rules(signals_df)
 
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    decisions_df.to_csv(OUTPUT_PATH, index=False)
+    output_path = write_table(decisions_df, "pricing_recommendations", OUTPUT_DIR)
 
     action_share = decisions_df["recommended_action"].value_counts(normalize=True).mul(100)
     avg_change = float(decisions_df["recommended_pct_change"].mean())
@@ -316,7 +412,7 @@ def run_decision_policy() -> pd.DataFrame:
     print(f"- % HOLD: {action_share.get('HOLD', 0.0):.2f}%")
     print(f"- Average recommended price change: {avg_change:.4f}")
     print(f"- % HIGH risk decisions: {high_risk_pct:.2f}%")
-    print(f"- Output saved to: {OUTPUT_PATH}")
+    print(f"- Output saved to: {output_path}")
 
     return decisions_df
 
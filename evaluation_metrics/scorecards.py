@@ -6,25 +6,31 @@ Why scorecards (not dashboards):
 - Efficiency metrics (revenue per stress unit) prevent over-indexing on revenue while ignoring operational cost.
 """
 
+import sys
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
-INPUT_PATH = Path("simulation_engine/output/scenario_outcomes.csv")
-OUTPUT_PATH = Path("evaluation_metrics/output/strategy_scorecard.csv")
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from data_design.fact_storage import read_table, write_table  # noqa: E402
+
+INPUT_DIR = Path("simulation_engine/output")
+OUTPUT_DIR = Path("evaluation_metrics/output")
 
 
 def load_outcomes() -> pd.DataFrame:
     """Load scenario outcomes generated by the simulation layer as the single source of truth."""
-    df = pd.read_csv(INPUT_PATH)
-    return df
+    return read_table("scenario_outcomes", INPUT_DIR)
 
 
 def compute_strategy_metrics(df: pd.DataFrame) -> pd.DataFrame:
     """Aggregate row-level scenario outcomes into strategy-level decision metrics."""
     grouped = (
-        df.groupby("strategy_name", as_index=False)
+        df.groupby("strategy_name", as_index=False, observed=True)
         .agg(
             total_revenue=("revenue_est", "sum"),
             total_forecast_demand=("forecast_demand", "sum"),
@@ -157,9 +163,8 @@ def print_scorecard(formatted_df: pd.DataFrame) -> None:
 
 def save_scorecard(formatted_df: pd.DataFrame) -> None:
     """Persist the strategy scorecard for downstream review and interview-ready sharing."""
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    formatted_df.to_csv(OUTPUT_PATH, index=False)
-    print(f"\nSaved scorecard: {OUTPUT_PATH}")
+    output_path = write_table(formatted_df, "strategy_scorecard", OUTPUT_DIR)
+    print(f"\nSaved scorecard: {output_path}")
 
 
 def run_scorecards() -> pd.DataFrame:
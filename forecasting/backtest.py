@@ -0,0 +1,321 @@
+"""Rolling-origin (walk-forward) backtest of the baseline and regression forecasters.
+
+Every series is forecast from hundreds of origins spread over its history: at each origin
+both forecasters see only the hours before it and predict the next `horizon` hours, which
+are scored against the actuals. Nothing is refit from scratch between origins. The
+regression sufficient statistics (X'X, X'y) and the baseline's hour/day sums are additive,
+so each origin only absorbs the hours since the previous one before re-solving.
+
+Uncertainty bands are the ones the pipeline would have shipped at that origin: residual
+quantiles of the forecast made BAND_HOURS earlier against the actuals that followed it,
+the same holdout bands training computes. Results are written per horizon step and per
+origin to forecasting/output through the shared fact storage layer.
+
+Every scored error also goes into a quantile sketch per model, series and horizon step
+(forecasting/quantile_sketch.py). The sketches of all origins and series blocks are saved
+to the sketch store, where the forecasting pipeline reads horizon-aware bands from them and
+keeps them current as new actuals arrive.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from data_design.fact_storage import write_table  # noqa: E402
+from forecasting.forecasting_pipeline import (  # noqa: E402
+    LAGS,
+    MAX_LAG,
+    N_FEATURES,
+    OUTPUT_DIR,
+    OUTPUT_HORIZON,
+    SERIES_BLOCK,
+    _baseline_from_sums,
+    _baseline_predict,
+    _baseline_sums,
+    _calendar_index,
+    _epoch_hours,
+    _recursive_forecast_batch,
+    _regression_sufficient_stats,
+    _solve_normal_equations,
+    build_series_panel,
+    estimate_uncertainty_batch,
+    load_data,
+    prepare_time_series,
+)
+from forecasting.quantile_sketch import SKETCH_DIR, empty_sketch, merge_sketches, save_sketches, sketch_update  # noqa: E402
+
+MODELS = ("baseline", "regression")
+
+# Bands at an origin come from the forecast made this many hours earlier (the pipeline's
+# longest holdout), so the origin step must divide it.
+BAND_HOURS = 72
+
+DEFAULT_STEP_HOURS = 24
+DEFAULT_MIN_HISTORY_DAYS = 28
+
+
+def backtest_origins(n_hours: int, horizon: int, step: int, min_history: int) -> np.ndarray:
+    """Grid columns of the first forecast hour at every origin, step hours apart."""
+    first = max(min_history, MAX_LAG + 1)
+    return np.arange(first, n_hours - horizon + 1, step)
+
+
+def _window_mean(values: np.ndarray) -> np.ndarray:
+    """Row means ignoring NaN; NaN for rows without observations."""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    return np.where(count > 0, np.where(valid, values, 0.0).sum(axis=1) / np.maximum(count, 1), np.nan)
+
+
+def _solve_betas(gram: np.ndarray, xty: np.ndarray) -> np.ndarray:
+    """Regression betas at one origin: a batched LU solve, or the pipeline's solve if any Gram is singular.
+
+    Gram matrices are scaled to a unit diagonal first, as in the pipeline, so both agree to
+    about 1e-12 for full-rank Gram matrices; the LU solve is an order of magnitude cheaper,
+    which matters when it runs at every origin.
+    """
+    scale = np.sqrt(np.einsum("sii->si", gram))
+    scale[scale == 0] = 1.0
+    try:
+        solved = np.linalg.solve(gram / (scale[:, :, None] * scale[:, None, :]), (xty / scale)[:, :, None])
+    except np.linalg.LinAlgError:
+        return _solve_normal_equations(gram, xty)[0]
+    return solved[:, :, 0] / scale
+
+
+def _accumulate(sums: dict, k: int, point: np.ndarray, band: np.ndarray, actual: np.ndarray) -> None:
+    """Add one origin's errors into the per-step sums and into entry k of the per-origin sums."""
+    error = actual - point
+    scored = ~np.isnan(error)
+    lower = np.clip(point + band[:, :1], 0.0, None)
+    upper = np.clip(point + band[:, 1:], 0.0, None)
+    banded = scored & ~np.isnan(band[:, :1])
+    terms = {
+        "n": scored,
+        "abs": np.abs(np.where(scored, error, 0.0)),
+        "sq": np.where(scored, error, 0.0) ** 2,
+        "err": np.where(scored, error, 0.0),
+        "actual": np.where(scored, actual, 0.0),
+        "banded": banded,
+        "covered": banded & (actual >= lower) & (actual <= upper),
+    }
+    for key, term in terms.items():
+        by_step = term.sum(axis=0)
+        sums["step"][key] += by_step
+        sums["origin"][key][k] += by_step.sum()
+
+
+def _backtest_block(
+    values: np.ndarray, hours: np.ndarray, origins: np.ndarray, horizon: int, totals: dict, sketches: dict
+) -> None:
+    """Walk one block of series through every origin, adding each origin's scores to totals
+    and its errors to the block's per-step residual sketches.
+
+    Both forecasters' statistics grow with the hours between consecutive origins; a series
+    is not scored by a forecaster that had nothing to forecast from at that origin.
+    """
+    n_series, n_hours = values.shape
+    hour, dow = _calendar_index(hours)
+    week_hour = (dow * 24 + hour)[MAX_LAG:]
+    valid = ~np.isnan(values)
+    grid = np.nan_to_num(values)
+    target_ok = valid[:, MAX_LAG:].copy()
+    for lag in LAGS:
+        target_ok &= valid[:, MAX_LAG - lag : n_hours - lag]
+
+    steps = max(horizon, BAND_HOURS)
+    gram = np.zeros((n_series, N_FEATURES, N_FEATURES))
+    xty = np.zeros((n_series, N_FEATURES))
+    sums = None
+    absorbed = 0
+    # Full-length forecasts from recent origins, kept until they score a later origin's band.
+    earlier = {}
+
+    for k, origin in enumerate(origins):
+        # Absorb the hours [absorbed, origin) into both forecasters' running statistics.
+        lo = max(absorbed, MAX_LAG)
+        if origin > lo:
+            new_gram, new_xty = _regression_sufficient_stats(
+                grid[:, lo - MAX_LAG : origin],
+                target_ok[:, lo - MAX_LAG : origin - MAX_LAG].astype(float),
+                week_hour[lo - MAX_LAG : origin - MAX_LAG],
+            )
+            gram += new_gram
+            xty += new_xty
+        new_sums = _baseline_sums(values[:, absorbed:origin], valid[:, absorbed:origin], hour[absorbed:origin], dow[absorbed:origin])
+        sums = new_sums if sums is None else {key: sums[key] + new_sums[key] for key in sums}
+        absorbed = origin
+
+        future_hours = hours[origin - 1] + np.arange(1, steps + 1)
+        prior_mean = _window_mean(values[:, origin - 336 : origin - 168]) if origin >= 336 else np.full(n_series, np.nan)
+        components = _baseline_from_sums(sums, _window_mean(values[:, origin - 168 : origin]), prior_mean)
+        baseline = _baseline_predict(components, np.broadcast_to(future_hours, (n_series, steps)))
+        baseline[sums["count"] == 0] = np.nan
+
+        # Series without a full-lag training row, or with gaps in the lag window, are skipped.
+        recent = values[:, origin - MAX_LAG : origin]
+        fitted = (gram[:, 0, 0] > 0) & ~np.isnan(recent).any(axis=1)
+        regression = np.full((n_series, steps), np.nan)
+        if fitted.any():
+            regression[fitted] = _recursive_forecast_batch(
+                _solve_betas(gram[fitted], xty[fitted]), recent[fitted], np.full(fitted.sum(), hours[origin - 1]), steps
+            )
+
+        actual = values[:, origin : origin + horizon]
+        for name, preds in (("baseline", baseline), ("regression", regression)):
+            band = np.full((n_series, 2), np.nan)
+            if origin - BAND_HOURS in earlier:
+                past = earlier[origin - BAND_HOURS][name][:, :BAND_HOURS]
+                band = estimate_uncertainty_batch(values[:, origin - BAND_HOURS : origin], past)
+                band[np.isnan(past).all(axis=1)] = np.nan
+            _accumulate(totals[name], k, preds[:, :horizon], band, actual)
+            sketch_update(sketches[name], actual - preds[:, :horizon])
+
+        earlier[origin] = {"baseline": baseline, "regression": regression}
+        earlier.pop(origin - BAND_HOURS, None)
+
+
+def _metrics_frame(sums: dict) -> pd.DataFrame:
+    n = np.maximum(sums["n"], 1)
+    banded = np.maximum(sums["banded"], 1)
+    return pd.DataFrame(
+        {
+            "n_forecasts": sums["n"],
+            "mae": np.where(sums["n"] > 0, sums["abs"] / n, np.nan),
+            "rmse": np.where(sums["n"] > 0, np.sqrt(sums["sq"] / n), np.nan),
+            "bias": np.where(sums["n"] > 0, -sums["err"] / n, np.nan),
+            "wape": np.where(sums["actual"] > 0, sums["abs"] / np.maximum(sums["actual"], 1e-12), np.nan),
+            "interval_coverage": np.where(sums["banded"] > 0, sums["covered"] / banded, np.nan),
+        }
+    )
+
+
+def run_backtest(
+    df: pd.DataFrame,
+    horizon: int = OUTPUT_HORIZON,
+    step: int = DEFAULT_STEP_HOURS,
+    min_history: int = DEFAULT_MIN_HISTORY_DAYS * 24,
+) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """Walk-forward backtest of both forecasters over every series in df.
+
+    Returns (by_step, by_origin, sketches): error metrics and interval coverage per model and
+    horizon step, pooled over series and origins, and per model and origin, pooled over
+    series and steps, plus each model's residual sketch per series and horizon step. Bias is
+    forecast minus actual; coverage counts only origins that have a band.
+    """
+    if BAND_HOURS % step:
+        raise ValueError(f"step must divide {BAND_HOURS} hours so every band has an earlier origin.")
+    if horizon < 1:
+        raise ValueError("horizon must be positive.")
+
+    panel = build_series_panel(df)
+    hours = _epoch_hours(panel["timestamps"])
+    n_series, n_hours = panel["values"].shape
+    origins = backtest_origins(n_hours, horizon, step, min_history)
+    if not len(origins):
+        raise ValueError("Not enough history for a single backtest origin; lower min_history or horizon.")
+
+    keys = ("n", "abs", "sq", "err", "actual", "banded", "covered")
+    totals = {
+        name: {
+            "step": {key: np.zeros(horizon) for key in keys},
+            "origin": {key: np.zeros(len(origins)) for key in keys},
+        }
+        for name in MODELS
+    }
+
+    # Each block sketches its own series; merging the blocks gives the whole panel's sketch.
+    blocks = {name: [] for name in MODELS}
+    for lo in range(0, n_series, SERIES_BLOCK):
+        rows = slice(lo, lo + SERIES_BLOCK)
+        block_sketches = {name: empty_sketch((len(panel["zone_id"][rows]), horizon)) for name in MODELS}
+        _backtest_block(panel["values"][rows], hours, origins, horizon, totals, block_sketches)
+        for name in MODELS:
+            blocks[name].append(
+                {
+                    "zone_id": panel["zone_id"][rows],
+                    "segment_id": panel["segment_id"][rows],
+                    "counts": block_sketches[name],
+                    "absorbed_through": panel["timestamps"][-1],
+                }
+            )
+    sketches = {name: merge_sketches(blocks[name]) for name in MODELS}
+
+    origin_ts = panel["timestamps"][origins - 1]
+    by_step = pd.concat(
+        [
+            pd.DataFrame({"forecast_model": name, "horizon_step": np.arange(1, horizon + 1)}).join(
+                _metrics_frame(totals[name]["step"])
+            )
+            for name in MODELS
+        ],
+        ignore_index=True,
+    )
+    by_origin = pd.concat(
+        [
+            pd.DataFrame({"forecast_model": name, "origin_timestamp": origin_ts}).join(
+                _metrics_frame(totals[name]["origin"])
+            )
+            for name in MODELS
+        ],
+        ignore_index=True,
+    )
+    return by_step, by_origin, sketches
+
+
+def _print_summary(by_step: pd.DataFrame, by_origin: pd.DataFrame, n_series: int) -> None:
+    n_origins = by_origin["origin_timestamp"].nunique()
+    print(f"Backtest: {n_series} series x {n_origins} origins")
+    for name, steps in by_step.groupby("forecast_model", observed=True, sort=False):
+        n = steps["n_forecasts"].to_numpy()
+        total = max(n.sum(), 1)
+        coverage = by_origin.loc[by_origin["forecast_model"] == name, "interval_coverage"]
+        print(f"Model: {name}")
+        print(f"- Scored forecasts: {int(n.sum()):,}")
+        print(f"- MAE (all steps): {(steps['mae'] * n).sum() / total:.3f}")
+        for h in (1, 24, len(steps)):
+            if h <= len(steps):
+                row = steps.iloc[h - 1]
+                print(f"- Step {h}h: MAE {row['mae']:.3f}, bias {row['bias']:+.3f}, coverage {row['interval_coverage']:.1%}")
+        print(f"- Interval coverage by origin: {coverage.min():.1%} to {coverage.max():.1%} (target 80%)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the demand forecasters.")
+    parser.add_argument("--horizon", type=int, default=OUTPUT_HORIZON, help="Forecast horizon in hours.")
+    parser.add_argument(
+        "--step",
+        type=int,
+        default=DEFAULT_STEP_HOURS,
+        help=f"Hours between origins; must divide {BAND_HOURS}.",
+    )
+    parser.add_argument(
+        "--min-history-days",
+        type=int,
+        default=DEFAULT_MIN_HISTORY_DAYS,
+        help="History before the first origin, in days.",
+    )
+    args = parser.parse_args()
+    if args.horizon < 1 or args.step < 1 or BAND_HOURS % args.step:
+        parser.error(f"--horizon must be positive and --step must divide {BAND_HOURS}.")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    ts_df = prepare_time_series(load_data())
+    by_step, by_origin, sketches = run_backtest(ts_df, horizon=args.horizon, step=args.step, min_history=args.min_history_days * 24)
+    _print_summary(by_step, by_origin, ts_df.groupby(["zone_id", "segment_id"], observed=True).ngroups)
+
+    step_path = write_table(by_step, "forecast_backtest_steps", OUTPUT_DIR)
+    origin_path = write_table(by_origin, "forecast_backtest_origins", OUTPUT_DIR)
+    sketch_dir = save_sketches(sketches, SKETCH_DIR)
+    print(f"\nSaved backtest metrics to: {step_path} and {origin_path}")
+    print(f"Saved residual sketches to: {sketch_dir}")
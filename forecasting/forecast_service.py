@@ -0,0 +1,284 @@
+"""Local forecast service: trained forecasters kept in memory and queried over HTTP.
+
+    GET /forecast?model=regression&zone_id=zone_1&segment_id=balanced&start=2026-01-01T06:00&hours=24
+
+returns the forecasts of the matching series (every series when zone_id / segment_id are
+left out) for `hours` hours from `start`, which defaults to the hour after each series'
+history. Models are loaded from the model store (or trained) once at startup and bands come
+from the stored residual sketches as in the pipeline, so answers match demand_forecasts.
+GET /health lists the loaded models.
+
+Queries that arrive together are answered together: the batcher collects queries for
+BATCH_WINDOW_MS after the first one and runs a single vectorized forecast per model over
+the union of their series, at the longest horizon any of them needs, then slices each
+answer out of it. A burst of what-if queries therefore costs about one forecast.
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from forecasting.forecasting_pipeline import (  # noqa: E402
+    DEFAULT_MODELS,
+    MODEL_TRAINERS,
+    OUTPUT_HORIZON,
+    _epoch_hours,
+    forecast_arrays,
+    load_or_train_models,
+)
+from forecasting.quantile_sketch import load_sketches  # noqa: E402
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# How long the batcher waits after a query for others to share its forecast; queries that
+# arrive while a batch is computing join the next batch regardless.
+BATCH_WINDOW_MS = 0.5
+
+# Furthest past the training history a single query may reach (four weeks).
+MAX_QUERY_HOURS = 672
+
+# Seconds a request handler waits for its batch before giving up.
+QUERY_TIMEOUT_S = 30.0
+
+
+def select_series(model: dict, rows: np.ndarray) -> dict:
+    """The model restricted to the given series rows; every array in a model is per series."""
+    return {key: value[rows] if isinstance(value, np.ndarray) else value for key, value in model.items()}
+
+
+class ForecastBatcher:
+    """Answer forecast queries in batches from one worker thread.
+
+    resolve() validates a query against the loaded models; submit() queues it and returns a
+    Future that the worker completes with the answer.
+    """
+
+    def __init__(self, models: dict, sketches: dict | None = None, window_ms: float = BATCH_WINDOW_MS):
+        self.models = models
+        self.sketches = sketches or {}
+        self.window = window_ms / 1000.0
+        self.last_hours = {name: _epoch_hours(model["last_timestamp"]) for name, model in models.items()}
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="forecast-batcher", daemon=True).start()
+
+    def resolve(
+        self,
+        model_name: str = DEFAULT_MODELS[-1],
+        zone_id: str | None = None,
+        segment_id: str | None = None,
+        start: str | None = None,
+        hours: int = OUTPUT_HORIZON,
+    ) -> dict:
+        """A query as series rows and each series' first forecast step; ValueError if invalid.
+
+        start must not precede a matched series' first forecast hour: the models hold no
+        state from which to forecast hours they have already seen. The forecast runs from
+        that hour, so start + hours may reach at most MAX_QUERY_HOURS past it.
+        """
+        if model_name not in self.models:
+            raise ValueError(f"Unknown model '{model_name}'; loaded: {', '.join(self.models)}.")
+        if not 1 <= hours <= MAX_QUERY_HOURS:
+            raise ValueError(f"hours must be between 1 and {MAX_QUERY_HOURS}.")
+        model = self.models[model_name]
+        matched = np.ones(len(model["zone_id"]), dtype=bool)
+        if zone_id is not None:
+            matched &= model["zone_id"].astype(str) == zone_id
+        if segment_id is not None:
+            matched &= model["segment_id"].astype(str) == segment_id
+        rows = np.flatnonzero(matched)
+        if not len(rows):
+            raise ValueError("No series matches the requested zone_id / segment_id.")
+
+        offset = np.zeros(len(rows), dtype=np.int64)
+        if start is not None:
+            offset = int(_epoch_hours(pd.Timestamp(start).to_datetime64())) - self.last_hours[model_name][rows] - 1
+            if (offset < 0).any():
+                first = (self.last_hours[model_name][rows].max() + 1).astype("datetime64[h]")
+                raise ValueError(f"start must be at or after {first}, the first hour not in the training history.")
+        if offset.max() + hours > MAX_QUERY_HOURS:
+            raise ValueError(f"A query may reach at most {MAX_QUERY_HOURS} hours past the training history.")
+        if model_name == "direct" and offset.max() + hours > model["direct_betas"].shape[2]:
+            raise ValueError(f"The direct model forecasts at most {model['direct_betas'].shape[2]} hours past the history.")
+        return {"model_name": model_name, "rows": rows, "offset": offset, "hours": hours}
+
+    def submit(self, query: dict) -> Future:
+        future = Future()
+        self._queue.put((query, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._answer(batch)
+            except Exception as exc:  # one failing batch must not stop the worker
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _answer(self, batch: list[tuple[dict, Future]]) -> None:
+        """One forecast per model over the union of the batch's series, sliced per query."""
+        by_model = {}
+        for query, future in batch:
+            by_model.setdefault(query["model_name"], []).append((query, future))
+
+        for model_name, items in by_model.items():
+            model = self.models[model_name]
+            rows = np.unique(np.concatenate([query["rows"] for query, _ in items]))
+            steps = max(int(query["offset"].max()) + query["hours"] for query, _ in items)
+            arrays = forecast_arrays(select_series(model, rows), steps, self.sketches.get(model_name))
+            for query, future in items:
+                position = np.searchsorted(rows, query["rows"])
+                window = position[:, None], query["offset"][:, None] + np.arange(query["hours"])
+                future.set_result(
+                    {
+                        "model": model_name,
+                        "series": [
+                            {
+                                "zone_id": str(model["zone_id"][row]),
+                                "segment_id": str(model["segment_id"][row]),
+                                "timestamps": np.datetime_as_string(hours.astype("datetime64[h]"), unit="s").tolist(),
+                                "forecast_demand": point.tolist(),
+                                "lower_bound": lower.tolist(),
+                                "upper_bound": upper.tolist(),
+                            }
+                            for row, hours, point, lower, upper in zip(
+                                query["rows"],
+                                arrays["hours"][window],
+                                arrays["point"][window],
+                                arrays["lower"][window],
+                                arrays["upper"][window],
+                            )
+                        ],
+                    }
+                )
+
+    def health(self) -> dict:
+        return {
+            "models": {
+                name: {
+                    "series": len(model["zone_id"]),
+                    "last_timestamp": str(np.max(model["last_timestamp"]).astype("datetime64[h]")),
+                    "sketch_bands": name in self.sketches,
+                }
+                for name, model in self.models.items()
+            }
+        }
+
+
+def make_handler(batcher: ForecastBatcher) -> type[BaseHTTPRequestHandler]:
+    """Request handler class bound to a batcher."""
+
+    class ForecastHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if url.path == "/health":
+                self._reply(200, batcher.health())
+            elif url.path == "/forecast":
+                try:
+                    query = batcher.resolve(
+                        model_name=params.get("model", DEFAULT_MODELS[-1]),
+                        zone_id=params.get("zone_id"),
+                        segment_id=params.get("segment_id"),
+                        start=params.get("start"),
+                        hours=int(params.get("hours", OUTPUT_HORIZON)),
+                    )
+                except ValueError as exc:
+                    self._reply(400, {"error": str(exc)})
+                    return
+                try:
+                    self._reply(200, batcher.submit(query).result(timeout=QUERY_TIMEOUT_S))
+                except Exception as exc:
+                    self._reply(500, {"error": str(exc)})
+            else:
+                self._reply(404, {"error": f"Unknown path {url.path}; use /forecast or /health."})
+
+        def _reply(self, status: int, body: dict) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args) -> None:
+            # Per-request access logs would cost more than the forecasts they describe.
+            pass
+
+    return ForecastHandler
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    model_names: tuple[str, ...] = DEFAULT_MODELS,
+    window_ms: float = BATCH_WINDOW_MS,
+    retrain: bool = False,
+) -> None:
+    """Load the models once and serve forecast queries until interrupted."""
+    models = load_or_train_models(retrain=retrain, model_names=model_names)
+    batcher = ForecastBatcher(models, load_sketches(), window_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    server.daemon_threads = True
+    print(f"Serving forecasts from {', '.join(models)} on http://{host}:{server.server_port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve demand forecasts from in-memory models over local HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (0 picks a free one).")
+    parser.add_argument(
+        "--models",
+        default=",".join(DEFAULT_MODELS),
+        help=f"Comma-separated forecasters to serve, from: {', '.join(MODEL_TRAINERS)}.",
+    )
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=BATCH_WINDOW_MS,
+        help="Milliseconds to collect concurrent queries into one forecast batch.",
+    )
+    parser.add_argument("--retrain", action="store_true", help="Retrain the models before serving.")
+    args = parser.parse_args()
+    args.models = tuple(name.strip() for name in args.models.split(",") if name.strip())
+    unknown = [name for name in args.models if name not in MODEL_TRAINERS]
+    if unknown or not args.models:
+        parser.error(f"--models must name forecasters from: {', '.join(MODEL_TRAINERS)}.")
+    if args.batch_window_ms < 0:
+        parser.error("--batch-window-ms must not be negative.")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    serve(args.host, args.port, args.models, args.batch_window_ms, args.retrain)
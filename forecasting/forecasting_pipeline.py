@@ -3,19 +3,73 @@
 This module intentionally prioritizes interpretability and stability over model complexity.
 It trains two forecasters (baseline and regression-style), produces 24h and 72h
 horizon forecasts, estimates uncertainty bands from residual quantiles, and writes
-72h forecasts to forecasting/output/demand_forecasts.csv.
+72h forecasts to forecasting/output/demand_forecasts through the shared fact storage layer.
+When the backtest has stored residual sketches, bands are read per horizon step from them
+instead, and each run first folds the errors of the previous forecasts into the sketches.
 """
 
+import argparse
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from data_design.fact_storage import (  # noqa: E402
+    read_last_timestamp,
+    read_table,
+    read_table_since,
+    table_files,
+    write_table,
+)
+from forecasting.model_store import MODEL_DIR, fingerprint, load_models, save_models  # noqa: E402
+from forecasting.quantile_sketch import (  # noqa: E402
+    SKETCH_DIR,
+    load_sketches,
+    save_sketches,
+    sketch_count,
+    sketch_quantiles,
+    sketch_update,
+)
+
 if int(pd.__version__.split(".")[0]) < 3:
     pd.options.mode.copy_on_write = True
 
-SOURCE_PATH = Path("data_design/output/fact_orders.csv")
-OUTPUT_PATH = Path("forecasting/output/demand_forecasts.csv")
+SOURCE_DIR = Path("data_design/output")
+OUTPUT_DIR = Path("forecasting/output")
+
+# Regression design: intercept, lag 1/24/168 demand, hour-of-day and day-of-week one-hots
+# (hour 0 and Monday are the reference levels).
+# Hour h > 0 sets column HOUR_COL + h and weekday d > 0 sets column DOW_COL + d.
+LAGS = (1, 24, 168)
+MAX_LAG = max(LAGS)
+HOUR_COL = len(LAGS)
+DOW_COL = HOUR_COL + 23
+N_FEATURES = DOW_COL + 7
+
+# Settings that change trained models; they are part of the stored models' fingerprint.
+# Bump the version whenever a training change would make stored models stale.
+MODEL_CONFIG = {"version": 4, "lags": list(LAGS)}
+
+# Trailing one-step residuals kept per regression series, the pool sample paths resample.
+RESIDUAL_HOURS = 672
+
+# Shortest --history-weeks window: two weeks for the baseline's trend and the 168h lags.
+MIN_HISTORY_WEEKS = 2
+
+# Steps of the direct multi-horizon model; it cannot forecast past this horizon.
+DIRECT_HORIZON = 72
+
+# 24h for immediate pricing horizon checks, 72h for short-term planning and scenario
+# simulation inputs; the output horizon is the slice written to demand_forecasts.
+HORIZONS = (24, 72)
+OUTPUT_HORIZON = 72
 
 REQUIRED_COLS = [
     "timestamp",
@@ -27,11 +81,17 @@ REQUIRED_COLS = [
 ]
 
 
-def load_data() -> pd.DataFrame:
-    """Load only decision-approved demand columns from the synthetic orders fact table."""
-    df = pd.read_csv(SOURCE_PATH, usecols=REQUIRED_COLS)
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    return df
+def load_data(history_weeks: int | None = None) -> pd.DataFrame:
+    """Load only decision-approved demand columns from the synthetic orders fact table.
+
+    With history_weeks, only the last history_weeks * 168 hours (ending at the table's latest
+    timestamp) are streamed in, so load time and memory follow the window, not the file.
+    """
+    if history_weeks is None:
+        return read_table("fact_orders", SOURCE_DIR, columns=REQUIRED_COLS)
+    last = read_last_timestamp("fact_orders", SOURCE_DIR)
+    start = last - pd.Timedelta(hours=history_weeks * 168 - 1)
+    return read_table_since("fact_orders", SOURCE_DIR, start, columns=REQUIRED_COLS)
 
 
 def prepare_time_series(df: pd.DataFrame) -> pd.DataFrame:
@@ -43,284 +103,1172 @@ def prepare_time_series(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def _fit_baseline_components(series_df: pd.DataFrame) -> dict:
-    values = series_df["final_demand"].values.astype(float)
+def _baseline_sums(values: np.ndarray, used: np.ndarray, hour: np.ndarray, dow: np.ndarray) -> dict:
+    """Additive baseline statistics per series: overall and hour-of-day / day-of-week sums and counts.
 
-    overall = float(np.maximum(values.mean(), 1e-6))
-    hour_profile = series_df.groupby("hour", observed=True)["final_demand"].mean() / overall
-    dow_profile = series_df.groupby("day_of_week", observed=True)["final_demand"].mean() / overall
+    used marks the panel entries to include. Sums over disjoint spans of hours add up, so
+    callers that extend the history (the backtest) can accumulate them instead of refitting.
+    """
+    used_values = np.where(used, values, 0.0)
+    weights = used.astype(float)
+    hour_hot = (hour[:, None] == np.arange(24)).astype(float)
+    dow_hot = (dow[:, None] == np.arange(7)).astype(float)
+    return {
+        "total": used_values.sum(axis=1),
+        "count": weights.sum(axis=1),
+        "hour_sum": used_values @ hour_hot,
+        "hour_count": weights @ hour_hot,
+        "dow_sum": used_values @ dow_hot,
+        "dow_count": weights @ dow_hot,
+    }
 
-    hour_profile = hour_profile.reindex(range(24), fill_value=1.0).values
-    dow_profile = dow_profile.reindex(range(7), fill_value=1.0).values
 
-    recent_window = values[-168:] if len(values) >= 168 else values
-    prior_window = values[-336:-168] if len(values) >= 336 else values
+def _baseline_from_sums(sums: dict, recent_mean: np.ndarray, prior_mean: np.ndarray) -> dict:
+    """Baseline components from accumulated sums and the recent / prior week means.
 
-    recent_level = float(np.maximum(recent_window.mean(), 1e-6))
-    prior_level = float(np.maximum(prior_window.mean(), 1e-6))
+    A NaN prior mean (under two weeks of history) falls back to the overall mean; hours or
+    weekdays a series never saw keep a neutral 1.0 profile.
+    """
+    mean_all = sums["total"] / np.maximum(sums["count"], 1)
+    overall = np.maximum(mean_all, 1e-6)
 
-    trend_ratio = np.clip(recent_level / prior_level, 0.90, 1.10)
+    def profile(total: np.ndarray, count: np.ndarray) -> np.ndarray:
+        return np.where(count > 0, total / np.maximum(count, 1) / overall[:, None], 1.0)
 
+    recent_level = np.maximum(recent_mean, 1e-6)
+    prior_level = np.maximum(np.where(np.isnan(prior_mean), mean_all, prior_mean), 1e-6)
     return {
         "level": recent_level,
-        "hour_profile": hour_profile,
-        "dow_profile": dow_profile,
-        "trend_ratio": float(trend_ratio),
+        "hour_profile": profile(sums["hour_sum"], sums["hour_count"]),
+        "dow_profile": profile(sums["dow_sum"], sums["dow_count"]),
+        "trend_ratio": np.clip(recent_level / prior_level, 0.90, 1.10),
     }
 
 
-def _baseline_predict(components: dict, future_timestamps: pd.DatetimeIndex) -> np.ndarray:
-    h = future_timestamps.hour.values
-    d = future_timestamps.dayofweek.values
+def _fit_baseline_components(values: np.ndarray, compact: np.ndarray, end: np.ndarray, hour: np.ndarray, dow: np.ndarray) -> dict:
+    """Baseline level, hour/day-of-week profiles, and trend for every series at once.
 
-    hour_effect = components["hour_profile"][h]
-    dow_effect = components["dow_profile"][d]
+    values is the (series, hours) panel and compact its left-aligned form; each series uses
+    its first end[s] observations. Profile sums are products with hour-of-day and day-of-week
+    one-hot matrices.
+    """
+    valid = ~np.isnan(values)
+    used = valid & (np.cumsum(valid, axis=1) <= end[:, None])
 
-    # Trend is applied very gradually to keep forecasts smooth and stable.
-    step = np.arange(1, len(future_timestamps) + 1)
-    trend_effect = components["trend_ratio"] ** (step / 24.0)
+    # Series shorter than one (two) weeks use all their history as the recent (prior) window.
+    recent_mean = np.nanmean(_rank_window(compact, end, 168), axis=1)
+    prior_window = _rank_window(compact, np.where(end >= 336, end - 168, end), 168)
+    prior_mean = np.where(end >= 336, np.nanmean(prior_window, axis=1), np.nan)
+    return _baseline_from_sums(_baseline_sums(values, used, hour, dow), recent_mean, prior_mean)
 
-    pred = components["level"] * hour_effect * dow_effect * trend_effect
-    return np.clip(pred, 0.0, None)
 
+def _baseline_predict(components: dict, future_hours: np.ndarray) -> np.ndarray:
+    """Baseline forecasts for every series, shaped like future_hours (series, steps of epoch hours)."""
+    h, d = _calendar_index(future_hours)
 
-def _build_regression_row(history: np.ndarray, ts: pd.Timestamp) -> np.ndarray:
-    lag_1 = history[-1]
-    lag_24 = history[-24]
-    lag_168 = history[-168]
+    hour_effect = np.take_along_axis(components["hour_profile"], h, axis=1)
+    dow_effect = np.take_along_axis(components["dow_profile"], d, axis=1)
 
-    hour_oh = np.zeros(23)
-    dow_oh = np.zeros(6)
+    # Trend is applied very gradually to keep forecasts smooth and stable.
+    step = np.arange(1, future_hours.shape[1] + 1)
+    trend_effect = components["trend_ratio"][:, None] ** (step / 24.0)
 
-    if ts.hour > 0:
-        hour_oh[ts.hour - 1] = 1.0
-    if ts.dayofweek > 0:
-        dow_oh[ts.dayofweek - 1] = 1.0
+    pred = components["level"][:, None] * hour_effect * dow_effect * trend_effect
+    return np.clip(pred, 0.0, None)
 
-    return np.concatenate(([1.0, lag_1, lag_24, lag_168], hour_oh, dow_oh))
 
+def _epoch_hours(timestamps) -> np.ndarray:
+    """Whole hours since the Unix epoch."""
+    return np.asarray(timestamps, dtype="datetime64[h]").astype(np.int64)
+
+
+def _calendar_index(hours: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Hour of day and day of week (Monday=0) from hours since the epoch (a Thursday)."""
+    return hours % 24, (hours // 24 + 3) % 7
+
+
+def _calendar_terms(betas: np.ndarray, last_hours: np.ndarray, horizon: int) -> np.ndarray:
+    """Intercept plus hour and weekday effects of the next horizon hours, shaped (horizon, series)."""
+    hour, dow = _calendar_index(last_hours[None, :] + np.arange(1, horizon + 1)[:, None])
+    return betas[:, 0] + np.where(
+        hour > 0, np.take_along_axis(betas.T, HOUR_COL + hour, axis=0), 0.0
+    ) + np.where(dow > 0, np.take_along_axis(betas.T, DOW_COL + dow, axis=0), 0.0)
+
+
+def _recursive_forecast_batch(betas: np.ndarray, recent: np.ndarray, last_hours: np.ndarray, horizon: int) -> np.ndarray:
+    """Recursive lag forecasts for many series at once, shaped (series, horizon).
+
+    betas is (series, N_FEATURES), recent holds each series' last MAX_LAG observations
+    (oldest first) and last_hours the epoch hour of the last one. The calendar part of every
+    step is gathered up front; the loop then only advances a MAX_LAG-slot ring buffer per
+    series, writing each prediction over the observation that just fell out of the lag window.
+    """
+    n_series = len(betas)
+    lags = np.array(LAGS)
+    calendar = _calendar_terms(betas, last_hours, horizon)
+    lag_beta = betas[:, 1 : 1 + len(LAGS)].T
+
+    ring = np.array(recent[:, -MAX_LAG:].T, dtype=float)
+    preds = np.empty((horizon, n_series))
+    for step in range(horizon):
+        slot = step % MAX_LAG
+        lagged = ring[(slot - lags) % MAX_LAG]
+        pred = np.maximum(calendar[step] + (lagged * lag_beta).sum(axis=0), 0.0)
+        ring[slot] = pred
+        preds[step] = pred
+
+    return preds.T
+
+
+def _row_nanquantiles(values: np.ndarray, quantiles: tuple[float, ...]) -> list[np.ndarray]:
+    """np.nanquantile (linear method) along axis 1 from one row sort instead of a per-row loop.
+
+    Every row must hold at least one non-NaN value; NaN sorts last, so each row's valid values
+    are its first n entries.
+    """
+    ordered = np.sort(values, axis=1)
+    n = (~np.isnan(values)).sum(axis=1)
+    out = []
+    for q in quantiles:
+        pos = q * (n - 1)
+        below = np.floor(pos).astype(np.intp)
+        above = np.minimum(below + 1, n - 1)
+        a = np.take_along_axis(ordered, below[:, None], axis=1)[:, 0]
+        b = np.take_along_axis(ordered, above[:, None], axis=1)[:, 0]
+        t = pos - below
+        # Same interpolation numpy uses, so results match np.nanquantile to the last bit.
+        out.append(np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t))
+    return out
 
-def _make_regression_matrix(series_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, pd.DatetimeIndex]:
-    y = series_df["final_demand"].values.astype(float)
-    ts = series_df["timestamp"].reset_index(drop=True)
 
-    rows = []
-    targets = []
-    ts_used = []
+def estimate_uncertainty_batch(actuals: np.ndarray, forecasts: np.ndarray) -> np.ndarray:
+    """Asymmetric error bands per series from holdout residual quantiles, shaped (series, 2).
 
-    for idx in range(168, len(series_df)):
-        history = y[:idx]
-        row = _build_regression_row(history, ts.iloc[idx])
-        rows.append(row)
-        targets.append(y[idx])
-        ts_used.append(ts.iloc[idx])
+    Rows are NaN-padded. Bands are the 10th and 90th residual percentiles, or +-std when
+    those coincide; series without residuals get (-1, 1).
+    """
+    residuals = actuals - forecasts
+    bands = np.tile([-1.0, 1.0], (len(residuals), 1))
+    has_data = (~np.isnan(residuals)).any(axis=1)
+    if not has_data.any():
+        return bands
+
+    res = residuals[has_data]
+    low_q, high_q = _row_nanquantiles(res, (0.10, 0.90))
+    spread = np.nanstd(res, axis=1)
+    spread = np.where(spread > 0, spread, 1.0)
+    flat = np.isclose(low_q, high_q)
+    bands[has_data, 0] = np.where(flat, -spread, low_q)
+    bands[has_data, 1] = np.where(flat, spread, high_q)
+    return bands
+
+
+def _sorted_codes(labels: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Integer codes into the lexically sorted distinct labels, plus those labels."""
+    labels = labels if isinstance(labels.dtype, pd.CategoricalDtype) else labels.astype("category")
+    categories = labels.cat.categories.astype(str)
+    order = np.argsort(categories.values, kind="stable")
+    remap = np.empty(len(order), dtype=np.intp)
+    remap[order] = np.arange(len(order))
+    return remap[labels.cat.codes.values], categories.values[order].astype(object)
+
+
+def build_series_panel(df: pd.DataFrame) -> dict:
+    """Pivot every zone-segment series onto one contiguous hourly grid.
+
+    values is (series, hours) with NaN where a series has no row; series are in sorted
+    (zone_id, segment_id) order, the same order as a groupby over the long table.
+    """
+    zone_codes, zones = _sorted_codes(df["zone_id"])
+    segment_codes, segments = _sorted_codes(df["segment_id"])
+    key = zone_codes * len(segments) + segment_codes
+    present = np.bincount(key, minlength=len(zones) * len(segments)) > 0
+    series_of_key = np.cumsum(present) - 1
+    keys = np.flatnonzero(present)
+
+    hours = _epoch_hours(df["timestamp"].values)
+    first = hours.min() if len(hours) else 0
+    n_hours = int(hours.max() - first + 1) if len(hours) else 0
+    values = np.full((len(keys), n_hours), np.nan)
+    values[series_of_key[key], hours - first] = df["final_demand"].values.astype(float)
 
-    if not rows:
-        return np.empty((0, 33)), np.array([]), pd.DatetimeIndex([])
+    return {
+        "zone_id": zones[keys // len(segments)],
+        "segment_id": segments[keys % len(segments)],
+        "timestamps": (first + np.arange(n_hours)).astype("datetime64[h]").astype("datetime64[us]"),
+        "values": values,
+    }
 
-    return np.vstack(rows), np.array(targets), pd.DatetimeIndex(ts_used)
 
+def _compact_panel(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Left-align each series' observations: (values by rank, grid column by rank, observation counts).
+
+    Rank k is a series' k-th observation in time order; positions past its count are NaN / -1.
+    """
+    valid = ~np.isnan(values)
+    n_obs = valid.sum(axis=1)
+    if n_obs.sum() == values.size:
+        return values, np.broadcast_to(np.arange(values.shape[1]), values.shape), n_obs
+    rank = np.cumsum(valid, axis=1) - 1
+    rows = np.nonzero(valid)[0]
+
+    compact = np.full(values.shape, np.nan)
+    compact[rows, rank[valid]] = values[valid]
+    columns = np.full(values.shape, -1, dtype=np.intp)
+    columns[rows, rank[valid]] = np.nonzero(valid)[1]
+    return compact, columns, n_obs
+
+
+def _rank_window(compact: np.ndarray, end: np.ndarray, width: int) -> np.ndarray:
+    """Each series' observations at ranks [end - width, end), shaped (series, width); NaN outside the panel."""
+    idx = end[:, None] - width + np.arange(width)
+    if compact.shape[1] == 0:
+        return np.full(idx.shape, np.nan)
+    out = np.take_along_axis(compact, np.clip(idx, 0, compact.shape[1] - 1), axis=1)
+    out[(idx < 0) | (idx >= compact.shape[1])] = np.nan
+    return out
 
-def _regression_recursive_forecast(beta: np.ndarray, history: np.ndarray, last_ts: pd.Timestamp, horizon: int) -> np.ndarray:
-    preds = []
-    hist = history.astype(float).copy()
 
-    for step in range(1, horizon + 1):
-        ts_next = last_ts + pd.Timedelta(hours=step)
-        row = _build_regression_row(hist, ts_next)
-        pred = float(np.dot(row, beta))
-        pred = max(pred, 0.0)
-        preds.append(pred)
-        hist = np.append(hist, pred)
+def _holdout_hours(n_obs: np.ndarray) -> np.ndarray:
+    """Per-series holdout length: min(72, max(24, n // 10))."""
+    return np.minimum(72, np.maximum(24, n_obs // 10))
+
+
+# Calendar columns of the design (intercept and one-hots) for each of the 168 hours of the week.
+CALENDAR_COLS = np.array([0] + list(range(HOUR_COL + 1, N_FEATURES)))
+_week_hour, _week_dow = np.arange(168) % 24, np.arange(168) // 24
+CALENDAR_ROWS = np.zeros((168, N_FEATURES))
+CALENDAR_ROWS[:, 0] = 1.0
+CALENDAR_ROWS[_week_hour > 0, HOUR_COL + _week_hour[_week_hour > 0]] = 1.0
+CALENDAR_ROWS[_week_dow > 0, DOW_COL + _week_dow[_week_dow > 0]] = 1.0
+CALENDAR_ROWS = CALENDAR_ROWS[:, CALENDAR_COLS]
+
+
+def _regression_sufficient_stats(values: np.ndarray, weights: np.ndarray, week_hour: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """X'WX (series, p, p) and X'Wy (series, p) for every series without materializing X.
+
+    values is the (series, hours) grid with missing entries zeroed, weights (series, hours -
+    MAX_LAG) selects target hours, and week_hour gives each target hour's hour of the week.
+    Calendar columns are one-hots of the hour of the week, so every calendar block is a
+    per-series bincount over the 168 week hours; lag and target cross products are one
+    batched matrix product.
+    """
+    n_series, n_hours = values.shape
+    n_targets = max(n_hours - MAX_LAG, 0)
+    lag_cols = np.arange(1, 1 + len(LAGS))
+    # Rows: lag 1, lag 24, lag 168, then the target itself.
+    stacked = np.stack(
+        [values[:, MAX_LAG - lag : MAX_LAG - lag + n_targets] for lag in LAGS] + [values[:, MAX_LAG:]], axis=1
+    )
+    weighted = stacked * weights[:, None, :]
+    moments = weighted @ stacked.transpose(0, 2, 1)
+
+    cal_terms = np.concatenate([weights[:, None, :], weighted], axis=1)
+    n_terms = cal_terms.shape[1]
+    bins = (np.arange(n_series * n_terms)[:, None] * 168 + week_hour[None, :]).ravel()
+    by_week_hour = np.bincount(bins, weights=cal_terms.ravel(), minlength=n_series * n_terms * 168)
+    by_week_hour = by_week_hour.reshape(n_series, n_terms, 168)
+
+    gram = np.zeros((n_series, N_FEATURES, N_FEATURES))
+    xty = np.zeros((n_series, N_FEATURES))
+    cal_outer = (CALENDAR_ROWS[:, :, None] * CALENDAR_ROWS[:, None, :]).reshape(168, -1)
+    gram[:, CALENDAR_COLS[:, None], CALENDAR_COLS[None, :]] = (by_week_hour[:, 0] @ cal_outer).reshape(
+        n_series, len(CALENDAR_COLS), len(CALENDAR_COLS)
+    )
+    cross = by_week_hour[:, 1:] @ CALENDAR_ROWS
+    gram[:, CALENDAR_COLS[:, None], lag_cols[None, :]] = cross[:, :-1].transpose(0, 2, 1)
+    gram[:, lag_cols[:, None], CALENDAR_COLS[None, :]] = cross[:, :-1]
+    gram[:, lag_cols[:, None], lag_cols[None, :]] = moments[:, :-1, :-1]
+    xty[:, CALENDAR_COLS] = cross[:, -1]
+    xty[:, lag_cols] = moments[:, :-1, -1]
+    return gram, xty
+
+
+def _one_step_residuals(betas: np.ndarray, grid: np.ndarray, target_ok: np.ndarray, week_hour: np.ndarray) -> np.ndarray:
+    """In-sample residuals y - x'beta for every target hour, shaped like target_ok (NaN where it is False)."""
+    n_targets = target_ok.shape[1]
+    fitted = (betas[:, CALENDAR_COLS] @ CALENDAR_ROWS.T)[:, week_hour]
+    for col, lag in enumerate(LAGS, start=1):
+        fitted += betas[:, col : col + 1] * grid[:, MAX_LAG - lag : MAX_LAG - lag + n_targets]
+    return np.where(target_ok, grid[:, MAX_LAG:] - fitted, np.nan)
+
+
+def _direct_sufficient_stats(grid: np.ndarray, weights: np.ndarray, week_hour: np.ndarray, horizon: int) -> tuple[np.ndarray, np.ndarray]:
+    """X'WX (series, p, p) and X'WY (series, p, horizon) of the direct multi-horizon model.
+
+    Row r is the forecast origin whose first target is grid column MAX_LAG + r. Its design
+    row is the one-step regression row of that target and is shared by every step; its
+    targets are the next horizon hours. weights is (series, rows) and grid must extend
+    horizon - 1 hours past the last row's first target. The Gram matrix comes from
+    _regression_sufficient_stats. For X'WY, a few series at a time, the targets of every
+    row form a (rows, horizon) window; lag columns contract it with the weighted lags, and
+    since grid hours are consecutive, folding rows into whole weeks turns the week-hour
+    (calendar) sums into one contraction over weeks.
+    """
+    n_series, n_rows = weights.shape
+    gram, _ = _regression_sufficient_stats(grid[:, : MAX_LAG + n_rows], weights, week_hour[:n_rows])
+    xty = np.zeros((n_series, N_FEATURES, horizon))
+    if not n_rows:
+        return gram, xty
+
+    lag_cols = np.arange(1, 1 + len(LAGS))
+    offset = int(week_hour[0])
+    n_weeks = -(-(offset + n_rows) // 168)
+    for lo in range(0, n_series, DIRECT_STATS_BLOCK):
+        rows = slice(lo, lo + DIRECT_STATS_BLOCK)
+        w = weights[rows]
+        out = xty[rows]
+        # Row r's targets start at padded position offset + r, so position k * 168 + h is
+        # week k, week hour h; windows over the padded targets are strided views, never copies.
+        padded = np.zeros((len(w), n_weeks * 168 + horizon - 1))
+        padded[:, offset : offset + n_rows + horizon - 1] = grid[rows, MAX_LAG : MAX_LAG + n_rows + horizon - 1]
+        step = padded.strides[1]
+        targets = np.lib.stride_tricks.as_strided(
+            padded, shape=(len(w), n_weeks * 168, horizon), strides=(padded.strides[0], step, step)
+        )
+        lagged = np.zeros((len(w), len(LAGS), n_weeks * 168))
+        for i, lag in enumerate(LAGS):
+            lagged[:, i, offset : offset + n_rows] = grid[rows, MAX_LAG - lag : MAX_LAG - lag + n_rows] * w
+        out[:, lag_cols] = np.einsum("slr,srh->slh", lagged, targets)
+
+        by_week = np.zeros((len(w), n_weeks * 168))
+        by_week[:, offset : offset + n_rows] = w
+        week_targets = np.lib.stride_tricks.as_strided(
+            padded, shape=(len(w), n_weeks, 168, horizon), strides=(padded.strides[0], 168 * step, step, step)
+        )
+        week_sums = np.einsum("skw,skwh->swh", by_week.reshape(len(w), n_weeks, 168), week_targets)
+        out[:, CALENDAR_COLS] = CALENDAR_ROWS.T @ week_sums
+    return gram, xty
+
+
+def _direct_predict(betas: np.ndarray, recent: np.ndarray, last_hours: np.ndarray) -> np.ndarray:
+    """All steps of the direct model at once: one design row per series times its (p, steps) betas."""
+    x = np.zeros((len(betas), N_FEATURES))
+    x[:, 0] = 1.0
+    x[:, 1 : 1 + len(LAGS)] = recent[:, [MAX_LAG - lag for lag in LAGS]]
+    hour, dow = _calendar_index(last_hours + 1)
+    rows = np.arange(len(betas))
+    x[rows[hour > 0], HOUR_COL + hour[hour > 0]] = 1.0
+    x[rows[dow > 0], DOW_COL + dow[dow > 0]] = 1.0
+    return np.maximum((x[:, None, :] @ betas)[:, 0, :], 0.0)
+
+
+def _pooled_betas(gram: np.ndarray, xty: np.ndarray, obs_sum: np.ndarray, obs_hours: np.ndarray) -> np.ndarray:
+    """Per-series betas of the pooled model: shared lag/calendar coefficients, own level.
+
+    The within transform turns per-series sufficient statistics into the statistics of the
+    series-demeaned design, so the shared coefficients need one (p-1)x(p-1) solve across all
+    series and each level is that series' mean target minus its mean fitted effect. A series
+    without a full-lag row gets the level that makes its observed mean the model's steady state.
+    """
+    n_rows = gram[:, 0, 0]
+    safe = np.maximum(n_rows, 1.0)
+    means = gram[:, 0, 1:] / safe[:, None]
+    y_mean = xty[:, 0] / safe
+    within_gram = (gram[:, 1:, 1:] - n_rows[:, None, None] * means[:, :, None] * means[:, None, :]).sum(axis=0)
+    within_xty = (xty[:, 1:] - n_rows[:, None] * means * y_mean[:, None]).sum(axis=0)
+    shared = np.linalg.pinv(within_gram, hermitian=True) @ within_xty
+
+    week_effect = CALENDAR_ROWS[:, 1:] @ shared[CALENDAR_COLS[1:] - 1]
+    n_seen = np.maximum(obs_hours.sum(axis=1), 1.0)
+    steady_level = obs_sum / n_seen * (1.0 - shared[: len(LAGS)].sum()) - obs_hours @ week_effect / n_seen
+
+    betas = np.empty((len(gram), N_FEATURES))
+    betas[:, 1:] = shared
+    betas[:, 0] = np.where(n_rows > 0, y_mean - means @ shared, steady_level)
+    return betas
+
+
+# Gram matrices whose smallest eigenvalue, after scaling to a unit diagonal, falls below this
+# fraction of the largest are treated as rank-deficient.
+RANK_TOLERANCE = 1e-10
+
+# Precision given to directions a series' history never spanned (an unseen column, or a
+# combination of collinear ones): a weak ridge prior instead of pinv's zero, so that RLS
+# updates can still learn them once the data reaches them.
+PRIOR_PRECISION = 1e8
+# Relative eigenvalue cutoff of the minimum-norm solution, numpy's pinv default.
+PINV_RCOND = 1e-15
+
+
+def _solve_normal_equations(gram: np.ndarray, xty: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Least-squares coefficients for a stack of normal equations, like lstsq per series.
+
+    The lag columns are orders of magnitude larger than the one-hot columns, so each Gram
+    matrix is first scaled to a unit diagonal; the scaled system is then solved by Cholesky,
+    which keeps the coefficients within about 1e-12 of lstsq on the design itself. A column
+    that is zero in every row (e.g. an hour of the week a series never saw) is decoupled:
+    it gets a unit diagonal for the solve and a zero coefficient, as in the minimum-norm
+    solution. A system that is still rank-deficient has no Cholesky factor and takes the
+    minimum-norm pinv solution, as lstsq does. xty is (series, p), or (series, p, k) for k
+    right-hand sides.
+
+    Also returns the inverse Gram matrices, the starting precision for RLS updates. Directions
+    the data never spanned get PRIOR_PRECISION rather than zero, i.e. the inverse of
+    gram + N / PRIOR_PRECISION for the projector N onto them; the coefficients are unchanged.
+    """
+    rhs = xty if xty.ndim == 3 else xty[:, :, None]
+    scale = np.sqrt(np.einsum("sii->si", gram))
+    unseen = scale == 0
+    scale[unseen] = 1.0
+    scaled = gram / (scale[:, :, None] * scale[:, None, :])
+    scaled[unseen[:, :, None] & np.eye(gram.shape[1], dtype=bool)] = 1.0
+    eigenvalues = np.linalg.eigvalsh(scaled)
+    full_rank = eigenvalues[:, 0] > RANK_TOLERANCE * eigenvalues[:, -1]
+
+    betas = np.empty(rhs.shape)
+    precision = np.empty(gram.shape)
+    if full_rank.any():
+        s = scale[full_rank]
+        lower = np.linalg.cholesky(scaled[full_rank])
+        upper = lower.transpose(0, 2, 1)
+        solved = np.linalg.solve(upper, np.linalg.solve(lower, rhs[full_rank] / s[:, :, None]))
+        betas[full_rank] = solved / s[:, :, None]
+        lower_inv = np.linalg.inv(lower)
+        precision[full_rank] = lower_inv.transpose(0, 2, 1) @ lower_inv / (s[:, :, None] * s[:, None, :])
+        precision[full_rank] *= ~(unseen[full_rank, :, None] | unseen[full_rank, None, :])
+        precision[full_rank] += PRIOR_PRECISION * (unseen[full_rank, :, None] & np.eye(gram.shape[1], dtype=bool))
+    if not full_rank.all():
+        eigenvalues, vectors = np.linalg.eigh(gram[~full_rank])
+        spanned = eigenvalues > PINV_RCOND * np.abs(eigenvalues).max(axis=1, keepdims=True)
+        inverse = np.where(spanned, 1.0 / np.where(spanned, eigenvalues, 1.0), PRIOR_PRECISION)
+        pinv = (vectors * np.where(spanned, inverse, 0.0)[:, None, :]) @ vectors.transpose(0, 2, 1)
+        precision[~full_rank] = (vectors * inverse[:, None, :]) @ vectors.transpose(0, 2, 1)
+        betas[~full_rank] = pinv @ rhs[~full_rank]
+    return (betas if xty.ndim == 3 else betas[:, :, 0]), precision
+
+
+SERIES_BLOCK = 1024
+# Series per target window when accumulating the direct model's X'Y.
+DIRECT_STATS_BLOCK = 16
+# Series per process-pool task in parallel training; a multiple of SERIES_BLOCK.
+SHARD_SERIES = 4 * SERIES_BLOCK
+
+
+def _series_header(model_name: str, panel: dict, columns: np.ndarray, compact: np.ndarray, n_obs: np.ndarray) -> dict:
+    """Registry fields shared by every model: series ids, last timestamp, and recent average."""
+    last_col = np.take_along_axis(columns, (n_obs - 1)[:, None], axis=1)[:, 0]
+    return {
+        "model_name": model_name,
+        "zone_id": panel["zone_id"],
+        "segment_id": panel["segment_id"],
+        "last_timestamp": panel["timestamps"][last_col].astype("datetime64[us]"),
+        "recent_actual_avg": np.nanmean(_rank_window(compact, n_obs, 72), axis=1),
+    }
 
-    return np.array(preds)
 
+def _concat_blocks(blocks: list[dict]) -> dict:
+    return {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0]}
+
+
+def _fit_baseline_block(values: np.ndarray, hours: np.ndarray) -> dict:
+    """Baseline components and holdout band for one block of panel rows.
+
+    The train-split fit scores the holdout; the full-history fit is what forecasts.
+    """
+    compact, columns, n_obs = _compact_panel(values)
+    split = n_obs - _holdout_hours(n_obs)
+    hour, dow = _calendar_index(hours)
+    comp_train = _fit_baseline_components(values, compact, split, hour, dow)
+    fit = _fit_baseline_components(values, compact, n_obs, hour, dow)
+
+    holdout = n_obs - split
+    horizon = int(holdout.max())
+    val_rank = np.clip(split[:, None] + np.arange(horizon), 0, compact.shape[1] - 1)
+    val_pred = _baseline_predict(comp_train, hours[np.take_along_axis(columns, val_rank, axis=1)])
+    val_actual = _rank_window(compact, split + horizon, horizon)
+    val_actual[np.arange(horizon)[None, :] >= holdout[:, None]] = np.nan
+    fit["uncertainty"] = estimate_uncertainty_batch(val_actual, val_pred)
+    return fit
+
+
+def _split_regression_stats(values: np.ndarray, hours: np.ndarray) -> dict:
+    """Train-split and holdout sufficient statistics for one block of panel rows.
+
+    The holdout is each series' last _holdout_hours observations; the statistics of the
+    full history are the sum of both. A panel of MAX_LAG hours or fewer has no target hours.
+    """
+    n_targets = max(values.shape[1] - MAX_LAG, 0)
+    valid = ~np.isnan(values)
+    n_obs = valid.sum(axis=1)
+    split = n_obs - _holdout_hours(n_obs)
+    hour, dow = _calendar_index(hours)
+    week_hour = (dow * 24 + hour)[MAX_LAG:]
+
+    target_ok = valid[:, MAX_LAG:].copy()
+    for lag in LAGS:
+        target_ok &= valid[:, MAX_LAG - lag : MAX_LAG - lag + n_targets]
+    rank = np.cumsum(valid, axis=1)[:, MAX_LAG:] - 1
+    in_train = target_ok & (rank < split[:, None])
+
+    grid = np.nan_to_num(values)
+    gram_train, xty_train = _regression_sufficient_stats(grid, in_train.astype(float), week_hour)
+    # Holdout targets sit at the end of each series, so their statistics only need the tail.
+    in_hold = target_ok & ~in_train
+    start = int(np.argmax(in_hold.any(axis=0))) if in_hold.any() else in_hold.shape[1]
+    gram_hold, xty_hold = _regression_sufficient_stats(grid[:, start:], in_hold[:, start:].astype(float), week_hour[start:])
+    return {
+        "grid": grid,
+        "target_ok": target_ok,
+        "week_hour": week_hour,
+        "in_train": in_train,
+        "gram_train": gram_train,
+        "xty_train": xty_train,
+        "gram_hold": gram_hold,
+        "xty_hold": xty_hold,
+    }
 
-def estimate_uncertainty(actuals: np.ndarray, forecasts: np.ndarray) -> tuple[float, float]:
-    """Estimate asymmetric forecast error bands from historical residual quantiles."""
-    if len(actuals) == 0 or len(forecasts) == 0:
-        return -1.0, 1.0
 
-    residuals = actuals - forecasts
-    low_q = float(np.quantile(residuals, 0.10))
-    high_q = float(np.quantile(residuals, 0.90))
-
-    if np.isclose(low_q, high_q):
-        spread = float(np.std(residuals))
-        spread = spread if spread > 0 else 1.0
-        return -spread, spread
-
-    return low_q, high_q
-
-
-def train_baseline_forecaster(df: pd.DataFrame) -> dict:
-    """Train a seasonal baseline forecaster that encodes hour/day demand structure."""
-    series_models = []
-
-    for (zone_id, segment_id), g in df.groupby(["zone_id", "segment_id"], observed=True):
-        g = g.sort_values("timestamp").reset_index(drop=True)
-        n = len(g)
-        holdout = min(72, max(24, n // 10))
-        split = n - holdout
-
-        train_df = g.iloc[:split].copy()
-        val_df = g.iloc[split:].copy()
-
-        comp_train = _fit_baseline_components(train_df)
-        val_pred = _baseline_predict(comp_train, pd.DatetimeIndex(val_df["timestamp"]))
-        low_adj, high_adj = estimate_uncertainty(val_df["final_demand"].values, val_pred)
-
-        comp_full = _fit_baseline_components(g)
-        series_models.append(
-            {
-                "zone_id": zone_id,
-                "segment_id": segment_id,
-                "last_timestamp": g["timestamp"].iloc[-1],
-                "components": comp_full,
-                "uncertainty": (low_adj, high_adj),
-                "recent_actual_avg": float(g["final_demand"].tail(72).mean()),
-            }
-        )
+def _fit_regression_block(values: np.ndarray, hours: np.ndarray) -> dict:
+    """Train-split and full-history least-squares fits for one block of panel rows.
 
-    return {"model_name": "baseline", "series_models": series_models}
+    The holdout fit solves the train statistics and the full fit solves their sum.
+    """
+    stats = _split_regression_stats(values, hours)
+    betas_train, _ = _solve_normal_equations(stats["gram_train"], stats["xty_train"])
+    betas, precision = _solve_normal_equations(
+        stats["gram_train"] + stats["gram_hold"], stats["xty_train"] + stats["xty_hold"]
+    )
+    residuals = _one_step_residuals(betas, stats["grid"], stats["target_ok"], stats["week_hour"])
+    res_compact, _, n_res = _compact_panel(residuals)
+    return {
+        "betas_train": betas_train,
+        "betas": betas,
+        "precision": precision,
+        "residuals": _rank_window(res_compact, n_res, RESIDUAL_HOURS),
+        "train_rows": stats["in_train"].sum(axis=1),
+    }
 
 
-def train_regression_forecaster(df: pd.DataFrame) -> dict:
-    """Train an explicit linear lag+calendar forecaster using least squares."""
-    series_models = []
+def _pooled_block_stats(values: np.ndarray, hours: np.ndarray) -> dict:
+    """Per-series statistics for the pooled fit of one block of panel rows.
 
-    for (zone_id, segment_id), g in df.groupby(["zone_id", "segment_id"], observed=True):
-        g = g.sort_values("timestamp").reset_index(drop=True)
-        y_all = g["final_demand"].values.astype(float)
-        n = len(g)
-        holdout = min(72, max(24, n // 10))
-        split = n - holdout
+    Besides the train-split and full sufficient statistics, each series' observation sum and
+    observations per hour of the week (over the train split and the full history) set the
+    level of series too short for a single full-lag row.
+    """
+    stats = _split_regression_stats(values, hours)
+    valid = ~np.isnan(values)
+    n_obs = valid.sum(axis=1)
+    in_train = valid & (np.cumsum(valid, axis=1) <= (n_obs - _holdout_hours(n_obs))[:, None])
+    hour, dow = _calendar_index(hours)
+    week_hot = ((dow * 24 + hour)[:, None] == np.arange(168)).astype(float)
+    return {
+        "gram_train": stats["gram_train"],
+        "xty_train": stats["xty_train"],
+        "gram": stats["gram_train"] + stats["gram_hold"],
+        "xty": stats["xty_train"] + stats["xty_hold"],
+        "obs_sum_train": (stats["grid"] * in_train).sum(axis=1),
+        "obs_hours_train": in_train.astype(float) @ week_hot,
+        "obs_sum": stats["grid"].sum(axis=1),
+        "obs_hours": valid.astype(float) @ week_hot,
+    }
 
-        g_train = g.iloc[:split].copy()
-        X_train, y_train, _ = _make_regression_matrix(g_train)
-        if len(y_train) == 0:
-            continue
 
-        beta_train, *_ = np.linalg.lstsq(X_train, y_train, rcond=None)
-        val_pred = _regression_recursive_forecast(
-            beta_train,
-            g_train["final_demand"].values,
-            g_train["timestamp"].iloc[-1],
-            holdout,
-        )
-        low_adj, high_adj = estimate_uncertainty(y_all[split:], val_pred)
-
-        X_full, y_full, _ = _make_regression_matrix(g)
-        beta_full, *_ = np.linalg.lstsq(X_full, y_full, rcond=None)
-
-        series_models.append(
-            {
-                "zone_id": zone_id,
-                "segment_id": segment_id,
-                "last_timestamp": g["timestamp"].iloc[-1],
-                "history": y_all,
-                "beta": beta_full,
-                "uncertainty": (low_adj, high_adj),
-                "recent_actual_avg": float(g["final_demand"].tail(72).mean()),
-            }
-        )
+def _fit_direct_block(values: np.ndarray, hours: np.ndarray) -> dict:
+    """Train-split and full-history direct multi-horizon fits for one block of panel rows.
+
+    An origin is used when its lags and all DIRECT_HORIZON targets are observed; it belongs
+    to the train split when its last target does. Each fit is one stacked solve of the shared
+    Gram matrices for all steps' X'y columns.
+    """
+    n_series, n_hours = values.shape
+    valid = ~np.isnan(values)
+    n_obs = valid.sum(axis=1)
+    split = n_obs - _holdout_hours(n_obs)
+    hour, dow = _calendar_index(hours)
+    week_hour = (dow * 24 + hour)[MAX_LAG:]
+
+    n_rows = max(n_hours - MAX_LAG - DIRECT_HORIZON + 1, 0)
+    usable = valid[:, MAX_LAG : MAX_LAG + n_rows].copy()
+    for lag in LAGS:
+        usable &= valid[:, MAX_LAG - lag : MAX_LAG - lag + n_rows]
+    observed = np.concatenate([np.zeros((n_series, 1), dtype=np.int64), np.cumsum(valid[:, MAX_LAG:], axis=1)], axis=1)
+    usable &= observed[:, DIRECT_HORIZON : DIRECT_HORIZON + n_rows] - observed[:, :n_rows] == DIRECT_HORIZON
+    last_rank = np.cumsum(valid, axis=1)[:, MAX_LAG + DIRECT_HORIZON - 1 :][:, :n_rows] - 1
+    in_train = usable & (last_rank < split[:, None])
+
+    grid = np.nan_to_num(values)
+    gram_train, xty_train = _direct_sufficient_stats(grid, in_train.astype(float), week_hour, DIRECT_HORIZON)
+    # Holdout origins sit at the end of each series, so their statistics only need the tail.
+    in_hold = usable & ~in_train
+    start = int(np.argmax(in_hold.any(axis=0))) if in_hold.any() else n_rows
+    gram_hold, xty_hold = _direct_sufficient_stats(
+        grid[:, start:], in_hold[:, start:].astype(float), week_hour[start:], DIRECT_HORIZON
+    )
+    return {
+        "betas_train": _solve_normal_equations(gram_train, xty_train)[0],
+        "betas": _solve_normal_equations(gram_train + gram_hold, xty_train + xty_hold)[0],
+        "train_rows": in_train.sum(axis=1),
+    }
 
-    return {"model_name": "regression", "series_models": series_models}
 
+BLOCK_FITS = {
+    "baseline": _fit_baseline_block,
+    "regression": _fit_regression_block,
+    "pooled": _pooled_block_stats,
+    "direct": _fit_direct_block,
+}
+
+
+def _fit_rows(kind: str, values: np.ndarray, hours: np.ndarray) -> dict:
+    """Fit consecutive SERIES_BLOCK-row blocks of a panel and stack the results."""
+    return _concat_blocks(
+        [BLOCK_FITS[kind](np.asarray(values[lo : lo + SERIES_BLOCK]), hours) for lo in range(0, len(values), SERIES_BLOCK)]
+    )
+
+
+def _fit_shard(task: tuple) -> dict:
+    """Process-pool worker: fit one shard of rows read from the memory-mapped panel."""
+    kind, panel_path, lo, hi, hours = task
+    return _fit_rows(kind, np.load(panel_path, mmap_mode="r")[lo:hi], hours)
+
+
+def _fit_panel(kind: str, values: np.ndarray, hours: np.ndarray, workers: int = 1, shard_series: int = SHARD_SERIES) -> dict:
+    """Fit every series of the panel, optionally across a process pool.
+
+    With workers > 1 the panel is saved once as an .npy that every worker memory-maps, so
+    only shard bounds travel to the workers and only the fitted arrays come back. Rows are
+    always fit in the same SERIES_BLOCK blocks and merged in series order, so the model is
+    identical for any worker count.
+    """
+    if workers <= 1 or len(values) <= SERIES_BLOCK:
+        return _fit_rows(kind, values, hours)
+
+    bounds = [(lo, min(lo + shard_series, len(values))) for lo in range(0, len(values), shard_series)]
+    with tempfile.TemporaryDirectory() as tmp:
+        panel_path = Path(tmp) / "panel.npy"
+        np.save(panel_path, values)
+        tasks = [(kind, panel_path, lo, hi, hours) for lo, hi in bounds]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return _concat_blocks(list(executor.map(_fit_shard, tasks)))
+
+
+def train_baseline_forecaster(df: pd.DataFrame, workers: int = 1) -> dict:
+    """Train a seasonal baseline forecaster that encodes hour/day demand structure.
+
+    All series are fit together from the pivoted panel, a block of series at a time (across
+    `workers` processes if > 1): once on the train split to score the holdout, once on the
+    full history for forecasting.
+    """
+    panel = build_series_panel(df)
+    compact, columns, n_obs = _compact_panel(panel["values"])
+    model = _series_header("baseline", panel, columns, compact, n_obs)
+    if not len(n_obs):
+        model["uncertainty"] = np.zeros((0, 2))
+        return model
+    model.update(_fit_panel("baseline", panel["values"], _epoch_hours(panel["timestamps"]), workers))
+    return model
+
+
+def train_regression_forecaster(df: pd.DataFrame, workers: int = 1) -> dict:
+    """Train an explicit linear lag+calendar forecaster using least squares.
+
+    Every series is fit at once from sufficient statistics, a block of series at a time
+    (across `workers` processes if > 1). The model keeps stacked arrays only: betas, the
+    inverse Gram matrix (for update_regression_forecaster), the last MAX_LAG observations,
+    the last RESIDUAL_HOURS one-step residuals (for sample paths), and the uncertainty band
+    of each series.
+    """
+    panel = build_series_panel(df)
+    compact, columns, n_obs = _compact_panel(panel["values"])
+    split = n_obs - _holdout_hours(n_obs)
+    timestamps = panel["timestamps"]
+    fits = _fit_panel("regression", panel["values"], _epoch_hours(timestamps), workers)
+
+    # Series without a single full-lag training row cannot be fit.
+    fitted = fits["train_rows"] > 0
+    compact, columns, n_obs, split = compact[fitted], columns[fitted], n_obs[fitted], split[fitted]
+
+    # Holdout forecasts for every series run as one batch at the longest holdout.
+    holdout = n_obs - split
+    horizon = int(holdout.max()) if len(holdout) else 0
+    val_last = timestamps[np.take_along_axis(columns, (split - 1)[:, None], axis=1)[:, 0]]
+    val_preds = _recursive_forecast_batch(
+        fits["betas_train"][fitted], _rank_window(compact, split, MAX_LAG), _epoch_hours(val_last), horizon
+    )
+    val_actual = _rank_window(compact, split + horizon, horizon)
+    val_actual[np.arange(horizon)[None, :] >= holdout[:, None]] = np.nan
+
+    panel = {**panel, "zone_id": panel["zone_id"][fitted], "segment_id": panel["segment_id"][fitted]}
+    model = _series_header("regression", panel, columns, compact, n_obs)
+    model["uncertainty"] = estimate_uncertainty_batch(val_actual, val_preds)
+    model["betas"] = fits["betas"][fitted]
+    model["precision"] = fits["precision"][fitted]
+    model["recent"] = _rank_window(compact, n_obs, MAX_LAG)
+    model["residuals"] = fits["residuals"][fitted]
+    return model
+
+
+def train_pooled_forecaster(df: pd.DataFrame, workers: int = 1) -> dict:
+    """Train one pooled lag+calendar regression across all series, with per-series levels.
+
+    Per-series sufficient statistics are accumulated a block at a time (across `workers`
+    processes if > 1) and _pooled_betas solves them jointly, once on the train split to
+    score the holdout and once on the full history. Every series gets a model, including
+    series too short for the per-series regression: lag slots before a series' first
+    observation are filled with its mean, and series too short to hold out any hours borrow
+    the median band of the others.
+    """
+    panel = build_series_panel(df)
+    compact, columns, n_obs = _compact_panel(panel["values"])
+    split = n_obs - _holdout_hours(n_obs)
+    timestamps = panel["timestamps"]
+    stats = _fit_panel("pooled", panel["values"], _epoch_hours(timestamps), workers)
+    betas_train = _pooled_betas(stats["gram_train"], stats["xty_train"], stats["obs_sum_train"], stats["obs_hours_train"])
+    betas = _pooled_betas(stats["gram"], stats["xty"], stats["obs_sum"], stats["obs_hours"])
+
+    def filled(recent: np.ndarray, obs_sum: np.ndarray, obs_hours: np.ndarray) -> np.ndarray:
+        mean = obs_sum / np.maximum(obs_hours.sum(axis=1), 1.0)
+        return np.where(np.isnan(recent), mean[:, None], recent)
+
+    has_train = split > 0
+    holdout = n_obs - split
+    horizon = int(holdout[has_train].max()) if has_train.any() else 0
+    val_last = timestamps[np.take_along_axis(columns, (np.maximum(split, 1) - 1)[:, None], axis=1)[:, 0]]
+    val_recent = filled(_rank_window(compact, split, MAX_LAG), stats["obs_sum_train"], stats["obs_hours_train"])
+    val_preds = _recursive_forecast_batch(betas_train, val_recent, _epoch_hours(val_last), horizon)
+    val_actual = _rank_window(compact, split + horizon, horizon)
+    val_actual[np.arange(horizon)[None, :] >= holdout[:, None]] = np.nan
+    bands = estimate_uncertainty_batch(val_actual, val_preds)
+    if has_train.any():
+        bands[~has_train] = np.median(bands[has_train], axis=0)
+
+    model = _series_header("pooled", panel, columns, compact, n_obs)
+    model["uncertainty"] = bands
+    model["betas"] = betas
+    model["recent"] = filled(_rank_window(compact, n_obs, MAX_LAG), stats["obs_sum"], stats["obs_hours"])
+    return model
+
+
+def train_direct_forecaster(df: pd.DataFrame, workers: int = 1) -> dict:
+    """Train a direct multi-horizon forecaster: one coefficient vector per step up to DIRECT_HORIZON.
+
+    Every step regresses its target on the same origin design (the one-step lag+calendar
+    row), so a series' fit is one multi-output least-squares solve and a forecast is one
+    matrix product, with no recursion and no compounding of fed-back predictions. Series
+    are fit a block at a time (across `workers` processes if > 1); series without a single
+    complete training origin are skipped.
+    """
+    panel = build_series_panel(df)
+    compact, columns, n_obs = _compact_panel(panel["values"])
+    split = n_obs - _holdout_hours(n_obs)
+    timestamps = panel["timestamps"]
+    fits = _fit_panel("direct", panel["values"], _epoch_hours(timestamps), workers)
+
+    fitted = fits["train_rows"] > 0
+    compact, columns, n_obs, split = compact[fitted], columns[fitted], n_obs[fitted], split[fitted]
+
+    holdout = n_obs - split
+    horizon = int(holdout.max()) if len(holdout) else 0
+    val_last = timestamps[np.take_along_axis(columns, (split - 1)[:, None], axis=1)[:, 0]]
+    val_preds = _direct_predict(fits["betas_train"][fitted], _rank_window(compact, split, MAX_LAG), _epoch_hours(val_last))
+    val_actual = _rank_window(compact, split + horizon, horizon)
+    val_actual[np.arange(horizon)[None, :] >= holdout[:, None]] = np.nan
+
+    panel = {**panel, "zone_id": panel["zone_id"][fitted], "segment_id": panel["segment_id"][fitted]}
+    model = _series_header("direct", panel, columns, compact, n_obs)
+    model["uncertainty"] = estimate_uncertainty_batch(val_actual, val_preds[:, :horizon])
+    model["direct_betas"] = fits["betas"][fitted]
+    model["recent"] = _rank_window(compact, n_obs, MAX_LAG)
+    return model
+
+
+def update_regression_forecaster(model: dict, df: pd.DataFrame, forgetting: float = 1.0) -> dict:
+    """Absorb new hourly actuals into a trained regression model with recursive least squares.
+
+    df holds new fact_orders rows (timestamp, zone_id, segment_id, final_demand). Hour by
+    hour, every series whose next observation arrives is updated together: its design row
+    comes from the lag buffer, and a rank-one (Sherman-Morrison) update of its inverse Gram
+    matrix and betas costs O(p^2). With forgetting=1.0 the betas equal a full refit on the
+    extended history; directions the earlier history never spanned start from the weak
+    PRIOR_PRECISION prior and agree to about 1e-8. forgetting < 1 discounts older hours
+    geometrically. Each update's prior error joins the series' residual pool. Rows must
+    continue each series hour by hour after its last_timestamp; other rows and unknown series
+    are ignored. Returns an updated copy of the model.
+    """
+    if not 0.0 < forgetting <= 1.0:
+        raise ValueError("forgetting must be in (0, 1].")
+
+    model = {key: value.copy() if isinstance(value, np.ndarray) else value for key, value in model.items()}
+    panel = build_series_panel(df)
+    model_keys = pd.MultiIndex.from_arrays([model["zone_id"], model["segment_id"]])
+    position = model_keys.get_indexer(pd.MultiIndex.from_arrays([panel["zone_id"], panel["segment_id"]]))
+    values = np.full((len(model_keys), panel["values"].shape[1]), np.nan)
+    values[position[position >= 0]] = panel["values"][position >= 0]
+
+    last_hours = _epoch_hours(model["last_timestamp"])
+    recent, betas, precision, residuals = model["recent"], model["betas"], model["precision"], model["residuals"]
+    lag_slots = MAX_LAG - np.array(LAGS)
+
+    for t, hour_t in enumerate(_epoch_hours(panel["timestamps"])):
+        y = values[:, t]
+        idx = np.flatnonzero(~np.isnan(y) & (last_hours + 1 == hour_t) & ~np.isnan(recent).any(axis=1))
+        if not len(idx):
+            continue
 
-def forecast_next_horizon(model: dict, horizon_hours: int) -> pd.DataFrame:
+        x = np.zeros((len(idx), N_FEATURES))
+        x[:, 0] = 1.0
+        x[:, 1 : 1 + len(LAGS)] = recent[idx][:, lag_slots]
+        hour, dow = _calendar_index(hour_t)
+        if hour > 0:
+            x[:, HOUR_COL + hour] = 1.0
+        if dow > 0:
+            x[:, DOW_COL + dow] = 1.0
+
+        p_x = (precision[idx] @ x[:, :, None])[:, :, 0]
+        gain = p_x / (forgetting + (x * p_x).sum(axis=1))[:, None]
+        error = y[idx] - (x * betas[idx]).sum(axis=1)
+        betas[idx] += gain * error[:, None]
+        precision[idx] = (precision[idx] - gain[:, :, None] * p_x[:, None, :]) / forgetting
+
+        recent[idx] = np.concatenate([recent[idx, 1:], y[idx, None]], axis=1)
+        residuals[idx] = np.concatenate([residuals[idx, 1:], error[:, None]], axis=1)
+        last_hours[idx] = hour_t
+
+    model["last_timestamp"] = last_hours.astype("datetime64[h]").astype("datetime64[us]")
+    model["recent_actual_avg"] = recent[:, -72:].mean(axis=1)
+    return model
+
+
+# Residuals a sketch cell needs before its quantiles replace the model's holdout band.
+SKETCH_MIN_COUNT = 30
+
+
+def _sketch_rows(sketch: dict, zone_id: np.ndarray, segment_id: np.ndarray) -> np.ndarray:
+    """Sketch row of every given series, -1 where the sketch has none."""
+    index = pd.MultiIndex.from_arrays([sketch["zone_id"], sketch["segment_id"]])
+    return index.get_indexer(pd.MultiIndex.from_arrays([np.asarray(zone_id, dtype=object), np.asarray(segment_id, dtype=object)]))
+
+
+def _sketch_bands(model: dict, sketch: dict, horizon_hours: int) -> np.ndarray:
+    """Residual 10th/90th percentiles per series and horizon step, (series, horizon, 2).
+
+    Cells come from the sketch of the same step (steps past the sketch's horizon use its
+    last step); cells with fewer than SKETCH_MIN_COUNT residuals, or a degenerate band, keep
+    the model's constant holdout band.
+    """
+    bands = np.repeat(model["uncertainty"][:, None, :], horizon_hours, axis=1)
+    rows = _sketch_rows(sketch, model["zone_id"], model["segment_id"])
+    steps = np.minimum(np.arange(horizon_hours), sketch["counts"].shape[1] - 1)
+    for lo in range(0, len(rows), SERIES_BLOCK):
+        block = rows[lo : lo + SERIES_BLOCK]
+        found = block >= 0
+        counts = sketch["counts"][np.ix_(block[found], steps)]
+        quantiles = sketch_quantiles(counts, (0.10, 0.90))
+        usable = (sketch_count(counts) >= SKETCH_MIN_COUNT) & (quantiles[..., 0] < quantiles[..., 1])
+        target = bands[lo : lo + SERIES_BLOCK]
+        target[found] = np.where(usable[..., None], quantiles, target[found])
+    return bands
+
+
+def absorb_forecast_errors(sketches: dict, forecasts: pd.DataFrame, actuals: pd.DataFrame) -> int:
+    """Add the errors of earlier forecasts whose actuals have since arrived to the sketches.
+
+    forecasts is a demand_forecasts table; a row's horizon step counts from its series' first
+    forecast hour. Only hours after a sketch's absorbed_through are taken, so absorbing the
+    same forecasts again never counts an error twice. Returns the residuals absorbed.
+    """
+    keys = ["timestamp", "zone_id", "segment_id"]
+    scored = forecasts.merge(actuals[keys + ["final_demand"]], on=keys, how="inner")
+    absorbed = 0
+    for name, sketch in sketches.items():
+        rows = scored[scored["forecast_model"].astype(str) == name]
+        if rows.empty:
+            continue
+        first = forecasts[forecasts["forecast_model"].astype(str) == name].groupby(
+            ["zone_id", "segment_id"], observed=True
+        )["timestamp"].min().rename("first_timestamp")
+        rows = rows.join(first, on=["zone_id", "segment_id"])
+        step = ((rows["timestamp"] - rows["first_timestamp"]) // pd.Timedelta(hours=1)).to_numpy()
+        series = _sketch_rows(sketch, rows["zone_id"], rows["segment_id"])
+        timestamps = rows["timestamp"].to_numpy()
+        keep = (series >= 0) & (step < sketch["counts"].shape[1]) & (timestamps > sketch["absorbed_through"])
+        if not keep.any():
+            continue
+        residuals = np.full(sketch["counts"].shape[:2], np.nan)
+        residuals[series[keep], step[keep]] = (rows["final_demand"] - rows["forecast_demand"]).to_numpy()[keep]
+        sketch_update(sketch["counts"], residuals)
+        sketch["absorbed_through"] = timestamps[keep].max()
+        absorbed += int(keep.sum())
+    return absorbed
+
+
+def _refresh_sketches(directory: Path = SKETCH_DIR) -> dict:
+    """Stored residual sketches, first updated with the errors of the last written forecasts.
+
+    Actuals are streamed only from the first hour of those forecasts on. Empty when no
+    sketches are stored (run forecasting/backtest.py to build them).
+    """
+    sketches = load_sketches(directory)
+    if not sketches:
+        return sketches
+    try:
+        forecasts = read_table("demand_forecasts", OUTPUT_DIR)
+    except FileNotFoundError:
+        return sketches
+    if forecasts.empty:
+        return sketches
+    actuals = read_table_since("fact_orders", SOURCE_DIR, forecasts["timestamp"].min(), columns=REQUIRED_COLS)
+    absorbed = absorb_forecast_errors(sketches, forecasts, actuals)
+    if absorbed:
+        save_sketches(sketches, directory)
+        print(f"Absorbed {absorbed:,} forecast errors into the residual sketches in {directory}\n")
+    return sketches
+
+
+def forecast_arrays(model: dict, horizon_hours: int, sketch: dict | None = None) -> dict:
+    """Point forecasts and bounds as (series, horizon) arrays, in the model's series order.
+
+    Returns {"hours": epoch hours, "point", "lower", "upper"}. With a residual sketch of this
+    model, bands are taken per horizon step from it, so they widen with the step; otherwise
+    every step shares the model's holdout band.
+    """
+    last_hours = _epoch_hours(model["last_timestamp"])
+    future_hours = last_hours[:, None] + np.arange(1, horizon_hours + 1)
+
+    if model["model_name"] == "baseline":
+        point = _baseline_predict(model, future_hours)
+    elif model["model_name"] == "direct":
+        steps = model["direct_betas"].shape[2]
+        if horizon_hours > steps:
+            raise ValueError(f"The direct model forecasts at most {steps} hours; got {horizon_hours}.")
+        point = _direct_predict(model["direct_betas"], model["recent"], last_hours)[:, :horizon_hours]
+    else:
+        # Every regression series advances together through one batched recursion.
+        point = _recursive_forecast_batch(model["betas"], model["recent"], last_hours, horizon_hours)
+
+    if sketch is None:
+        lower = np.clip(point + model["uncertainty"][:, :1], 0.0, None)
+        upper = np.clip(point + model["uncertainty"][:, 1:], 0.0, None)
+    else:
+        bands = _sketch_bands(model, sketch, horizon_hours)
+        lower = np.clip(point + bands[..., 0], 0.0, None)
+        upper = np.clip(point + bands[..., 1], 0.0, None)
+    return {"hours": future_hours, "point": point, "lower": lower, "upper": upper}
+
+
+def forecast_next_horizon(model: dict, horizon_hours: int, sketch: dict | None = None) -> pd.DataFrame:
     """Generate horizon forecasts with uncertainty bounds for each zone-segment series."""
-    rows = []
-
-    for m in model["series_models"]:
-        future_ts = pd.date_range(
-            start=m["last_timestamp"] + pd.Timedelta(hours=1),
-            periods=horizon_hours,
-            freq="h",
-        )
-
-        if model["model_name"] == "baseline":
-            point = _baseline_predict(m["components"], future_ts)
-        else:
-            point = _regression_recursive_forecast(m["beta"], m["history"], m["last_timestamp"], horizon_hours)
-
-        low_adj, high_adj = m["uncertainty"]
-        lower = np.clip(point + low_adj, 0.0, None)
-        upper = np.clip(point + high_adj, 0.0, None)
-
-        part = pd.DataFrame(
-            {
-                "timestamp": future_ts,
-                "zone_id": m["zone_id"],
-                "segment_id": m["segment_id"],
-                "forecast_model": model["model_name"],
-                "forecast_demand": point,
-                "lower_bound": lower,
-                "upper_bound": upper,
-            }
-        )
-        rows.append(part)
-
-    if not rows:
-        return pd.DataFrame(
-            columns=[
-                "timestamp",
-                "zone_id",
-                "segment_id",
-                "forecast_model",
-                "forecast_demand",
-                "lower_bound",
-                "upper_bound",
-            ]
-        )
-
-    return pd.concat(rows, ignore_index=True)
+    arrays = forecast_arrays(model, horizon_hours, sketch)
+    return pd.DataFrame(
+        {
+            "timestamp": arrays["hours"].ravel().astype("datetime64[h]").astype("datetime64[us]"),
+            "zone_id": np.repeat(model["zone_id"], horizon_hours),
+            "segment_id": np.repeat(model["segment_id"], horizon_hours),
+            "forecast_model": model["model_name"],
+            "forecast_demand": arrays["point"].ravel(),
+            "lower_bound": arrays["lower"].ravel(),
+            "upper_bound": arrays["upper"].ravel(),
+        }
+    )
+
+
+def forecast_horizons(model: dict, horizons: list[int], sketch: dict | None = None) -> dict[int, pd.DataFrame]:
+    """Forecast once at the longest requested horizon and slice out every shorter one.
+
+    Each slice holds the first h steps of every series, exactly what a separate h-hour
+    forecast would return; the recursion runs only once.
+    """
+    longest = max(horizons)
+    full = forecast_next_horizon(model, longest, sketch)
+    step = np.tile(np.arange(1, longest + 1), len(model["zone_id"]))
+    return {h: full[step <= h].reset_index(drop=True) for h in horizons}
 
 
 def _print_sanity(forecast_df: pd.DataFrame, model: dict, horizon_hours: int) -> None:
-    recent_avg = np.mean([s["recent_actual_avg"] for s in model["series_models"]])
+    recent_avg = np.mean(model["recent_actual_avg"])
     forecast_avg = float(forecast_df["forecast_demand"].mean())
     uncertainty_width = float((forecast_df["upper_bound"] - forecast_df["lower_bound"]).mean())
 
     print(f"Model: {model['model_name']}")
-    print(f"- Number of series forecasted: {len(model['series_models'])}")
+    print(f"- Number of series forecasted: {len(model['zone_id'])}")
     print(f"- Horizon length (hours): {horizon_hours}")
     print(f"- Average forecast demand: {forecast_avg:.2f}")
     print(f"- Average recent actual demand: {recent_avg:.2f}")
     print(f"- Average uncertainty width: {uncertainty_width:.2f}")
 
 
-def run_forecasting_pipeline() -> pd.DataFrame:
+# Forecasters by name. The pooled model shares lag/calendar coefficients across series,
+# so it also covers new and short series; the direct model has one coefficient vector
+# per horizon step. Both run only when requested.
+MODEL_TRAINERS = {
+    "baseline": train_baseline_forecaster,
+    "regression": train_regression_forecaster,
+    "pooled": train_pooled_forecaster,
+    "direct": train_direct_forecaster,
+}
+DEFAULT_MODELS = ("baseline", "regression")
+
+
+def load_or_train_models(
+    retrain: bool = False,
+    model_dir: Path = MODEL_DIR,
+    update: bool = False,
+    forgetting: float = 1.0,
+    workers: int = 1,
+    history_weeks: int | None = None,
+    model_names: tuple[str, ...] = DEFAULT_MODELS,
+) -> dict:
+    """Trained models keyed by name, reused from the model store while the fingerprint matches.
+
+    The fingerprint covers the fact_orders files and MODEL_CONFIG, so models are retrained
+    only when the training data or configuration changes (or when retrain=True). With
+    update=True, stale stored models are refreshed instead: the regression model absorbs
+    only the hours after its last timestamp through RLS and the other models are refit.
+    workers > 1 trains series shards in a process pool. history_weeks trains on only the
+    latest weeks of history, and model_names picks models from MODEL_TRAINERS; both are part
+    of the fingerprint when they differ from the defaults.
+    """
+    config = dict(MODEL_CONFIG)
+    if history_weeks is not None:
+        config["history_weeks"] = history_weeks
+    if tuple(model_names) != DEFAULT_MODELS:
+        config["models"] = list(model_names)
+    model_fingerprint = fingerprint(table_files("fact_orders", SOURCE_DIR), config)
+    models = None if retrain else load_models(model_dir, model_fingerprint)
+    if models is not None:
+        print(f"Loaded trained models from {model_dir} (fingerprint {model_fingerprint[:12]})\n")
+        return models
+
+    ts_df = prepare_time_series(load_data(history_weeks))
+    stored = load_models(model_dir) if update and not retrain else None
+    regression = (stored or {}).get("regression")
+    if "regression" in model_names and regression is not None and regression.get("residuals") is not None:
+        new_rows = ts_df[ts_df["timestamp"] > regression["last_timestamp"].min()]
+        models = {
+            name: update_regression_forecaster(regression, new_rows, forgetting=forgetting)
+            if name == "regression"
+            else MODEL_TRAINERS[name](ts_df, workers=workers)
+            for name in model_names
+        }
+        save_models(list(models.values()), model_fingerprint, model_dir)
+        print(f"Updated stored models with {len(new_rows):,} new rows (fingerprint {model_fingerprint[:12]})\n")
+        return models
+
+    models = {name: MODEL_TRAINERS[name](ts_df, workers=workers) for name in model_names}
+    save_models(list(models.values()), model_fingerprint, model_dir)
+    print(f"Trained models saved to {model_dir} (fingerprint {model_fingerprint[:12]})\n")
+    return models
+
+
+def run_forecasting_pipeline(
+    retrain: bool = False,
+    update: bool = False,
+    forgetting: float = 1.0,
+    horizons: tuple[int, ...] = HORIZONS,
+    output_horizon: int = OUTPUT_HORIZON,
+    workers: int = 1,
+    history_weeks: int | None = None,
+    model_names: tuple[str, ...] = DEFAULT_MODELS,
+) -> pd.DataFrame:
     """Run end-to-end training and forecasting for decision-support demand projections."""
-    df = load_data()
-    ts_df = prepare_time_series(df)
-
-    baseline_model = train_baseline_forecaster(ts_df)
-    regression_model = train_regression_forecaster(ts_df)
-
-    # 24h run for immediate pricing horizon checks.
-    baseline_24 = forecast_next_horizon(baseline_model, 24)
-    regression_24 = forecast_next_horizon(regression_model, 24)
-    _print_sanity(baseline_24, baseline_model, 24)
-    _print_sanity(regression_24, regression_model, 24)
-
-    # 72h run for short-term planning and scenario simulation inputs.
-    baseline_72 = forecast_next_horizon(baseline_model, 72)
-    regression_72 = forecast_next_horizon(regression_model, 72)
-    _print_sanity(baseline_72, baseline_model, 72)
-    _print_sanity(regression_72, regression_model, 72)
-
-    output_df = pd.concat([baseline_72, regression_72], ignore_index=True)
+    models = load_or_train_models(
+        retrain=retrain,
+        update=update,
+        forgetting=forgetting,
+        workers=workers,
+        history_weeks=history_weeks,
+        model_names=model_names,
+    )
+    model_order = [models[name] for name in model_names]
+    sketches = _refresh_sketches()
+
+    # One forecast pass per model at the longest horizon; every horizon is a slice of it.
+    all_horizons = sorted(set(horizons) | {output_horizon})
+    slices = {m["model_name"]: forecast_horizons(m, all_horizons, sketches.get(m["model_name"])) for m in model_order}
+    for h in sorted(set(horizons)):
+        for m in model_order:
+            _print_sanity(slices[m["model_name"]][h], m, h)
+
+    output_df = pd.concat([slices[m["model_name"]][output_horizon] for m in model_order], ignore_index=True)
     output_df = output_df.sort_values(["timestamp", "zone_id", "segment_id", "forecast_model"]).reset_index(drop=True)
 
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    output_df.to_csv(OUTPUT_PATH, index=False)
+    output_path = write_table(output_df, "demand_forecasts", OUTPUT_DIR)
 
-    print(f"\nSaved forecasts to: {OUTPUT_PATH}")
+    print(f"\nSaved forecasts to: {output_path}")
     print(f"Rows written: {len(output_df):,}")
 
     return output_df
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train (or reuse) forecasters and write demand forecasts.")
+    parser.add_argument(
+        "--retrain",
+        action="store_true",
+        help="Retrain even if the model store holds models for the current data and configuration.",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="If the stored models are stale, update the regression model with only the new hours (RLS).",
+    )
+    parser.add_argument(
+        "--forgetting",
+        type=float,
+        default=1.0,
+        help="RLS forgetting factor for --update, in (0, 1]; 1.0 matches a full refit.",
+    )
+    parser.add_argument(
+        "--horizons",
+        default=",".join(str(h) for h in HORIZONS),
+        help="Comma-separated forecast horizons in hours to report, e.g. 24,72,168.",
+    )
+    parser.add_argument(
+        "--output-horizon",
+        type=int,
+        default=OUTPUT_HORIZON,
+        help="Horizon (hours) written to demand_forecasts.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for training; series shards are fit in parallel with identical results.",
+    )
+    parser.add_argument(
+        "--history-weeks",
+        type=int,
+        default=None,
+        help=f"Train on only the latest N weeks of order history (at least {MIN_HISTORY_WEEKS}); default all.",
+    )
+    parser.add_argument(
+        "--models",
+        default=",".join(DEFAULT_MODELS),
+        help=f"Comma-separated forecasters to train and write, from: {', '.join(MODEL_TRAINERS)}.",
+    )
+    args = parser.parse_args()
+    if not 0.0 < args.forgetting <= 1.0:
+        parser.error("--forgetting must be in (0, 1].")
+    try:
+        args.horizons = tuple(int(h) for h in args.horizons.split(","))
+    except ValueError:
+        parser.error("--horizons must be comma-separated integers.")
+    if min(args.horizons) < 1 or args.output_horizon < 1:
+        parser.error("Horizons must be positive.")
+    if args.workers < 1:
+        parser.error("--workers must be positive.")
+    if args.history_weeks is not None and args.history_weeks < MIN_HISTORY_WEEKS:
+        parser.error(f"--history-weeks must be at least {MIN_HISTORY_WEEKS}.")
+    args.models = tuple(dict.fromkeys(name.strip() for name in args.models.split(",")))
+    unknown = [name for name in args.models if name not in MODEL_TRAINERS]
+    if unknown:
+        parser.error(f"Unknown models: {', '.join(unknown)}. Choose from: {', '.join(MODEL_TRAINERS)}.")
+    if "direct" in args.models and max(args.horizons + (args.output_horizon,)) > DIRECT_HORIZON:
+        parser.error(f"The direct model forecasts at most {DIRECT_HORIZON} hours.")
+    return args
+
+
 if __name__ == "__main__":
-    run_forecasting_pipeline()
+    args = parse_args()
+    run_forecasting_pipeline(
+        retrain=args.retrain,
+        update=args.update,
+        forgetting=args.forgetting,
+        horizons=args.horizons,
+        output_horizon=args.output_horizon,
+        workers=args.workers,
+        history_weeks=args.history_weeks,
+        model_names=args.models,
+    )
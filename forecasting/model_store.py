@@ -0,0 +1,96 @@
+"""Persistent store for trained forecasting models.
+
+Models are the array-backed registries built by forecasting_pipeline.py (one dict of
+stacked per-series arrays per model). Each model is saved as an .npz file and a
+manifest records the fingerprint of the training data and configuration they were
+trained on. A later run, or another stage that only needs forecasts, loads the models
+instead of retraining; a changed fingerprint means the stored models are stale.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+MODEL_DIR = Path("forecasting/output/models")
+MANIFEST_FILE = "manifest.json"
+
+
+def fingerprint(files: list[Path], config: dict) -> str:
+    """SHA-256 over the training files' contents and the training configuration."""
+    digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode())
+    for path in files:
+        digest.update(path.name.encode())
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _to_arrays(model: dict) -> dict:
+    # Series ids are object arrays in memory; fixed-width strings keep the files pickle-free.
+    return {
+        key: value.astype(str) if value.dtype == object else value
+        for key, value in model.items()
+        if isinstance(value, np.ndarray)
+    }
+
+
+def save_models(models: list[dict], model_fingerprint: str, directory: Path = MODEL_DIR) -> Path:
+    """Save models and then swap in a manifest that points at them.
+
+    Files carry the fingerprint in their names and the manifest is replaced atomically, so
+    a reader in another process always sees one complete, consistent set of models.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    entries = {}
+    for model in models:
+        filename = f"{model['model_name']}-{model_fingerprint[:16]}.npz"
+        np.savez(directory / filename, **_to_arrays(model))
+        entries[model["model_name"]] = filename
+
+    manifest_path = directory / MANIFEST_FILE
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as fh:
+        json.dump({"fingerprint": model_fingerprint, "models": entries}, fh, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    for stale in directory.glob("*.npz"):
+        if stale.name not in entries.values():
+            stale.unlink()
+    return manifest_path
+
+
+def load_models(directory: Path = MODEL_DIR, model_fingerprint: str | None = None) -> dict | None:
+    """Load stored models keyed by model name.
+
+    Returns None when nothing is stored or, if model_fingerprint is given, when the stored
+    models were trained on different data or configuration.
+    """
+    manifest_path = Path(directory) / MANIFEST_FILE
+    # A concurrent save may retire the files a manifest named; re-read it once if so.
+    for attempt in range(2):
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path) as fh:
+            manifest = json.load(fh)
+        if model_fingerprint is not None and manifest["fingerprint"] != model_fingerprint:
+            return None
+        try:
+            return {name: _load_model(Path(directory) / filename, name) for name, filename in manifest["models"].items()}
+        except FileNotFoundError:
+            if attempt:
+                raise
+    return None
+
+
+def _load_model(path: Path, model_name: str) -> dict:
+    with np.load(path) as arrays:
+        model = {key: arrays[key] for key in arrays.files}
+    for key in ("zone_id", "segment_id"):
+        model[key] = model[key].astype(object)
+    model["model_name"] = model_name
+    return model
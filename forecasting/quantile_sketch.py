@@ -0,0 +1,144 @@
+"""Mergeable streaming quantile sketches of forecast residuals.
+
+A sketch is a dense array of bucket counts with one row of buckets per cell (e.g. per
+series and horizon step), in the style of DDSketch: bucket boundaries grow geometrically,
+so any quantile is recovered to within RELATIVE_ACCURACY of its true value however many
+residuals went in. Updating adds counts, and merging sketches from other shards, backtest
+origins, or later runs is plain addition, so no residual history is kept anywhere.
+
+Residuals smaller in magnitude than MIN_VALUE share the zero bucket and those beyond
+MAX_VALUE share the outermost buckets. Buckets are ordered by residual value (largest
+negative first), so quantiles come from one cumulative sum over the last axis.
+
+Sketches of each forecaster are stored with their series ids in SKETCH_DIR.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SKETCH_DIR = Path("forecasting/output/sketches")
+
+RELATIVE_ACCURACY = 0.05
+MIN_VALUE = 1e-2
+MAX_VALUE = 1e4
+
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+# Buckets per sign; bucket i covers magnitudes (MIN_VALUE * GAMMA^i, MIN_VALUE * GAMMA^(i+1)].
+N_MAGNITUDE_BUCKETS = int(np.ceil(np.log(MAX_VALUE / MIN_VALUE) / np.log(GAMMA)))
+N_BUCKETS = 2 * N_MAGNITUDE_BUCKETS + 1
+ZERO_BUCKET = N_MAGNITUDE_BUCKETS
+
+# Representative residual of every bucket: the value whose relative error to any residual
+# in the bucket is at most RELATIVE_ACCURACY.
+_magnitudes = MIN_VALUE * GAMMA ** np.arange(N_MAGNITUDE_BUCKETS) * 2 * GAMMA / (GAMMA + 1)
+BUCKET_VALUES = np.concatenate([-_magnitudes[::-1], [0.0], _magnitudes])
+
+
+def empty_sketch(shape: tuple[int, ...]) -> np.ndarray:
+    """Bucket counts for a grid of cells, shaped shape + (N_BUCKETS,)."""
+    return np.zeros(tuple(shape) + (N_BUCKETS,), dtype=np.uint32)
+
+
+def bucket_index(residuals: np.ndarray) -> np.ndarray:
+    """Bucket of every residual (NaN residuals map to the zero bucket; callers mask them)."""
+    magnitude = np.abs(np.nan_to_num(residuals))
+    with np.errstate(divide="ignore"):
+        level = np.ceil(np.log(np.maximum(magnitude, MIN_VALUE) / MIN_VALUE) / np.log(GAMMA)).astype(np.int64)
+    level = np.clip(level, 1, N_MAGNITUDE_BUCKETS)
+    return np.where(magnitude < MIN_VALUE, ZERO_BUCKET, ZERO_BUCKET + np.sign(residuals).astype(np.int64) * level)
+
+
+def sketch_update(counts: np.ndarray, residuals: np.ndarray) -> None:
+    """Add residuals to a sketch in place; residuals have the sketch's cell shape, NaN skipped.
+
+    residuals is shaped like counts without its bucket axis, or with one extra trailing axis
+    holding several residuals per cell.
+    """
+    cells = counts.shape[:-1]
+    residuals = np.asarray(residuals, dtype=float)
+    if residuals.shape == cells:
+        residuals = residuals[..., None]
+    observed = ~np.isnan(residuals)
+    cell = np.nonzero(observed)[: len(cells)]
+    np.add.at(counts, cell + (bucket_index(residuals[observed]),), 1)
+
+
+def sketch_count(counts: np.ndarray) -> np.ndarray:
+    """Residuals absorbed per cell."""
+    return counts.sum(axis=-1, dtype=np.int64)
+
+
+def sketch_quantiles(counts: np.ndarray, quantiles: tuple[float, ...]) -> np.ndarray:
+    """Quantiles per cell, shaped cells + (len(quantiles),); NaN for empty cells.
+
+    The q-quantile is the representative of the bucket holding the residual of rank
+    q * (n - 1), the lower quantile of the residuals the sketch has seen.
+    """
+    cumulative = np.cumsum(counts, axis=-1, dtype=np.int64)
+    total = cumulative[..., -1:]
+    out = np.full(counts.shape[:-1] + (len(quantiles),), np.nan)
+    for i, q in enumerate(quantiles):
+        rank = np.floor(q * (total - 1))
+        bucket = np.minimum((cumulative <= rank).sum(axis=-1), N_BUCKETS - 1)
+        out[..., i] = np.where(total[..., 0] > 0, BUCKET_VALUES[bucket], np.nan)
+    return out
+
+
+def merge_sketches(sketches: list[dict]) -> dict:
+    """One sketch over the union of the sketches' series, adding counts where series meet.
+
+    Each sketch is {"zone_id", "segment_id", "counts", "absorbed_through"}; all must share
+    the same steps. Series keep their first-seen order, and absorbed_through is the latest.
+    """
+    ids = pd.MultiIndex.from_arrays(
+        [np.concatenate([s["zone_id"] for s in sketches]), np.concatenate([s["segment_id"] for s in sketches])]
+    )
+    union = ids.unique()
+    counts = empty_sketch((len(union),) + sketches[0]["counts"].shape[1:-1])
+    offset = 0
+    for sketch in sketches:
+        n = len(sketch["zone_id"])
+        # Series ids are unique within a sketch, so the fancy-indexed add never collides.
+        counts[union.get_indexer(ids[offset : offset + n])] += sketch["counts"]
+        offset += n
+    return {
+        "zone_id": union.get_level_values(0).to_numpy(dtype=object),
+        "segment_id": union.get_level_values(1).to_numpy(dtype=object),
+        "counts": counts,
+        "absorbed_through": max(np.datetime64(s["absorbed_through"], "us") for s in sketches),
+    }
+
+
+def save_sketches(sketches: dict, directory: Path = SKETCH_DIR) -> Path:
+    """Store sketches per forecaster: {model_name: sketch}, one .npz file each.
+
+    Each file is written under a temporary name and swapped in, so readers never see a
+    partial sketch.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for model_name, sketch in sketches.items():
+        arrays = {key: np.asarray(value) for key, value in sketch.items()}
+        arrays = {key: value.astype(str) if value.dtype == object else value for key, value in arrays.items()}
+        tmp_path = directory / f"{model_name}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, directory / f"{model_name}.npz")
+    return directory
+
+
+def load_sketches(directory: Path = SKETCH_DIR) -> dict:
+    """Stored sketches keyed by forecaster name; empty when nothing is stored."""
+    sketches = {}
+    for path in sorted(Path(directory).glob("*.npz")):
+        if path.name.endswith(".tmp.npz"):
+            continue
+        with np.load(path) as arrays:
+            sketch = {key: arrays[key] for key in arrays.files}
+        for key in ("zone_id", "segment_id"):
+            sketch[key] = sketch[key].astype(object)
+        sketch["absorbed_through"] = sketch["absorbed_through"][()]
+        sketches[path.stem] = sketch
+    return sketches
@@ -0,0 +1,166 @@
+"""Monte Carlo demand sample paths from the regression forecaster.
+
+Each path replays the recursive regression forecast with a bootstrapped shock added at
+every step. Shocks are moving blocks of a series' own one-step residuals (the model's
+residual pool), so a path keeps the within-day correlation of real forecast errors, and
+because the shocked demand feeds the later lags, errors compound over the horizon the way
+they do in practice. Paths are written as one float32 array shaped (paths, series, hours)
+to forecasting/output/demand_paths.npy, with the series order in demand_path_series.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from data_design.fact_storage import write_table  # noqa: E402
+from forecasting.forecasting_pipeline import (  # noqa: E402
+    LAGS,
+    MAX_LAG,
+    OUTPUT_DIR,
+    OUTPUT_HORIZON,
+    _calendar_terms,
+    _epoch_hours,
+    load_or_train_models,
+)
+
+PATHS_FILE = "demand_paths.npy"
+DEFAULT_PATHS = 1000
+DEFAULT_BLOCK_HOURS = 24
+DEFAULT_SEED = 42
+
+# Rows (paths x series) advanced together per batch; bounds the recursion's working memory.
+PATH_BATCH_ROWS = 65_536
+
+
+def _bootstrap_noise(pool: np.ndarray, n_paths: int, horizon: int, block_hours: int, rng: np.random.Generator) -> np.ndarray:
+    """Moving-block bootstrap shocks shaped (horizon, paths, series).
+
+    Every path and series draws ceil(horizon / block_hours) block starts in its own residual
+    pool and reads block_hours consecutive residuals from each.
+    """
+    n_series, pool_hours = pool.shape
+    n_blocks = -(-horizon // block_hours)
+    starts = rng.integers(0, pool_hours - block_hours + 1, size=(n_blocks, n_paths, n_series))
+    steps = np.arange(horizon)
+    flat = starts[steps // block_hours] + (steps % block_hours)[:, None, None] + np.arange(n_series) * pool_hours
+    return pool.ravel().take(flat)
+
+
+def sample_demand_paths(
+    model: dict,
+    horizon: int = OUTPUT_HORIZON,
+    n_paths: int = DEFAULT_PATHS,
+    block_hours: int = DEFAULT_BLOCK_HOURS,
+    seed: int = DEFAULT_SEED,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Joint demand trajectories for every series of a regression model, (paths, series, horizon).
+
+    This is the recursion of _recursive_forecast_batch with a shock added at every step: the
+    calendar terms are shared by all paths, and a batch of paths advances one
+    (paths, series) ring buffer of lags. Paths are written into out (e.g. a memory-mapped
+    .npy) when given. Each series' pool is centered on its mean; missing residuals count as
+    zero shocks, so a series without any residuals gets its point forecast on every path.
+    The same seed gives the same paths.
+    """
+    if model["model_name"] != "regression" or "residuals" not in model:
+        raise ValueError("Sample paths need a regression model with a residual pool; retrain the models.")
+    # Centered residuals keep the paths around the point forecast rather than replaying recent bias.
+    residuals = model["residuals"]
+    counts = (~np.isnan(residuals)).sum(axis=1, keepdims=True)
+    pool = np.nan_to_num(residuals - np.nansum(residuals, axis=1, keepdims=True) / np.maximum(counts, 1))
+    if not 0 < block_hours <= pool.shape[1]:
+        raise ValueError(f"block_hours must be between 1 and the residual pool length ({pool.shape[1]}).")
+
+    betas = model["betas"]
+    n_series = len(betas)
+    if out is None:
+        out = np.empty((n_paths, n_series, horizon), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    calendar = _calendar_terms(betas, _epoch_hours(model["last_timestamp"]), horizon)
+    lag_beta = betas[:, 1 : 1 + len(LAGS)]
+    lags = np.array(LAGS)
+    start_ring = np.asarray(model["recent"][:, -MAX_LAG:].T, dtype=float)
+    per_batch = max(1, PATH_BATCH_ROWS // max(n_series, 1))
+
+    for lo in range(0, n_paths, per_batch):
+        n = min(per_batch, n_paths - lo)
+        noise = _bootstrap_noise(pool, n, horizon, block_hours, rng)
+        ring = np.repeat(start_ring[:, None, :], n, axis=1)
+        paths = np.empty((horizon, n, n_series))
+        for step in range(horizon):
+            slot = step % MAX_LAG
+            pred = calendar[step] + noise[step]
+            for i, lag_slot in enumerate((slot - lags) % MAX_LAG):
+                pred += ring[lag_slot] * lag_beta[:, i]
+            np.maximum(pred, 0.0, out=pred)
+            ring[slot] = pred
+            paths[step] = pred
+        out[lo : lo + n] = paths.transpose(1, 2, 0)
+    return out
+
+
+def write_demand_paths(
+    model: dict,
+    horizon: int = OUTPUT_HORIZON,
+    n_paths: int = DEFAULT_PATHS,
+    block_hours: int = DEFAULT_BLOCK_HOURS,
+    seed: int = DEFAULT_SEED,
+    output_dir: Path = OUTPUT_DIR,
+) -> Path:
+    """Sample paths straight into a memory-mapped .npy and write the matching series index."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / PATHS_FILE
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_paths, len(model["zone_id"]), horizon))
+    sample_demand_paths(model, horizon, n_paths, block_hours, seed, out=out)
+    out.flush()
+    del out
+
+    first_hours = _epoch_hours(model["last_timestamp"]) + 1
+    series = pd.DataFrame(
+        {
+            "series_index": np.arange(len(model["zone_id"])),
+            "zone_id": model["zone_id"],
+            "segment_id": model["segment_id"],
+            "first_timestamp": first_hours.astype("datetime64[h]").astype("datetime64[us]"),
+        }
+    )
+    write_table(series, "demand_path_series", output_dir)
+    return path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sample Monte Carlo demand paths from the regression forecaster.")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS, help="Number of sample paths.")
+    parser.add_argument("--horizon", type=int, default=OUTPUT_HORIZON, help="Path length in hours.")
+    parser.add_argument(
+        "--block-hours",
+        type=int,
+        default=DEFAULT_BLOCK_HOURS,
+        help="Length of the bootstrapped residual blocks in hours.",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed.")
+    parser.add_argument("--retrain", action="store_true", help="Retrain the models before sampling.")
+    args = parser.parse_args()
+    if args.paths < 1 or args.horizon < 1 or args.block_hours < 1:
+        parser.error("--paths, --horizon and --block-hours must be positive.")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    model = load_or_train_models(retrain=args.retrain)["regression"]
+    path = write_demand_paths(model, args.horizon, args.paths, args.block_hours, args.seed)
+    paths = np.load(path, mmap_mode="r")
+    print(f"Sample paths: {paths.shape[0]:,} paths x {paths.shape[1]} series x {paths.shape[2]} hours")
+    print(f"- Mean path demand: {float(paths.mean()):.2f}")
+    print(f"- 10th-90th percentile spread at the last hour: {float(np.subtract(*np.percentile(paths[:, :, -1], [90, 10], axis=0)).mean()):.2f}")
+    print(f"\nSaved sample paths to: {path}")
@@ -26,9 +26,9 @@ fi
 # shellcheck disable=SC1091
 source "${VENV_DIR}/bin/activate"
 
-log "Installing Python dependencies (pandas, numpy)"
+log "Installing Python dependencies (pandas, numpy, pyarrow)"
 python -m pip install --disable-pip-version-check --upgrade pip
-python -m pip install --disable-pip-version-check --upgrade pandas numpy
+python -m pip install --disable-pip-version-check --upgrade pandas numpy pyarrow
 
 PIPELINE_STEPS=(
   "data_design/generate_synthetic_data.py"
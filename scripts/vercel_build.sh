@@ -26,7 +26,7 @@ source .vercel_venv/bin/activate
 
 echo "Installing Python dependencies..."
 pip install --upgrade pip
-pip install pandas numpy
+pip install pandas numpy pyarrow
 
 # 2. Run Simulation Pipeline
 echo "Running analytics pipeline..."
@@ -6,17 +6,23 @@ Why simulate instead of deploy:
 - The AGGRESSIVE_POLICY scenario is intentionally included as a stress test to expose downside operational and customer risk.
 """
 
+import sys
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-FORECAST_PATH = Path("forecasting/output/demand_forecasts.csv")
-POLICY_PATH = Path("decision_policy/output/pricing_recommendations.csv")
-CAPACITY_PATH = Path("data_design/output/fact_capacity_ops.csv")
-ORDERS_PATH = Path("data_design/output/fact_orders.csv")
-OUTPUT_PATH = Path("simulation_engine/output/scenario_outcomes.csv")
+from data_design.fact_storage import read_table, write_table  # noqa: E402
+
+
+FORECAST_DIR = Path("forecasting/output")
+POLICY_DIR = Path("decision_policy/output")
+FACTS_DIR = Path("data_design/output")
+OUTPUT_DIR = Path("simulation_engine/output")
 
 SEGMENT_ELASTICITY = {
     "value": -1.25,
@@ -35,47 +41,46 @@ PEAK_HOURS = {11, 12, 13, 18, 19, 20}
 
 def load_inputs() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Load upstream forecast, policy, capacity, and historical-demand inputs for simulation."""
-    forecasts = pd.read_csv(
-        FORECAST_PATH,
-        usecols=["timestamp", "zone_id", "segment_id", "forecast_model", "forecast_demand"],
+    forecasts = read_table(
+        "demand_forecasts",
+        FORECAST_DIR,
+        columns=["timestamp", "zone_id", "segment_id", "forecast_model", "forecast_demand"],
     )
-    policy = pd.read_csv(
-        POLICY_PATH,
-        usecols=["timestamp", "zone_id", "segment_id", "recommended_action", "recommended_pct_change"],
+    policy = read_table(
+        "pricing_recommendations",
+        POLICY_DIR,
+        columns=["timestamp", "zone_id", "segment_id", "recommended_action", "recommended_pct_change"],
     )
-    capacity = pd.read_csv(
-        CAPACITY_PATH,
-        usecols=["timestamp", "zone_id", "max_hourly_capacity", "utilization_rate", "stress_index"],
+    capacity = read_table(
+        "fact_capacity_ops",
+        FACTS_DIR,
+        columns=["timestamp", "zone_id", "max_hourly_capacity", "utilization_rate", "stress_index"],
     )
-    orders = pd.read_csv(
-        ORDERS_PATH,
-        usecols=["timestamp", "zone_id", "segment_id", "final_demand"],
+    orders = read_table(
+        "fact_orders",
+        FACTS_DIR,
+        columns=["timestamp", "zone_id", "segment_id", "final_demand"],
     )
 
-    forecasts["timestamp"] = pd.to_datetime(forecasts["timestamp"])
-    policy["timestamp"] = pd.to_datetime(policy["timestamp"])
-    capacity["timestamp"] = pd.to_datetime(capacity["timestamp"])
-    orders["timestamp"] = pd.to_datetime(orders["timestamp"])
-
     return forecasts, policy, capacity, orders
 
 
 def build_simulation_grid(forecasts: pd.DataFrame, policy: pd.DataFrame, orders: pd.DataFrame) -> pd.DataFrame:
     """Create a common zone-segment-hour grid with strategy-specific base demand and price changes."""
     forecast_agg = (
-        forecasts.groupby(["timestamp", "zone_id", "segment_id"], as_index=False)["forecast_demand"]
+        forecasts.groupby(["timestamp", "zone_id", "segment_id"], as_index=False, observed=True)["forecast_demand"]
         .mean()
         .sort_values(["timestamp", "zone_id", "segment_id"])
     )
 
     policy_base = forecast_agg.merge(policy, on=["timestamp", "zone_id", "segment_id"], how="left")
-    policy_base["recommended_action"] = policy_base["recommended_action"].fillna("HOLD")
+    policy_base["recommended_action"] = policy_base["recommended_action"].astype(object).fillna("HOLD")
     policy_base["recommended_pct_change"] = policy_base["recommended_pct_change"].fillna(0.0)
 
     hist = orders.copy()
     hist["hour"] = hist["timestamp"].dt.hour
     baseline_profile = (
-        hist.groupby(["zone_id", "segment_id", "hour"], as_index=False)["final_demand"]
+        hist.groupby(["zone_id", "segment_id", "hour"], as_index=False, observed=True)["final_demand"]
         .mean()
         .rename(columns={"final_demand": "baseline_hourly_demand"})
     )
@@ -120,7 +125,7 @@ def attach_capacity_profiles(sim_df: pd.DataFrame, capacity: pd.DataFrame) -> pd
     cap["hour"] = cap["timestamp"].dt.hour
 
     zone_hour_capacity = (
-        cap.groupby(["zone_id", "hour"], as_index=False)
+        cap.groupby(["zone_id", "hour"], as_index=False, observed=True)
         .agg(
             {
                 "max_hourly_capacity": "mean",
@@ -156,7 +161,7 @@ def apply_demand_response(sim_df: pd.DataFrame, seed: int = 2026) -> pd.DataFram
     rng = np.random.default_rng(seed)
     out = sim_df.copy()
 
-    elasticity = out["segment_id"].map(SEGMENT_ELASTICITY).values
+    elasticity = out["segment_id"].map(SEGMENT_ELASTICITY).astype(float).values
     price_change = out["price_change_pct"].values
 
     deterministic = np.exp(elasticity * price_change)
@@ -172,14 +177,14 @@ def allocate_capacity(sim_df: pd.DataFrame) -> pd.DataFrame:
     out = sim_df.copy()
 
     group_cols = ["strategy_name", "timestamp", "zone_id"]
-    zone_total = out.groupby(group_cols)["adjusted_demand"].transform("sum")
+    zone_total = out.groupby(group_cols, observed=True)["adjusted_demand"].transform("sum")
     capacity = out["max_hourly_capacity"]
 
     fill_ratio = np.minimum(1.0, capacity / zone_total.clip(lower=1e-9))
     out["orders_completed"] = out["adjusted_demand"] * fill_ratio
     out["orders_lost_capacity"] = (out["adjusted_demand"] - out["orders_completed"]).clip(lower=0.0)
 
-    zone_completed = out.groupby(group_cols)["orders_completed"].transform("sum")
+    zone_completed = out.groupby(group_cols, observed=True)["orders_completed"].transform("sum")
     out["utilization_rate"] = zone_completed / capacity.clip(lower=1.0)
     return out
 
@@ -188,7 +193,7 @@ def compute_outcomes(sim_df: pd.DataFrame) -> pd.DataFrame:
     """Compute revenue, stress proxy, and customer-risk proxy for each strategy-zone-segment-hour row."""
     out = sim_df.copy()
 
-    out["avg_order_value"] = out["segment_id"].map(SEGMENT_AVG_ORDER_VALUE)
+    out["avg_order_value"] = out["segment_id"].map(SEGMENT_AVG_ORDER_VALUE).astype(float)
     out["revenue_est"] = out["orders_completed"] * out["avg_order_value"] * (1.0 + out["price_change_pct"])
 
     out["capacity_breach_flag"] = (out["utilization_rate"] > 1.0).astype(int)
@@ -228,7 +233,7 @@ def print_strategy_scorecards(outcomes_df: pd.DataFrame) -> None:
     """Print strategy-level summary trade-offs for leadership-oriented comparison."""
     print("Scenario scorecards")
 
-    for strategy, g in outcomes_df.groupby("strategy_name"):
+    for strategy, g in outcomes_df.groupby("strategy_name", observed=True):
         total_revenue = float(g["revenue_est"].sum())
         total_adjusted = float(g["adjusted_demand"].sum())
         total_lost = float(g["orders_lost_capacity"].sum())
@@ -253,10 +258,9 @@ def run_scenario_simulation() -> pd.DataFrame:
     allocated = allocate_capacity(with_demand)
     outcomes = compute_outcomes(allocated)
 
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    outcomes.to_csv(OUTPUT_PATH, index=False)
+    output_path = write_table(outcomes, "scenario_outcomes", OUTPUT_DIR)
 
-    print(f"Saved scenario outcomes: {OUTPUT_PATH}")
+    print(f"Saved scenario outcomes: {output_path}")
     print(f"Rows written: {len(outcomes):,}")
     print_strategy_scorecards(outcomes)
 
@@ -0,0 +1,52 @@
+"""Shared pytest setup and fixtures; the stage packages import from the repository root."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from data_design.fact_storage import apply_schema  # noqa: E402
+
+
+def make_orders(zones: int = 3, weeks: int = 6, seed: int = 0, gaps: bool = True) -> pd.DataFrame:
+    """Small fact_orders panel with daily and weekly seasonality, noise, and optional gaps.
+
+    Series start on different days and lose a few scattered hours, like the ragged series
+    the forecasters have to handle.
+    """
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2026-01-05", periods=weeks * 168, freq="h")
+    frames = []
+    for z in range(1, zones + 1):
+        for s, segment in enumerate(["balanced", "premium"]):
+            level = 20.0 + 7 * z + 5 * s
+            shape = 1 + 0.4 * np.sin(2 * np.pi * (hours.hour - 6) / 24) + 0.1 * (hours.dayofweek >= 5)
+            demand = np.maximum(level * shape + rng.normal(0, 2.0, len(hours)), 0.0).round(2)
+            keep = np.ones(len(hours), dtype=bool)
+            if gaps:
+                keep[: 24 * ((z + s) % 4)] = False
+                keep[rng.choice(len(hours), size=len(hours) // 50, replace=False)] = False
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "timestamp": hours[keep],
+                        "zone_id": f"zone_{z}",
+                        "segment_id": segment,
+                        "final_demand": demand[keep],
+                        "orders_completed": np.floor(demand[keep]),
+                        "orders_lost_capacity": 0.0,
+                    }
+                )
+            )
+    return apply_schema(pd.concat(frames, ignore_index=True), "fact_orders")
+
+
+@pytest.fixture(scope="session")
+def orders_df() -> pd.DataFrame:
+    return make_orders()
@@ -0,0 +1,47 @@
+"""Backtest: the incremental walk-forward scores what a refit at each origin would forecast."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_orders
+
+from forecasting.backtest import run_backtest
+from forecasting.forecasting_pipeline import (
+    forecast_next_horizon,
+    prepare_time_series,
+    train_baseline_forecaster,
+    train_regression_forecaster,
+)
+
+TRAINERS = {"baseline": train_baseline_forecaster, "regression": train_regression_forecaster}
+
+
+@pytest.fixture(scope="module")
+def backtest():
+    ts_df = prepare_time_series(make_orders(gaps=False, seed=5))
+    return ts_df, run_backtest(ts_df, horizon=24, step=24, min_history=21 * 24)
+
+
+@pytest.mark.parametrize("name", list(TRAINERS))
+def test_origins_score_a_truncated_refit(backtest, name):
+    ts_df, (by_step, by_origin, _) = backtest
+    scores = by_origin[by_origin["forecast_model"] == name]
+    for _, origin in scores.iloc[[0, -1]].iterrows():
+        seen = ts_df[ts_df["timestamp"] <= origin["origin_timestamp"]]
+        forecast = forecast_next_horizon(TRAINERS[name](seen), 24)
+        actual = forecast.merge(ts_df, on=["timestamp", "zone_id", "segment_id"])
+        error = actual["final_demand"] - actual["forecast_demand"]
+        assert origin["n_forecasts"] == len(error)
+        np.testing.assert_allclose(origin["mae"], error.abs().mean(), rtol=1e-9)
+        np.testing.assert_allclose(origin["bias"], -error.mean(), rtol=1e-9, atol=1e-12)
+
+    steps = by_step[by_step["forecast_model"] == name]
+    assert steps["n_forecasts"].sum() == scores["n_forecasts"].sum()
+
+
+def test_rejects_steps_that_do_not_divide_the_band_window(backtest):
+    ts_df, _ = backtest
+    with pytest.raises(ValueError, match="step"):
+        run_backtest(ts_df, horizon=24, step=48)
+    with pytest.raises(ValueError, match="origin"):
+        run_backtest(ts_df, horizon=24, step=24, min_history=len(pd.unique(ts_df["timestamp"])))
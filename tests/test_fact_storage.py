@@ -0,0 +1,89 @@
+"""Fact storage: both formats hold the same tables, and the dashboard's CSV files always exist."""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from data_design.fact_storage import (
+    CSV_EXPORT_TABLES,
+    TableWriter,
+    read_last_timestamp,
+    read_table,
+    read_table_since,
+    table_path,
+    write_table,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def dashboard_csv_paths() -> list[str]:
+    """Every CSV path a dashboard data loader reads, plus the stage outputs vercel_build.sh copies."""
+    paths = []
+    for loader in sorted((REPO_ROOT / "lib" / "data-loaders").glob("*.ts")):
+        paths += re.findall(r'"([^"]+\.csv)"', loader.read_text())
+    paths += re.findall(r"^cp (\S+\.csv) public/data/", (REPO_ROOT / "scripts" / "vercel_build.sh").read_text(), re.M)
+    return paths
+
+
+def test_dashboard_reads_csv_files():
+    assert {"demand_forecasts.csv", "pricing_recommendations.csv"} <= {Path(p).name for p in dashboard_csv_paths()}
+
+
+@pytest.mark.parametrize("csv_path", dashboard_csv_paths())
+def test_every_dashboard_csv_is_exported(csv_path):
+    assert Path(csv_path).stem in CSV_EXPORT_TABLES
+
+
+@pytest.mark.parametrize("name", sorted(CSV_EXPORT_TABLES))
+def test_parquet_writes_keep_a_csv_copy(tmp_path, name):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"timestamp": pd.date_range("2026-01-01", periods=3, freq="h"), "value": [1.0, 2.0, 3.0]})
+    write_table(df, name, tmp_path, fmt="parquet")
+    assert table_path(name, tmp_path, "parquet").is_dir()
+    assert table_path(name, tmp_path, "csv").exists()
+    pd.testing.assert_series_equal(read_table(name, tmp_path, fmt="csv")["value"], df["value"])
+
+
+def write_in_chunks(df: pd.DataFrame, directory: Path, fmt: str, chunks: int = 3) -> None:
+    writer = TableWriter("fact_orders", directory, fmt=fmt)
+    for part in range(chunks):
+        writer.write(df.iloc[part * len(df) // chunks : (part + 1) * len(df) // chunks])
+
+
+def test_chunked_parquet_and_csv_tables_read_back_alike(tmp_path, orders_df):
+    pytest.importorskip("pyarrow")
+    orders_df = orders_df.sort_values("timestamp", kind="stable", ignore_index=True)
+    for fmt in ("parquet", "csv"):
+        write_in_chunks(orders_df, tmp_path / fmt, fmt)
+    assert len(list(table_path("fact_orders", tmp_path / "parquet", "parquet").glob("part-*.parquet"))) == 3
+
+    parquet = read_table("fact_orders", tmp_path / "parquet", fmt="parquet")
+    csv = read_table("fact_orders", tmp_path / "csv", fmt="csv")
+    pd.testing.assert_frame_equal(parquet, orders_df)
+    # CSV re-parses floats from text, which may move them by an ulp.
+    pd.testing.assert_frame_equal(csv, orders_df, check_exact=False, rtol=1e-14)
+    assert isinstance(csv["zone_id"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_reads_since_a_timestamp_match_a_filtered_full_read(tmp_path, orders_df, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    orders_df = orders_df.sort_values("timestamp", kind="stable", ignore_index=True)
+    write_in_chunks(orders_df, tmp_path, fmt, chunks=4)
+    full = read_table("fact_orders", tmp_path, fmt=fmt)
+    assert read_last_timestamp("fact_orders", tmp_path, fmt=fmt) == full["timestamp"].max()
+
+    columns = ["zone_id", "final_demand"]
+    timestamps = full["timestamp"].drop_duplicates()
+    # Before the table, on a part boundary, inside the last part, and at the last hour.
+    starts = [timestamps.iloc[0] - pd.Timedelta(days=1), full["timestamp"].iloc[len(full) // 2], timestamps.iloc[-30]]
+    for start in starts + [timestamps.iloc[-1]]:
+        expected = full[full["timestamp"] >= start].reset_index(drop=True)
+        since = read_table_since("fact_orders", tmp_path, start, fmt=fmt, chunk_rows=97)
+        pd.testing.assert_frame_equal(since, expected)
+        projected = read_table_since("fact_orders", tmp_path, start, columns=columns, fmt=fmt, chunk_rows=97)
+        pd.testing.assert_frame_equal(projected, expected[columns])
@@ -0,0 +1,69 @@
+"""Forecast service: batched answers match the pipeline's forecasts, and queries are bounded."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting.forecast_service import MAX_QUERY_HOURS, ForecastBatcher
+from forecasting.forecasting_pipeline import (
+    forecast_next_horizon,
+    prepare_time_series,
+    train_direct_forecaster,
+    train_regression_forecaster,
+)
+
+
+@pytest.fixture(scope="module")
+def models(orders_df):
+    ts_df = prepare_time_series(orders_df)
+    return {"regression": train_regression_forecaster(ts_df), "direct": train_direct_forecaster(ts_df)}
+
+
+@pytest.fixture(scope="module")
+def batcher(models):
+    return ForecastBatcher(models, window_ms=5.0)
+
+
+def answer(batcher, **query):
+    return batcher.submit(batcher.resolve(**query)).result(timeout=30)
+
+
+def test_batched_answers_match_forecast_next_horizon(models, batcher):
+    expected = forecast_next_horizon(models["regression"], 48)
+    queries = [{"model_name": "regression", "zone_id": zone, "hours": 48} for zone in ("zone_1", "zone_3")]
+    futures = [batcher.submit(batcher.resolve(**query)) for query in queries]
+    for query, future in zip(queries, futures):
+        for series in future.result(timeout=30)["series"]:
+            rows = expected[
+                (expected["zone_id"] == series["zone_id"]) & (expected["segment_id"] == series["segment_id"])
+            ]
+            assert series["zone_id"] == query["zone_id"]
+            np.testing.assert_array_equal(pd.to_datetime(series["timestamps"]), rows["timestamp"])
+            np.testing.assert_allclose(series["forecast_demand"], rows["forecast_demand"], rtol=0, atol=1e-12)
+            np.testing.assert_allclose(series["lower_bound"], rows["lower_bound"], rtol=0, atol=1e-12)
+            np.testing.assert_allclose(series["upper_bound"], rows["upper_bound"], rtol=0, atol=1e-12)
+
+
+def test_later_start_is_a_slice_of_the_longer_forecast(models, batcher):
+    first = pd.Timestamp(models["regression"]["last_timestamp"].max()) + pd.Timedelta(hours=1)
+    series = {"model_name": "regression", "zone_id": "zone_2", "segment_id": "premium"}
+    full = answer(batcher, **series, hours=30)["series"][0]
+    later = answer(batcher, **series, start=str(first + pd.Timedelta(hours=6)), hours=24)["series"][0]
+    assert later["timestamps"] == full["timestamps"][6:]
+    np.testing.assert_allclose(later["forecast_demand"], full["forecast_demand"][6:], rtol=0, atol=1e-12)
+
+
+def test_rejects_queries_past_the_horizon_cap(models, batcher):
+    first = pd.Timestamp(models["regression"]["last_timestamp"].max()) + pd.Timedelta(hours=1)
+    batcher.resolve(model_name="regression", start=str(first + pd.Timedelta(hours=MAX_QUERY_HOURS - 24)), hours=24)
+    with pytest.raises(ValueError, match=str(MAX_QUERY_HOURS)):
+        batcher.resolve(model_name="regression", start=str(first + pd.Timedelta(hours=MAX_QUERY_HOURS - 24)), hours=25)
+    with pytest.raises(ValueError, match=str(MAX_QUERY_HOURS)):
+        batcher.resolve(model_name="regression", start="2100-01-01", hours=1)
+
+
+def test_rejects_direct_queries_past_its_steps(models, batcher):
+    steps = models["direct"]["direct_betas"].shape[2]
+    batcher.resolve(model_name="direct", hours=steps)
+    with pytest.raises(ValueError, match="direct model"):
+        batcher.resolve(model_name="direct", hours=steps + 1)
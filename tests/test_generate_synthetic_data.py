@@ -0,0 +1,279 @@
+"""Synthetic data generator: the batched, chunked, parallel and extended paths agree."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_design.fact_storage import read_table
+from data_design.generate_synthetic_data import (
+    ACTION_TYPES,
+    DECISION_REASONS,
+    FACT_TABLES,
+    ORDER_EVENTS_TABLE,
+    SEGMENTS,
+    apply_variant,
+    build_time_table,
+    build_zone_profiles,
+    choose_action,
+    event_overlay,
+    extend_dataset,
+    generate_dataset,
+    generate_variants,
+    index_events,
+    main,
+    normalize_event_catalog,
+    sample_pricing_actions,
+    spawn_arrival_streams,
+    segment_sum,
+    spawn_zone_streams,
+    summarize_chunk,
+    synthesize_event_catalog,
+    variant_dir,
+)
+
+START = "2026-01-01"
+
+
+def test_segment_sum_matches_pandas_groupby_bitwise():
+    rng = np.random.default_rng(0)
+    # Mixed magnitudes make naive and compensated summation disagree in the last bits.
+    values = rng.normal(size=(48, 4, 5)) * 10.0 ** rng.integers(-3, 9, size=(48, 4, 5))
+    hours, zones, segments = np.indices(values.shape).reshape(3, -1)
+    long = pd.DataFrame({"hour": hours, "zone": zones, "value": values.ravel()})
+    expected = long.groupby(["hour", "zone"])["value"].sum().to_numpy().reshape(48, 4)
+    np.testing.assert_array_equal(segment_sum(values), expected)
+    assert not np.array_equal(values.sum(axis=-1), expected)
+
+
+def test_batched_sampler_matches_choose_action():
+    rng = np.random.default_rng(0)
+    n = 2000
+    # Pressures on every branch boundary of choose_action as well as in between.
+    boundaries = rng.choice([0.70, 0.85, 0.9, 0.97, 1.0, 1.10], n)
+    pressure = np.where(rng.random(n) < 0.5, boundaries, rng.uniform(0.5, 1.4, n))
+    hour = rng.integers(0, 24, n)
+    segment = rng.choice(SEGMENTS, n)
+    seeds = np.arange(n)
+    # choose_action draws the action and then the magnitude from its generator; a fresh
+    # generator per row hands the batched sampler the same two uniforms.
+    draws = np.array([np.random.default_rng(seed).random(2) for seed in seeds])
+    action_idx, change, reason_idx = sample_pricing_actions(pressure, hour, segment, draws)
+    for i in range(n):
+        gen = np.random.default_rng(seeds[i])
+        action, expected_change, reason = choose_action(pressure[i], int(hour[i]), segment[i], gen)
+        assert (ACTION_TYPES[action_idx[i]], DECISION_REASONS[reason_idx[i]]) == (action, reason)
+        assert change[i] == expected_change
+
+
+def naive_overlay(catalog: pd.DataFrame, target: str, time_df: pd.DataFrame, zones: list[str], segments=None):
+    """Multiply every event into the cells it covers, one event and one zone at a time."""
+    overlay = np.ones((len(time_df), len(zones), len(segments or [None])))
+    timestamps = time_df["timestamp"].to_numpy()
+    for event in catalog[catalog["target"] == target].itertuples():
+        hours = (timestamps >= event.start.to_datetime64()) & (timestamps < event.end.to_datetime64())
+        for zone in zones if event.zones == "*" else event.zones.split(";"):
+            if zone not in zones:
+                continue
+            for s, segment in enumerate(segments or [None]):
+                if segment is None or event.segment in ("*", segment):
+                    overlay[hours, zones.index(zone), s] *= event.multiplier
+    return overlay if segments else overlay[:, :, 0]
+
+
+def test_event_overlay_matches_a_per_event_product():
+    zones = [f"zone_{i}" for i in range(1, 6)]
+    catalog = pd.concat(
+        [
+            synthesize_event_catalog(300, zones + ["zone_9"], START, 6, seed=3),
+            normalize_event_catalog(
+                pd.DataFrame(
+                    {
+                        "kind": ["outage", "weather", "promotion"],
+                        "zones": ["*", "*", "zone_2;zone_4"],
+                        "segment": ["*", "*", "premium"],
+                        "start": ["2025-12-30", "2026-01-02 05:00", "2026-01-02"],
+                        "end": ["2026-01-09", "2026-01-02 07:00", "2026-01-04"],
+                        "multiplier": [0.9, 1.2, 1.1],
+                    }
+                )
+            ),
+        ],
+        ignore_index=True,
+    )
+    index = index_events(catalog)
+    # A chunk that starts mid-horizon clips events on both sides.
+    time_df = build_time_table("2026-01-02 03:00", 60)
+    capacity = event_overlay(index, "capacity", time_df, zones)
+    demand = event_overlay(index, "demand", time_df, zones, SEGMENTS)
+    np.testing.assert_allclose(capacity, naive_overlay(catalog, "capacity", time_df, zones), rtol=1e-12)
+    np.testing.assert_allclose(demand, naive_overlay(catalog, "demand", time_df, zones, SEGMENTS), rtol=1e-12)
+
+    assert event_overlay(index, "demand", build_time_table("2027-01-01", 24), zones, SEGMENTS) is None
+    assert event_overlay(None, "capacity", time_df, zones) is None
+
+
+def read_tables(output_dir) -> dict:
+    return {name: read_table(name, output_dir, fmt="csv") for name in FACT_TABLES}
+
+
+def sorted_table(name, output_dir) -> pd.DataFrame:
+    table = read_table(name, output_dir, fmt="csv")
+    keys = [column for column in ("timestamp", "arrival_ts", "zone_id", "segment_id") if column in table]
+    return table.sort_values(keys, kind="stable", ignore_index=True)
+
+
+def test_chunked_run_covers_the_horizon_and_folds_its_summary(tmp_path):
+    profiles = build_zone_profiles(3, None, 7)
+    summary = generate_dataset(profiles, START, 3, 1, np.random.default_rng(7), tmp_path, storage_format="csv")
+    tables = read_tables(tmp_path)
+
+    hours = pd.date_range(START, periods=72, freq="h")
+    orders = tables["fact_orders"]
+    assert len(orders) == 72 * len(profiles) * len(SEGMENTS)
+    for _, series in orders.groupby(["zone_id", "segment_id"], observed=True):
+        assert (series["timestamp"].to_numpy() == hours.to_numpy()).all()
+    assert summary == summarize_chunk({}, *tables.values())
+
+
+@pytest.fixture(scope="module")
+def zone_stream_run(tmp_path_factory):
+    output_dir = tmp_path_factory.mktemp("zone_streams")
+    profiles = build_zone_profiles(3, None, 7)
+    generate_dataset(profiles, START, 3, 3, spawn_zone_streams(7, list(profiles)), output_dir, storage_format="csv")
+    return output_dir
+
+
+@pytest.mark.parametrize("chunk_days, workers", [(1, 1), (2, 2)])
+def test_zone_streams_do_not_depend_on_chunks_or_workers(tmp_path, zone_stream_run, chunk_days, workers):
+    profiles = build_zone_profiles(3, None, 7)
+    rng = spawn_zone_streams(7, list(profiles))
+    generate_dataset(
+        profiles, START, 3, chunk_days, rng, tmp_path, workers=workers, shard_zones=1, storage_format="csv"
+    )
+    for name in FACT_TABLES:
+        one_shot = read_table(name, zone_stream_run, fmt="csv")
+        keys = [column for column in ("timestamp", "zone_id", "segment_id") if column in one_shot]
+        chunked = read_table(name, tmp_path, fmt="csv").sort_values(keys, kind="stable", ignore_index=True)
+        pd.testing.assert_frame_equal(chunked, one_shot.sort_values(keys, kind="stable", ignore_index=True))
+
+
+def test_zone_stream_files_are_byte_identical_for_any_worker_count(tmp_path):
+    profiles = build_zone_profiles(3, None, 7)
+    for workers in (1, 2):
+        rng = spawn_zone_streams(7, list(profiles))
+        generate_dataset(
+            profiles, START, 2, 1, rng, tmp_path / str(workers), workers=workers, shard_zones=1, storage_format="csv"
+        )
+    for name in FACT_TABLES:
+        assert (tmp_path / "1" / f"{name}.csv").read_bytes() == (tmp_path / "2" / f"{name}.csv").read_bytes()
+
+
+def test_order_events_ignore_chunking_and_leave_the_fact_tables_alone(tmp_path, zone_stream_run):
+    profiles = build_zone_profiles(3, None, 7)
+    for chunk_days, batch_rows in ((3, 10**9), (1, 500)):
+        generate_dataset(
+            profiles,
+            START,
+            3,
+            chunk_days,
+            spawn_zone_streams(7, list(profiles)),
+            tmp_path / str(chunk_days),
+            storage_format="csv",
+            arrival_streams=spawn_arrival_streams(7, list(profiles)),
+            order_event_batch_rows=batch_rows,
+        )
+    one_shot, chunked = (sorted_table(ORDER_EVENTS_TABLE, tmp_path / str(chunk_days)) for chunk_days in (3, 1))
+    pd.testing.assert_frame_equal(chunked, one_shot)
+    for name in FACT_TABLES:
+        pd.testing.assert_frame_equal(sorted_table(name, tmp_path / "3"), sorted_table(name, zone_stream_run))
+
+    # Each zone-hour fulfils arrivals first come, first served up to its capacity.
+    capacity = read_table("fact_capacity_ops", zone_stream_run, fmt="csv")
+    zone_hour = ["timestamp", "zone_id"]
+    hourly = one_shot.groupby(zone_hour, observed=True)["fulfilled"].agg(["size", "sum"])
+    hourly = hourly.join(capacity.set_index(zone_hour)["max_hourly_capacity"])
+    assert (hourly["sum"] == hourly[["size", "max_hourly_capacity"]].min(axis=1)).all()
+    assert (hourly["sum"] < hourly["size"]).any()
+    first_lost = one_shot[one_shot["fulfilled"] == 0].groupby(zone_hour, observed=True)["arrival_ts"].min()
+    last_kept = one_shot[one_shot["fulfilled"] == 1].groupby(zone_hour, observed=True)["arrival_ts"].max()
+    assert (last_kept.reindex(first_lost.index) <= first_lost).all()
+
+
+def run_cli(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["generate_synthetic_data.py", *map(str, args)])
+    main()
+
+
+def test_cli_extension_matches_a_longer_run(tmp_path, monkeypatch):
+    common = ["--zones", 3, "--rng-streams", "zone", "--storage-format", "csv", "--order-events"]
+    run_cli(monkeypatch, "--output-dir", tmp_path / "extended", "--days", 2, *common)
+    run_cli(monkeypatch, "--output-dir", tmp_path / "extended", "--extend-days", 1)
+    run_cli(monkeypatch, "--output-dir", tmp_path / "full", "--days", 3, *common)
+    for name in (*FACT_TABLES, ORDER_EVENTS_TABLE):
+        pd.testing.assert_frame_equal(sorted_table(name, tmp_path / "extended"), sorted_table(name, tmp_path / "full"))
+
+
+VARIANT = {"name": "b", "capacity_scale": 0.9, "zone_overrides": {"zone_2": {"base_capacity": 40}}}
+
+
+def variant_config(days: int) -> dict:
+    return {
+        "seed": 7,
+        "zones": 3,
+        "segment_mix": None,
+        "start": "2026-01-01",
+        "days": days,
+        "chunk_days": days,
+        "sampler": "batched",
+        "rng_streams": "zone",
+        "shard_zones": 64,
+        "storage_format": "csv",
+        "order_events": False,
+    }
+
+
+def generate_variant(output_dir, days: int):
+    config = variant_config(days)
+    profiles = build_zone_profiles(config["zones"], config["segment_mix"], config["seed"])
+    generate_variants([VARIANT], profiles, config, output_dir)
+    return variant_dir(output_dir, VARIANT["name"])
+
+
+def test_variant_partitions_match_standalone_runs(tmp_path):
+    config = variant_config(2)
+    profiles = build_zone_profiles(config["zones"], config["segment_mix"], config["seed"])
+    variants = [VARIANT, {"name": "a", "demand_scale": 1.2, "seed": 11}]
+    generate_variants(variants, profiles, config, tmp_path, workers=2)
+    for variant in variants:
+        solo = tmp_path / "solo" / variant["name"]
+        rng = spawn_zone_streams(variant.get("seed", config["seed"]), list(profiles))
+        generate_dataset(apply_variant(profiles, variant), START, 2, 2, rng, solo, storage_format="csv")
+        for name in FACT_TABLES:
+            shared = variant_dir(tmp_path, variant["name"]) / f"{name}.csv"
+            assert shared.read_bytes() == (solo / f"{name}.csv").read_bytes()
+
+
+@pytest.fixture(scope="module")
+def extended_and_full(tmp_path_factory):
+    extended = generate_variant(tmp_path_factory.mktemp("extended"), days=2)
+    extend_dataset(extended, 1)
+    full = generate_variant(tmp_path_factory.mktemp("full"), days=3)
+    return extended, full
+
+
+def test_extended_variant_keeps_its_zone_capacity(extended_and_full):
+    extended, _ = extended_and_full
+    capacity = read_table("fact_capacity_ops", extended, fmt="csv")
+    new_hours = capacity["timestamp"] >= pd.Timestamp("2026-01-03")
+    by_zone = capacity.groupby([new_hours, "zone_id"], observed=True)["max_hourly_capacity"].mean().unstack(0)
+    assert (by_zone[True] / by_zone[False]).between(0.8, 1.25).all()
+    assert by_zone.loc["zone_2", True] < 50
+
+
+@pytest.mark.parametrize("name", FACT_TABLES)
+def test_extended_variant_matches_a_longer_run(extended_and_full, name):
+    # Each write is zone-major, so the extension's rows follow the history of every zone.
+    extended, full = extended_and_full
+    pd.testing.assert_frame_equal(sorted_table(name, extended), sorted_table(name, full))
@@ -0,0 +1,48 @@
+"""Model store: stored models forecast exactly like the trained ones, and stale ones are not reused."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting.forecasting_pipeline import (
+    MODEL_CONFIG,
+    forecast_next_horizon,
+    prepare_time_series,
+    train_baseline_forecaster,
+    train_regression_forecaster,
+)
+from forecasting.model_store import fingerprint, load_models, save_models
+
+
+@pytest.fixture(scope="module")
+def models(orders_df):
+    ts_df = prepare_time_series(orders_df)
+    return {"baseline": train_baseline_forecaster(ts_df), "regression": train_regression_forecaster(ts_df)}
+
+
+def test_round_trip_forecasts_are_identical(tmp_path, models):
+    save_models(list(models.values()), "a" * 64, tmp_path)
+    loaded = load_models(tmp_path, "a" * 64)
+    assert set(loaded) == set(models)
+    for name, model in models.items():
+        assert set(loaded[name]) == set(model)
+        pd.testing.assert_frame_equal(forecast_next_horizon(loaded[name], 72), forecast_next_horizon(model, 72))
+
+
+def test_a_new_fingerprint_replaces_the_stored_models(tmp_path, models):
+    save_models([models["baseline"]], "a" * 64, tmp_path)
+    assert load_models(tmp_path, "b" * 64) is None
+    save_models([models["regression"]], "b" * 64, tmp_path)
+    assert list(load_models(tmp_path, "b" * 64)) == ["regression"]
+    assert [path.name for path in tmp_path.glob("*.npz")] == [f"regression-{'b' * 16}.npz"]
+
+
+def test_fingerprint_follows_file_contents_and_config(tmp_path):
+    data = tmp_path / "fact_orders.csv"
+    data.write_bytes(np.arange(1000).tobytes())
+    original = fingerprint([data], MODEL_CONFIG)
+    data.write_bytes(np.arange(1000).tobytes())
+    assert fingerprint([data], MODEL_CONFIG) == original
+    assert fingerprint([data], {**MODEL_CONFIG, "history_weeks": 4}) != original
+    data.write_bytes(np.arange(1001).tobytes())
+    assert fingerprint([data], MODEL_CONFIG) != original
@@ -0,0 +1,195 @@
+"""Pricing rules: the vectorized engine reproduces the row-by-row rule loop exactly."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from decision_policy.pricing_rules import apply_pricing_rules
+
+
+def reference_pricing_rules(signals_df: pd.DataFrame) -> pd.DataFrame:
+    """The row-by-row engine apply_pricing_rules replaced, kept verbatim as the reference."""
+    df = signals_df.sort_values(["zone_id", "segment_id", "timestamp"]).reset_index(drop=True)
+
+    max_surge = 0.20
+    max_discount = -0.25
+    stress_high = 70.0
+    util_low = 0.78
+
+    uncertainty_hold_threshold = 0.42
+    uncertainty_high_threshold = 0.30
+    cooldown_hours = 3
+
+    last_non_hold_ts: dict[tuple[str, str], pd.Timestamp] = {}
+    rows = []
+
+    for row in df.itertuples(index=False):
+        key = (row.zone_id, row.segment_id)
+        uncertainty_ratio = float(row.uncertainty_ratio)
+
+        surge_candidate = (row.worst_case_pressure >= 1.15) or (
+            (row.expected_pressure >= 1.05) and (row.stress_index >= stress_high)
+        )
+        discount_candidate = (
+            (row.best_case_pressure <= 0.80)
+            and (row.expected_pressure <= 0.90)
+            and (row.utilization_rate <= util_low)
+        )
+
+        action = "HOLD"
+        pct_change = 0.0
+        reason = "INSUFFICIENT_SIGNAL"
+        notes = (
+            f"pressure exp={row.expected_pressure:.2f}, worst={row.worst_case_pressure:.2f}, "
+            f"best={row.best_case_pressure:.2f}."
+        )
+
+        if surge_candidate and discount_candidate:
+            reason = "INSUFFICIENT_SIGNAL"
+            notes = "Conflicting surge and discount signals; holding for leadership review."
+        elif uncertainty_ratio > uncertainty_hold_threshold and (surge_candidate or discount_candidate):
+            reason = "UNCERTAINTY_TOO_HIGH"
+            notes = "Guardrail applied: uncertainty band too wide for safe price movement."
+        else:
+            if surge_candidate:
+                severity = float(np.clip((row.worst_case_pressure - 1.05) / 0.25, 0.0, 1.0))
+                pct_change = float(np.clip(0.05 + 0.15 * severity, 0.0, max_surge))
+                action = "SURGE"
+                reason = "CAPACITY_PROTECTION" if row.worst_case_pressure >= 1.15 else "PEAK_DEMAND_CONTROL"
+                notes = (
+                    f"Projected overload risk with worst-case pressure {row.worst_case_pressure:.2f}; "
+                    f"recommend bounded surge to protect service levels."
+                )
+            elif discount_candidate:
+                slack = float(np.clip((0.90 - row.expected_pressure) / 0.30, 0.0, 1.0))
+                pct_change = float(np.clip(-(0.06 + 0.19 * slack), max_discount, 0.0))
+                action = "DISCOUNT"
+                reason = "EXCESS_CAPACITY" if row.utilization_rate <= 0.72 else "DEMAND_STIMULUS"
+                notes = (
+                    f"Sustained slack capacity with expected pressure {row.expected_pressure:.2f}; "
+                    f"recommend targeted discount to recover demand."
+                )
+
+        last_ts = last_non_hold_ts.get(key)
+        if action != "HOLD" and last_ts is not None:
+            hours_since = (row.timestamp - last_ts) / pd.Timedelta(hours=1)
+            if hours_since < cooldown_hours:
+                action = "HOLD"
+                pct_change = 0.0
+                reason = "COOLDOWN_GUARDRAIL"
+                notes = "Guardrail applied: recent non-hold decision still within cooldown window."
+
+        if action == "SURGE":
+            risk = "HIGH" if uncertainty_ratio >= uncertainty_high_threshold else "MEDIUM"
+        elif action == "DISCOUNT":
+            risk = "MEDIUM" if uncertainty_ratio >= uncertainty_high_threshold else "LOW"
+        else:
+            if reason in {"UNCERTAINTY_TOO_HIGH"}:
+                risk = "HIGH"
+            elif uncertainty_ratio >= uncertainty_high_threshold:
+                risk = "MEDIUM"
+            else:
+                risk = "LOW"
+
+        if action != "HOLD":
+            last_non_hold_ts[key] = row.timestamp
+
+        rows.append(
+            {
+                "timestamp": row.timestamp,
+                "zone_id": row.zone_id,
+                "segment_id": row.segment_id,
+                "recommended_action": action,
+                "recommended_pct_change": float(round(pct_change, 4)),
+                "decision_reason": reason,
+                "risk_flag": risk,
+                "policy_notes": notes,
+            }
+        )
+
+    decisions = pd.DataFrame(rows)
+    return decisions[
+        [
+            "timestamp",
+            "zone_id",
+            "segment_id",
+            "recommended_action",
+            "recommended_pct_change",
+            "decision_reason",
+            "risk_flag",
+            "policy_notes",
+        ]
+    ]
+
+
+# Values every rule compares against, so the fuzzed signals land exactly on the boundaries.
+THRESHOLDS = {
+    "expected_pressure": [0.90, 1.05, 0.75, 0.60],
+    "worst_case_pressure": [1.15, 1.05, 1.30],
+    "best_case_pressure": [0.80],
+    "utilization_rate": [0.78, 0.72],
+    "stress_index": [70.0],
+    "uncertainty_ratio": [0.42, 0.30],
+}
+RANGES = {
+    "expected_pressure": (0.5, 1.4),
+    "worst_case_pressure": (0.7, 1.5),
+    "best_case_pressure": (0.4, 1.1),
+    "utilization_rate": (0.6, 0.9),
+    "stress_index": (55.0, 85.0),
+    "uncertainty_ratio": (0.1, 0.55),
+}
+
+
+def fuzzed_signals(seed: int) -> pd.DataFrame:
+    """A shuffled random signal panel with threshold ties, rounding ties, NaN and -0.0.
+
+    Timestamps are irregular, sometimes duplicated, and mostly closer together than the
+    cooldown, and most rows are surge or discount candidates, so cooldown chains are dense.
+    """
+    rng = np.random.default_rng(seed)
+    n_series = int(rng.integers(1, 5))
+    length = int(rng.integers(1, 60))
+    n = n_series * length
+    minutes = np.sort(rng.integers(0, length * int(rng.choice([20, 60, 120])), size=(n_series, length)), axis=1)
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2026-01-01") + pd.to_timedelta(minutes.ravel(), unit="min"),
+            "zone_id": np.repeat([f"zone_{i // 2}" for i in range(n_series)], length),
+            "segment_id": np.repeat([["value", "premium"][i % 2] for i in range(n_series)], length),
+        }
+    )
+    for column, (lo, hi) in RANGES.items():
+        values = rng.uniform(lo, hi, n)
+        kind = rng.random(n)
+        values = np.where(kind < 0.3, rng.choice(THRESHOLDS[column], n), values)
+        # Two-decimal rounding ties such as 1.125 exercise the note formatting.
+        values = np.where((kind >= 0.3) & (kind < 0.4), np.floor(values * 100) / 100 + 0.005, values)
+        values = np.where((kind >= 0.4) & (kind < 0.5), np.round(values, 2), values)
+        values[rng.random(n) < 0.03] = np.nan
+        df[column] = values
+    df.loc[rng.random(n) < 0.03, "expected_pressure"] = -0.0
+    return df.sample(frac=1, random_state=seed, ignore_index=True)
+
+
+@pytest.mark.parametrize("chunk", range(10))
+def test_vectorized_rules_match_the_row_loop(chunk):
+    for seed in range(chunk * 30, (chunk + 1) * 30):
+        signals = fuzzed_signals(seed)
+        expected = reference_pricing_rules(signals)
+        actual = apply_pricing_rules(signals)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True, obj=f"decisions for seed {seed}")
+
+
+def test_fuzzed_panels_cover_every_outcome():
+    decisions = pd.concat([reference_pricing_rules(fuzzed_signals(seed)) for seed in range(30)])
+    assert set(decisions["decision_reason"]) == {
+        "INSUFFICIENT_SIGNAL",
+        "UNCERTAINTY_TOO_HIGH",
+        "CAPACITY_PROTECTION",
+        "PEAK_DEMAND_CONTROL",
+        "EXCESS_CAPACITY",
+        "DEMAND_STIMULUS",
+        "COOLDOWN_GUARDRAIL",
+    }
+    assert set(decisions["risk_flag"]) == {"LOW", "MEDIUM", "HIGH"}
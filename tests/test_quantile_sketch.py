@@ -0,0 +1,95 @@
+"""Quantile sketches: bounded-error quantiles, merges that equal one sketch, and no double counting."""
+
+import numpy as np
+import pandas as pd
+
+from forecasting.forecasting_pipeline import absorb_forecast_errors
+from forecasting.quantile_sketch import (
+    MIN_VALUE,
+    RELATIVE_ACCURACY,
+    empty_sketch,
+    load_sketches,
+    merge_sketches,
+    save_sketches,
+    sketch_count,
+    sketch_quantiles,
+    sketch_update,
+)
+
+QUANTILES = (0.0, 0.05, 0.10, 0.5, 0.90, 0.99, 1.0)
+
+
+def test_quantiles_are_within_the_relative_accuracy():
+    rng = np.random.default_rng(0)
+    residuals = rng.standard_t(3, size=(4, 3, 2000)) * np.array([0.5, 20.0, 400.0])[:, None]
+    residuals[..., :100] = np.nan
+    counts = empty_sketch((4, 3))
+    # Several updates of the same cells accumulate like one.
+    for part in np.array_split(residuals, 5, axis=2):
+        sketch_update(counts, part)
+    assert (sketch_count(counts) == 1900).all()
+
+    approx = sketch_quantiles(counts, QUANTILES)
+    for i, q in enumerate(QUANTILES):
+        exact = np.nanquantile(residuals, q, axis=2, method="lower")
+        assert (np.abs(approx[..., i] - exact) <= RELATIVE_ACCURACY * np.abs(exact) + MIN_VALUE).all(), q
+    assert np.isnan(sketch_quantiles(empty_sketch((2,)), QUANTILES)).all()
+
+
+def sketch_of(zone_ids: list[str], residuals: np.ndarray) -> dict:
+    counts = empty_sketch(residuals.shape[:2])
+    sketch_update(counts, residuals)
+    return {
+        "zone_id": np.array(zone_ids, dtype=object),
+        "segment_id": np.array(["premium"] * len(zone_ids), dtype=object),
+        "counts": counts,
+        "absorbed_through": np.datetime64("2026-01-01T00:00"),
+    }
+
+
+def test_merged_shards_equal_one_sketch():
+    rng = np.random.default_rng(1)
+    residuals = rng.normal(0, 10, size=(4, 6, 300))
+    whole = sketch_of(["a", "b", "c", "d"], residuals)
+    # Shards split series "b" between them and list their series in different orders.
+    early, late = residuals[1].copy(), residuals[1].copy()
+    early[:, 100:] = np.nan
+    late[:, :100] = np.nan
+    shards = [
+        sketch_of(["b", "a"], np.stack([early, residuals[0]])),
+        sketch_of(["c", "b", "d"], np.stack([residuals[2], late, residuals[3]])),
+    ]
+    shards[1]["absorbed_through"] = np.datetime64("2026-02-01T00:00")
+    merged = merge_sketches(shards)
+    order = [["b", "a", "c", "d"].index(zone) for zone in whole["zone_id"]]
+    assert list(merged["zone_id"]) == ["b", "a", "c", "d"]
+    np.testing.assert_array_equal(merged["counts"][order], whole["counts"])
+    assert merged["absorbed_through"] == np.datetime64("2026-02-01T00:00")
+
+
+def test_absorbing_the_same_forecasts_twice_counts_once(tmp_path):
+    hours = pd.date_range("2026-01-01 01:00", periods=6, freq="h")
+    forecasts = pd.DataFrame(
+        {
+            "timestamp": np.tile(hours, 2),
+            "zone_id": np.repeat(["a", "b"], 6),
+            "segment_id": "premium",
+            "forecast_model": "regression",
+            "forecast_demand": 10.0,
+        }
+    )
+    # Actuals arrive for the first four hours only.
+    actuals = forecasts[forecasts["timestamp"] < hours[4]].assign(final_demand=lambda df: df["forecast_demand"] + 3.0)
+    sketches = {"regression": sketch_of(["a", "b"], np.full((2, 6, 1), np.nan))}
+
+    assert absorb_forecast_errors(sketches, forecasts, actuals) == 8
+    assert absorb_forecast_errors(sketches, forecasts, actuals) == 0
+    counts = sketch_count(sketches["regression"]["counts"])
+    np.testing.assert_array_equal(counts, [[1, 1, 1, 1, 0, 0]] * 2)
+    median = sketch_quantiles(sketches["regression"]["counts"][:, :4], (0.5,))
+    np.testing.assert_allclose(median, 3.0, rtol=RELATIVE_ACCURACY)
+
+    save_sketches(sketches, tmp_path)
+    loaded = load_sketches(tmp_path)["regression"]
+    np.testing.assert_array_equal(loaded["counts"], sketches["regression"]["counts"])
+    assert loaded["absorbed_through"] == hours[3]
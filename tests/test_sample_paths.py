@@ -0,0 +1,72 @@
+"""Sample paths: each path is the regression recursion driven by its bootstrapped shocks."""
+
+import numpy as np
+import pytest
+
+from forecasting.forecasting_pipeline import (
+    DOW_COL,
+    HOUR_COL,
+    LAGS,
+    MAX_LAG,
+    N_FEATURES,
+    forecast_arrays,
+    prepare_time_series,
+    train_regression_forecaster,
+)
+from forecasting.sample_paths import _bootstrap_noise, sample_demand_paths, write_demand_paths
+
+HORIZON = MAX_LAG + 30
+
+
+@pytest.fixture(scope="module")
+def regression(orders_df):
+    return train_regression_forecaster(prepare_time_series(orders_df))
+
+
+def shocked_recursion(betas: np.ndarray, recent: np.ndarray, first_hour: int, shocks: np.ndarray) -> np.ndarray:
+    """One series' recursion with shocks[step] added to each prediction before it joins the history."""
+    history = list(recent)
+    preds = []
+    for step, shock in enumerate(shocks):
+        hour = first_hour + step
+        x = np.zeros(N_FEATURES)
+        x[0] = 1.0
+        x[1 : 1 + len(LAGS)] = [history[-lag] for lag in LAGS]
+        hour_of_day, day_of_week = hour % 24, (hour // 24 + 3) % 7
+        if hour_of_day > 0:
+            x[HOUR_COL + hour_of_day] = 1.0
+        if day_of_week > 0:
+            x[DOW_COL + day_of_week] = 1.0
+        preds.append(max(float(x @ betas) + shock, 0.0))
+        history.append(preds[-1])
+    return np.array(preds)
+
+
+def test_paths_follow_the_recursion_with_their_shocks(regression):
+    paths = sample_demand_paths(regression, HORIZON, n_paths=3, block_hours=24, seed=5)
+
+    residuals = regression["residuals"]
+    pool = np.nan_to_num(residuals - np.nanmean(residuals, axis=1, keepdims=True))
+    noise = _bootstrap_noise(pool, 3, HORIZON, 24, np.random.default_rng(5))
+    first_hours = regression["last_timestamp"].astype("datetime64[h]").astype(np.int64) + 1
+    for path in range(3):
+        for s, (betas, recent) in enumerate(zip(regression["betas"], regression["recent"])):
+            expected = shocked_recursion(betas, recent, first_hours[s], noise[:, path, s])
+            np.testing.assert_allclose(paths[path, s], expected, rtol=1e-6, atol=1e-4)
+
+
+def test_zero_shocks_reproduce_the_point_forecast(regression):
+    quiet = {**regression, "residuals": np.full_like(regression["residuals"], np.nan)}
+    paths = sample_demand_paths(quiet, HORIZON, n_paths=4)
+    point = forecast_arrays(regression, HORIZON)["point"].astype(np.float32)
+    for path in paths:
+        np.testing.assert_array_equal(path, point)
+
+
+def test_paths_are_reproducible_from_the_seed(tmp_path, regression):
+    first = sample_demand_paths(regression, 48, n_paths=20, seed=1)
+    np.testing.assert_array_equal(sample_demand_paths(regression, 48, n_paths=20, seed=1), first)
+    assert not np.array_equal(sample_demand_paths(regression, 48, n_paths=20, seed=2), first)
+
+    write_demand_paths(regression, 48, n_paths=20, seed=1, output_dir=tmp_path)
+    np.testing.assert_array_equal(np.load(tmp_path / "demand_paths.npy"), first)